@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+"""
+Benchmarks of the JSONField hot paths: encoding (``get_prep_value``),
+decoding (the field converters), ``JSONEncoder.default`` for each type it
+handles, form round-trips, every registered lookup and key selection, over
+small, medium and large documents.
+
+They run against the database configured by ``tests/settings.py``, SQLite by
+default, PostgreSQL with the same environment variables as the test suite::
+
+    python benchmarks/run.py --output results.json
+    DB_ENGINE=postgresql_psycopg2 DB_NAME=jsonfield python benchmarks/run.py
+
+Results are written as JSON, with the size in bytes of the input and output
+of each operation as JSON text. ``--compare`` checks them against a previous
+run and exits with status 1 when a benchmark got slower than
+``--threshold`` times its previous time::
+
+    python benchmarks/run.py --compare results.json --threshold 1.25
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import datetime
+import decimal
+import json
+import os
+import platform
+import sys
+import uuid
+from timeit import default_timer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.utils import DatabaseError  # noqa: E402
+from django.utils.translation import ugettext_lazy  # noqa: E402
+
+from jsonfield.encoder import JSONEncoder  # noqa: E402
+from jsonfield.fields import JSONField  # noqa: E402
+from jsonfield.lookups import KeyTransform  # noqa: E402
+from jsonfield.tests.jsonfield_test_app.models import (  # noqa: E402
+    JSONFieldTestModel,
+)
+from jsonfield.utils import string_types  # noqa: E402
+
+ROWS = 200
+
+
+def make_document(size):
+    """
+    Deterministic document with ``size`` entries of mixed types.
+    """
+    return {
+        'k%d' % i: [
+            'value %d' % i,
+            i,
+            i / 3.0,
+            i % 2 == 0,
+            None,
+            {'nested': 'n%d' % i, 'list': list(range(i % 5))},
+        ][i % 6]
+        for i in range(size)
+    }
+
+
+DOCUMENTS = [
+    ('small', make_document(5)),
+    ('medium', make_document(100)),
+    ('large', make_document(5000)),
+]
+
+
+class Mapping(object):
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def keys(self):
+        return self.data.keys()
+
+
+ENCODER_VALUES = [
+    ('promise', ugettext_lazy('text')),
+    ('datetime', datetime.datetime(2020, 1, 2, 3, 4, 5, 123456)),
+    ('date', datetime.date(2020, 1, 2)),
+    ('time', datetime.time(3, 4, 5, 123456)),
+    ('timedelta', datetime.timedelta(days=1, seconds=5)),
+    ('decimal', decimal.Decimal('1.5')),
+    ('uuid', uuid.UUID('12345678123456781234567812345678')),
+    ('queryset', JSONFieldTestModel.objects.none()),
+    ('mapping', Mapping({'a': 1})),
+    ('iterable', {1, 2, 3}),
+]
+
+
+def lookup_arguments(document):
+    """
+    Return ``(benchmark name, lookup, filter arguments)`` for each lookup,
+    key transform lookups being prefixed with ``key.``.
+    """
+    return [
+        ('exact', 'exact', {'json__exact': document}),
+        ('iexact', 'iexact', {'json__iexact': {'k0': 'VALUE 0'}}),
+        ('in', 'in', {'json__in': [document, {}]}),
+        ('contains', 'contains', {'json__contains': {'k0': 'value 0'}}),
+        ('icontains', 'icontains', {'json__icontains': {'k0': 'VALUE 0'}}),
+        ('contained_by', 'contained_by', {'json__contained_by': document}),
+        ('has_key', 'has_key', {'json__has_key': 'k1'}),
+        ('has_keys', 'has_keys', {'json__has_keys': ['k0', 'k1']}),
+        ('has_any_keys', 'has_any_keys',
+         {'json__has_any_keys': ['k1', 'missing']}),
+        ('isnull', 'isnull', {'json__isnull': False}),
+        ('key.exact', 'key.exact', {'json__k0': 'value 0'}),
+        ('key.exact_nested', 'key.exact', {'json__k0__0': 'v'}),
+        ('key.in', 'key.in', {'json__k1__in': [1, 2]}),
+        ('key.gt', 'key.gt', {'json__k1__gt': 0}),
+    ]
+
+
+def byte_size(value):
+    """
+    Size in bytes of ``value``: its UTF-8 encoding for text, of its JSON
+    text otherwise.
+    """
+    if isinstance(value, bytes):
+        return len(value)
+    if not isinstance(value, string_types):
+        value = json.dumps(value, cls=JSONEncoder, separators=(',', ':'))
+    return len(value.encode('utf-8'))
+
+
+def measure(func, repeat, min_time):
+    """
+    Return the per-call times of ``repeat`` runs of ``func``, each run
+    calling it enough times to last at least ``min_time`` seconds.
+    """
+    number = 1
+    while True:
+        start = default_timer()
+        for _ in range(number):
+            func()
+        elapsed = default_timer() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = default_timer()
+        for _ in range(number):
+            func()
+        times.append((default_timer() - start) / number)
+    return number, times
+
+
+class Runner(object):
+    def __init__(self, repeat, min_time, pattern=None):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.pattern = pattern
+        self.results = {}
+        self.skipped = {}
+
+    def run(self, name, func, input_value=None):
+        """
+        Time ``func``, its input being ``input_value``, if any, as JSON.
+        """
+        if self.pattern and self.pattern not in name:
+            return
+        try:
+            output = func()
+        except DatabaseError as exc:
+            # Lookups not supported by, or too complex for, the database.
+            self.skipped[name] = str(exc)
+            return
+
+        number, times = measure(func, self.repeat, self.min_time)
+        times.sort()
+        self.results[name] = {
+            'best': times[0],
+            'median': times[len(times) // 2],
+            'number': number,
+            'repeat': self.repeat,
+            'input_bytes': (
+                None if input_value is None else byte_size(input_value)
+            ),
+            'output_bytes': byte_size(output),
+        }
+        print('%-40s %12.3f us %10d B' % (
+            name, times[0] * 1e6, self.results[name]['output_bytes']
+        ), file=sys.stderr)
+
+
+def bench_fields(runner):
+    field = JSONFieldTestModel._meta.get_field('json')
+    lazy_field = JSONField(lazy=True)
+    for size, document in DOCUMENTS:
+        raw = field.get_prep_value(document)
+        runner.run('encode.get_prep_value.%s' % size,
+                   lambda: field.get_prep_value(document), document)
+
+        # A single converter for text columns, none for json/jsonb ones.
+        converters = field.get_db_converters(connection)
+        runner.run('decode.converter.%s' % size, lambda: [
+            converter(raw, None, connection) for converter in converters
+        ], raw)
+
+        # Only builds the LazyJSON; decode.lazy also reads the document.
+        lazy_converter = lazy_field._convert_lazy_value
+        runner.run('decode.lazy_untouched.%s' % size,
+                   lambda: lazy_converter(raw), raw)
+        runner.run('decode.lazy.%s' % size,
+                   lambda: lazy_converter(raw).decode(), raw)
+
+        # The same document read again, from a warm cache.
+        cached_field = JSONField(decode_cache=True)
+        cached_converter = cached_field._convert_cached_value
+        runner.run('decode.cached.%s' % size,
+                   lambda: cached_converter(raw), raw)
+
+        # Defaults are deep-copied for each instance, unless frozen.
+        default_field = JSONField(default=document)
+        runner.run('default.copy.%s' % size, default_field.get_default,
+                   document)
+        frozen_field = JSONField(default=document, frozen=True)
+        runner.run('default.frozen.%s' % size, frozen_field.get_default,
+                   document)
+
+
+def bench_encoder(runner):
+    encoder = JSONEncoder()
+    for name, value in ENCODER_VALUES:
+        runner.run('encoder.default.%s' % name,
+                   lambda value=value: encoder.default(value), value)
+
+
+def bench_forms(runner):
+    formfield = JSONFieldTestModel._meta.get_field('json').formfield()
+    widget = formfield.widget
+    for size, document in DOCUMENTS:
+        runner.run('form.round_trip.%s' % size,
+                   lambda document=document: formfield.clean(
+                       widget.format_value(document)
+                   ), document)
+
+
+def bench_lookups(runner):
+    registered = set(JSONField.get_lookups()) | set(
+        'key.%s' % name for name in KeyTransform.get_lookups()
+    )
+    for size, document in DOCUMENTS:
+        JSONFieldTestModel.objects.all().delete()
+        JSONFieldTestModel.objects.bulk_create([
+            JSONFieldTestModel(json=dict(document, row=i))
+            for i in range(ROWS)
+        ])
+        # What the queries read: the stored documents.
+        stored = list(JSONFieldTestModel.objects.values_list(
+            'json', flat=True
+        ))
+
+        for name, lookup, kwargs in lookup_arguments(document):
+            if lookup not in registered:
+                continue
+            queryset = JSONFieldTestModel.objects.filter(**kwargs)
+            runner.run('lookup.%s.%s' % (name, size), queryset.count,
+                       stored)
+
+        # Fetching a single key, against the whole documents.
+        queryset = JSONFieldTestModel.objects.all()
+        runner.run('select.document.%s' % size,
+                   lambda: list(queryset.values_list('json', flat=True)),
+                   stored)
+        runner.run('select.key.%s' % size,
+                   lambda: list(queryset.values_list('json__k0', flat=True)),
+                   stored)
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the benchmarks slower than ``threshold`` times their baseline and
+    return whether there was any.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        ratio = result['best'] / previous['best']
+        if ratio > threshold:
+            regressions.append((name, ratio))
+
+    for name, ratio in regressions:
+        print('REGRESSION %-40s x%.2f' % (name, ratio), file=sys.stderr)
+    return bool(regressions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', help='File to write the results to.')
+    parser.add_argument('--compare', help='Results of a previous run.')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Minimum duration of each run, in seconds.')
+    parser.add_argument('-k', dest='pattern',
+                        help='Only run benchmarks whose name contains it.')
+    args = parser.parse_args(argv)
+
+    runner = Runner(args.repeat, args.min_time, args.pattern)
+    bench_fields(runner)
+    bench_encoder(runner)
+    bench_forms(runner)
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        bench_lookups(runner)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = {
+        'meta': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'backend': JSONFieldTestModel._meta.get_field(
+                'json').backend.name,
+            'date': datetime.datetime.utcnow().isoformat(),
+        },
+        'results': runner.results,
+        'skipped': runner.skipped,
+    }
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(output, fp, indent=2, sort_keys=True)
+    else:
+        json.dump(output, sys.stdout, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        if compare(runner.results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Aggregates computed by the database over ``JSONField`` values:
+
+* ``JSONAgg(expression)`` collects the values in a JSON array;
+* ``JSONObjectAgg(key, value)`` builds a JSON object;
+* ``KeySum``, ``KeyAvg``, ``KeyMin`` and ``KeyMax`` aggregate the number
+  found under a path, ``'data__price'``, see ``KeyNumber``.
+
+``JSONField`` columns and key transforms are aggregated as JSON values, not
+as their text. They are compiled to ``jsonb_agg``/``jsonb_object_agg`` on
+PostgreSQL, ``JSON_ARRAYAGG``/``JSON_OBJECTAGG`` on MySQL and
+``json_group_array``/``json_group_object`` on SQLite. Without any row, they
+are ``NULL`` on PostgreSQL and MySQL, an empty array or object on SQLite.
+"""
+from __future__ import unicode_literals
+
+from django.core.exceptions import FieldError
+from django.db.models import Aggregate, Avg, FloatField, Func, Max, Min, Sum
+from django.db.utils import NotSupportedError
+
+from .features import check_json_functions
+from .fields import JSONField
+from .lookups import KeyTransform, jsonb_sql, key_transform
+from .utils import string_types
+
+
+class JSONValue(Func):
+    """
+    Value of a ``JSONField`` column or key as a JSON value of the database.
+    """
+    def as_sql(self, compiler, connection):
+        return compiler.compile(self.source_expressions[0])
+
+    @property
+    def is_key(self):
+        return isinstance(self.source_expressions[0], KeyTransform)
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = self.as_sql(compiler, connection)
+        if self.is_key:
+            return sql, params
+        return jsonb_sql(connection, sql, self.output_field), params
+
+    def as_mysql(self, compiler, connection):
+        sql, params = self.as_sql(compiler, connection)
+        if self.is_key:
+            return sql, params
+        return 'CAST(%s AS JSON)' % sql, params
+
+    def as_sqlite(self, compiler, connection):
+        sql, params = self.as_sql(compiler, connection)
+        if self.is_key:
+            # Scalars found under keys are SQL values, booleans integers.
+            sql, params = self.source_expressions[0].sqlite_quote(
+                compiler, sql, params
+            )
+        return 'JSON(%s)' % sql, params
+
+
+def json_value(expression):
+    """
+    Wrap ``expression`` in ``JSONValue`` if it is a ``JSONField`` column or
+    a key transform of one.
+    """
+    field = getattr(expression, '_output_field_or_none', None)
+    if not isinstance(field, JSONField):
+        return expression
+    if field.opaque:
+        raise FieldError(
+            'Binary or compressed documents cannot be aggregated.'
+        )
+    return JSONValue(expression)
+
+
+class JSONAggregate(Aggregate):
+    """
+    Aggregate returning a JSON document, with a function name per database
+    in ``functions``. The arguments at ``json_arguments`` are aggregated as
+    JSON values.
+    """
+    functions = {}
+    json_arguments = ()
+    output_field = JSONField()
+
+    def resolve_expression(self, *args, **kwargs):
+        resolved = super(JSONAggregate, self).resolve_expression(
+            *args, **kwargs
+        )
+        for index in self.json_arguments:
+            resolved.source_expressions[index] = json_value(
+                resolved.source_expressions[index]
+            )
+        return resolved
+
+    def as_sql(self, compiler, connection, **extra_context):
+        function = self.functions.get(connection.vendor)
+        if function is None:
+            raise NotSupportedError(
+                '%s is not supported on %s.' % (
+                    self.__class__.__name__, connection.vendor
+                )
+            )
+        check_json_functions(connection, self.__class__.__name__)
+        extra_context.setdefault('function', function)
+        return super(JSONAggregate, self).as_sql(
+            compiler, connection, **extra_context
+        )
+
+
+class JSONAgg(JSONAggregate):
+    """
+    JSON array of the values of ``expression``.
+    """
+    name = 'JSONAgg'
+    functions = {
+        'postgresql': 'JSONB_AGG',
+        'mysql': 'JSON_ARRAYAGG',
+        'sqlite': 'JSON_GROUP_ARRAY',
+    }
+    json_arguments = (0,)
+
+    def __init__(self, expression, **extra):
+        super(JSONAgg, self).__init__(expression, **extra)
+
+
+class JSONObjectAgg(JSONAggregate):
+    """
+    JSON object mapping the values of ``key``, converted to strings, to the
+    values of ``value``.
+    """
+    name = 'JSONObjectAgg'
+    functions = {
+        'postgresql': 'JSONB_OBJECT_AGG',
+        'mysql': 'JSON_OBJECTAGG',
+        'sqlite': 'JSON_GROUP_OBJECT',
+    }
+    json_arguments = (1,)
+
+    def __init__(self, key, value, **extra):
+        super(JSONObjectAgg, self).__init__(key, value, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        if self.filter is not None:
+            return self.as_sql(compiler, connection, **extra_context)
+        # Django 3.0 rejects any aggregate with several arguments on SQLite,
+        # instead of only the DISTINCT ones.
+        check_json_functions(connection, self.__class__.__name__)
+        sqls, params = [], []
+        for expression in self.source_expressions:
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        return 'JSON_GROUP_OBJECT(%s)' % ', '.join(sqls), params
+
+
+class KeyNumber(Func):
+    """
+    Number found under ``path``, ``'field__key__key'``, as a float. Numbers
+    written as strings are converted too; other values fail on PostgreSQL,
+    and are 0 on MySQL and SQLite.
+    """
+    output_field = FloatField()
+
+    def __init__(self, path, **extra):
+        if isinstance(path, string_types):
+            path = key_transform(path, text=True)
+        super(KeyNumber, self).__init__(path, **extra)
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(
+            'KeyNumber is not supported on %s.' % connection.vendor
+        )
+
+    def as_postgresql(self, compiler, connection):
+        return super(KeyNumber, self).as_sql(
+            compiler, connection,
+            template='(%(expressions)s)::double precision'
+        )
+
+    def as_mysql(self, compiler, connection):
+        return super(KeyNumber, self).as_sql(
+            compiler, connection,
+            template='CAST(%(expressions)s AS DECIMAL(65, 30))'
+        )
+
+    def as_sqlite(self, compiler, connection):
+        return super(KeyNumber, self).as_sql(
+            compiler, connection, template='CAST(%(expressions)s AS REAL)'
+        )
+
+
+class KeyAggregateMixin(object):
+    """
+    Aggregate of the ``KeyNumber`` of ``path``, named ``path__sum``... by
+    default.
+    """
+    def __init__(self, path, **extra):
+        self.path = path
+        super(KeyAggregateMixin, self).__init__(KeyNumber(path), **extra)
+
+    @property
+    def default_alias(self):
+        return '%s__%s' % (self.path, self.name.lower())
+
+
+class KeySum(KeyAggregateMixin, Sum):
+    pass
+
+
+class KeyAvg(KeyAggregateMixin, Avg):
+    pass
+
+
+class KeyMin(KeyAggregateMixin, Min):
+    pass
+
+
+class KeyMax(KeyAggregateMixin, Max):
+    pass
@@ -0,0 +1,297 @@
+"""
+Serializer engines used by ``JSONField``, ``JSONFormField`` and
+``JSONWidget`` to encode and decode values.
+
+The engine is picked with the ``backend`` argument of the field, or globally
+with ``settings.JSONFIELD_BACKEND``. It can be one of the names registered in
+``BACKENDS``, a dotted path to a ``JSONBackend`` subclass, or the class
+itself. When the extension module behind an engine is not installed, the
+standard library ``json`` module is used instead.
+
+Fast engines are only used for the calls and values they handle like
+``json.dumps``/``json.loads``; anything else (custom separators, decoder
+hooks, non-finite floats or exponents for orjson...) is handed over to
+the standard library, so that the stored text doesn't depend on the engine.
+Encoding always goes through the ``default`` method of the configured
+encoder class, so the type handling of ``jsonfield.encoder.JSONEncoder``
+is kept whatever the engine.
+"""
+import json
+import math
+import re
+import uuid
+
+from django.conf import settings
+
+from .encoder import Enum, JSONEncoder
+from .utils import resolve_object_from_path, string_types
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None
+
+
+# Separators used by the stdlib when none are given.
+COMPACT_SEPARATORS = (',', ':')
+INDENT_SEPARATORS = (',', ': ')
+
+# Integers beyond 64 bits, which orjson decodes as floats, have at least 19
+# digits: they show up as runs of zeros once the digits are translated.
+LONG_NUMBER_DIGITS = 19
+DIGITS_TO_ZERO = dict((ord(digit), u'0') for digit in u'123456789')
+BYTES_DIGITS_TO_ZERO = bytes(bytearray(
+    0x30 if 0x31 <= byte <= 0x39 else byte for byte in range(256)
+))
+
+# Output orjson writes differently from the stdlib: floats in exponent
+# notation (``1e16`` against ``1e+16``, ``0.000025`` against ``2.5e-05``)
+# and, with ``ensure_ascii``, characters the stdlib escapes as ``\uXXXX``.
+ORJSON_MISMATCH = re.compile(br'[0-9]e|0\.0000')
+ORJSON_ASCII_MISMATCH = re.compile(br'[\x7f-\xff]|[0-9]e|0\.0000')
+
+# Types orjson encodes without calling ``default``, and types whose
+# subclasses the stdlib encodes without calling it while orjson doesn't.
+ORJSON_NATIVE_TYPES = tuple(
+    type_ for type_ in string_types + (int, float, list, tuple, dict,
+                                       uuid.UUID, Enum)
+    if type_ is not None
+)
+
+
+class Unsupported(Exception):
+    """
+    Raised by ``fast_dumps`` for values the engine would encode differently
+    from the standard library.
+    """
+
+
+def has_long_number(s):
+    """
+    Return whether the JSON text ``s`` may hold an integer beyond 64 bits.
+    """
+    if isinstance(s, string_types):
+        return u'0' * LONG_NUMBER_DIGITS in s.translate(DIGITS_TO_ZERO)
+    return (
+        b'0' * LONG_NUMBER_DIGITS in
+        bytes(s).translate(BYTES_DIGITS_TO_ZERO)
+    )
+
+
+def has_non_finite(obj):
+    """
+    Return whether ``obj`` holds a ``NaN`` or infinite float.
+    """
+    if isinstance(obj, float):
+        return math.isnan(obj) or math.isinf(obj)
+    if isinstance(obj, dict):
+        obj = obj.values()
+    elif not isinstance(obj, (list, tuple)):
+        return False
+    return any(has_non_finite(item) for item in obj)
+
+
+class JSONBackend(object):
+    """
+    Serializer engine based on the standard library ``json`` module.
+    """
+    name = 'json'
+    available = True
+
+    def dumps(self, obj, **kwargs):
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+
+class FastJSONBackend(JSONBackend):
+    """
+    Base class for engines backed by a C extension. Subclasses implement
+    ``can_dump``, ``fast_dumps`` and ``fast_loads``.
+    """
+    available = False
+
+    def dumps(self, obj, **kwargs):
+        if self.can_dump(**kwargs):
+            try:
+                return self.fast_dumps(obj, **kwargs)
+            except (TypeError, OverflowError, Unsupported):
+                # Extensions hide the exception raised by ``default`` and
+                # refuse some values the stdlib accepts (big integers for
+                # instance), so let the stdlib either encode the value or
+                # raise the real error.
+                pass
+        return super(FastJSONBackend, self).dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super(FastJSONBackend, self).loads(s, **kwargs)
+        return self.fast_loads(s)
+
+    def can_dump(self, **kwargs):
+        raise NotImplementedError
+
+    def fast_dumps(self, obj, **kwargs):
+        raise NotImplementedError
+
+    def fast_loads(self, s):
+        raise NotImplementedError
+
+    def get_default(self, cls):
+        return cls().default if cls else None
+
+
+class OrjsonBackend(FastJSONBackend):
+    """
+    Serializer engine based on ``orjson``.
+
+    orjson only knows about compact output and two-space indentation. It
+    always emits UTF-8 rather than ``\\uXXXX`` escapes, writes floats in
+    exponent notation differently and non-finite floats as ``null``: the
+    values it would encode differently are encoded by the standard library.
+    Integers beyond 64 bits are decoded by the standard library too, orjson
+    turning them into floats.
+
+    orjson encodes UUIDs and enums itself, and hands float and tuple
+    subclasses over to ``default``, so it is only used with a
+    ``JSONEncoder`` whose ``default`` and registry handle these types like
+    the defaults do.
+    """
+    name = 'orjson'
+    available = orjson is not None
+
+    def can_dump(self, cls=None, indent=None, separators=None,
+                 sort_keys=False, ensure_ascii=True, allow_nan=True,
+                 **kwargs):
+        if kwargs or not self.encodes_like_orjson(cls):
+            return False
+        if indent is None:
+            return separators == COMPACT_SEPARATORS
+        return indent == 2 and separators in (None, INDENT_SEPARATORS)
+
+    def encodes_like_orjson(self, cls):
+        return (
+            cls is not None and issubclass(cls, JSONEncoder) and
+            cls.default == JSONEncoder.default and
+            not cls.registry.overrides(ORJSON_NATIVE_TYPES)
+        )
+
+    def fast_dumps(self, obj, cls=None, indent=None, sort_keys=False,
+                   ensure_ascii=True, **kwargs):
+        option = (
+            orjson.OPT_NON_STR_KEYS |
+            orjson.OPT_PASSTHROUGH_DATACLASS |
+            orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        data = orjson.dumps(obj, default=self.get_default(cls), option=option)
+        if b'null' in data and has_non_finite(obj):
+            raise Unsupported
+        mismatch = ORJSON_ASCII_MISMATCH if ensure_ascii else ORJSON_MISMATCH
+        if mismatch.search(data):
+            raise Unsupported
+        return data.decode('utf-8')
+
+    def fast_loads(self, s):
+        if has_long_number(s):
+            return json.loads(s)
+        return orjson.loads(s)
+
+
+class UJSONBackend(FastJSONBackend):
+    """
+    Serializer engine based on ``ujson``, only used for compact output.
+    """
+    name = 'ujson'
+    available = ujson is not None
+
+    def can_dump(self, cls=None, indent=None, separators=None,
+                 sort_keys=False, ensure_ascii=True, **kwargs):
+        return (
+            not kwargs and indent is None and
+            separators == COMPACT_SEPARATORS
+        )
+
+    def fast_dumps(self, obj, cls=None, sort_keys=False, ensure_ascii=True,
+                   **kwargs):
+        return ujson.dumps(
+            obj,
+            default=self.get_default(cls),
+            sort_keys=sort_keys,
+            ensure_ascii=ensure_ascii,
+            escape_forward_slashes=False,
+        )
+
+    def fast_loads(self, s):
+        return ujson.loads(s)
+
+
+class RapidJSONBackend(FastJSONBackend):
+    """
+    Serializer engine based on ``python-rapidjson``.
+    """
+    name = 'rapidjson'
+    available = rapidjson is not None
+
+    def can_dump(self, cls=None, indent=None, separators=None,
+                 sort_keys=False, ensure_ascii=True, **kwargs):
+        if kwargs:
+            return False
+        if indent is None:
+            return separators == COMPACT_SEPARATORS
+        return separators in (None, INDENT_SEPARATORS)
+
+    def fast_dumps(self, obj, cls=None, indent=None, sort_keys=False,
+                   ensure_ascii=True, **kwargs):
+        return rapidjson.dumps(
+            obj,
+            default=self.get_default(cls),
+            indent=indent,
+            sort_keys=sort_keys,
+            ensure_ascii=ensure_ascii,
+        )
+
+    def fast_loads(self, s):
+        return rapidjson.loads(s)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (JSONBackend, OrjsonBackend, UJSONBackend,
+                    RapidJSONBackend)
+}
+
+
+def get_backend(backend=None):
+    """
+    Return a serializer engine instance from a name, a dotted path, a class
+    or an instance. ``None`` means ``settings.JSONFIELD_BACKEND``.
+    """
+    if backend is None:
+        backend = getattr(settings, 'JSONFIELD_BACKEND', JSONBackend.name)
+
+    if isinstance(backend, JSONBackend):
+        return backend
+
+    if isinstance(backend, string_types):
+        backend = BACKENDS.get(backend, backend)
+    backend = resolve_object_from_path(backend)
+
+    if not backend.available:
+        backend = JSONBackend
+    return backend()
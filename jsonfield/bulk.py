@@ -0,0 +1,204 @@
+"""
+Bulk transfer of ``JSONField`` columns as NDJSON (one JSON document per
+line). Exports work on the serialized text stored in the database, which
+is never re-encoded on the way. Loaded documents are encoded by the field,
+as when saving a model, unless the column normalizes them. Fields with a
+binary ``storage_format`` or compression are always converted from and to
+JSON text.
+"""
+from __future__ import unicode_literals
+
+import binascii
+import io
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import ExpressionWrapper, F, TextField
+from django.db.models.functions import Cast
+from django.utils.encoding import force_text
+
+EXPORT_ALIAS = '_jsonfield_raw'
+
+
+def get_raw_expression(field, connection):
+    """
+    Expression selecting the stored text of ``field``, without the JSON
+    decoding of the field converters.
+    """
+    if field.decoded_by_driver(connection):
+        return Cast(field.name, TextField())
+    return ExpressionWrapper(F(field.name), output_field=TextField())
+
+
+def iter_ndjson(queryset, field_name, chunk_size=2000):
+    """
+    Yield the values of ``field_name`` for the rows of ``queryset`` as NDJSON
+    lines. Rows are fetched ``chunk_size`` at a time, through a server-side
+    cursor where the database supports it. ``NULL`` is exported as ``null``.
+    """
+    field = queryset.model._meta.get_field(field_name)
+    if field.opaque:
+        for line in iter_decoded_ndjson(queryset, field, chunk_size):
+            yield line
+        return
+
+    connection = connections[queryset.db]
+    rows = queryset.annotate(**{
+        EXPORT_ALIAS: get_raw_expression(field, connection)
+    }).values_list(EXPORT_ALIAS, flat=True)
+
+    try:
+        rows = rows.iterator(chunk_size=chunk_size)
+    except TypeError:
+        # Django < 2.0
+        rows = rows.iterator()
+
+    for raw in rows:
+        if raw is None:
+            yield 'null\n'
+            continue
+        if '\n' in raw or '\r' in raw:
+            # Only found in the whitespace of indented documents, strings
+            # can't hold literal line breaks.
+            raw = raw.replace('\r', '').replace('\n', '')
+        yield raw + '\n'
+
+
+def iter_decoded_ndjson(queryset, field, chunk_size):
+    rows = queryset.values_list(field.name, flat=True)
+    try:
+        rows = rows.iterator(chunk_size=chunk_size)
+    except TypeError:
+        rows = rows.iterator()
+
+    kwargs = dict(field.encoder_kwargs, indent=None)
+    for value in rows:
+        yield field.backend.dumps(value, **kwargs) + '\n'
+
+
+def dump_ndjson(queryset, field_name, fp, chunk_size=2000):
+    """
+    Write the values of ``field_name`` for the rows of ``queryset`` to the
+    text file ``fp`` as NDJSON, see ``iter_ndjson()``.
+    """
+    fp.writelines(iter_ndjson(queryset, field_name, chunk_size=chunk_size))
+
+
+def iter_ndjson_values(field, fp, validate=True, encode=True):
+    """
+    Yield the documents of the NDJSON file ``fp`` for ``field``, skipping
+    blank lines. ``None`` stands for SQL ``NULL``, used for ``null``
+    documents when the field is nullable.
+
+    Each line is parsed once by the field backend, a ``ValidationError``
+    mentioning the line number being raised for invalid ones, and yielded as
+    encoded by ``field.get_prep_value()``. Without ``encode``, the stripped
+    lines are yielded as they are, only parsed with ``validate``; fields
+    with a binary storage format or compression are always encoded.
+    """
+    encode = encode or field.opaque
+    for lineno, line in enumerate(fp, 1):
+        raw = force_text(line).strip()
+        if not raw:
+            continue
+        if validate or encode:
+            try:
+                value = field.backend.loads(raw)
+            except ValueError as exc:
+                raise ValidationError(
+                    'Line %(lineno)s: %(error)s',
+                    code='invalid',
+                    params={'lineno': lineno, 'error': exc},
+                )
+            if encode:
+                yield field.get_prep_value(value)
+                continue
+        if field.null and raw == 'null':
+            raw = None
+        yield raw
+
+
+def copy_escape(raw):
+    # Text format of COPY: backslashes start escape sequences.
+    if raw is None:
+        return '\\N'
+    if isinstance(raw, bytes):
+        # bytea, in hex format.
+        return '\\\\x' + binascii.hexlify(raw).decode('ascii')
+    return (
+        raw.replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def load_ndjson(model, field_name, fp, batch_size=None, using=None,
+                validate=True):
+    """
+    Insert one row per document of the NDJSON file ``fp`` into the table of
+    ``model``, setting ``field_name`` to the document encoded by the field.
+    The other columns must be nullable or have a database default.
+
+    Columns that normalize the documents (``jsonb``, the native MySQL
+    ``json``) get the lines as they are written in the file, only parsed
+    with ``validate``. Documents are sent by batches of ``batch_size``, with
+    ``COPY`` on PostgreSQL and multi-row ``INSERT`` statements elsewhere,
+    within a single transaction. Return the number of inserted rows.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    connection = connections[using]
+    field = model._meta.get_field(field_name)
+    values = iter_ndjson_values(
+        field, fp, validate=validate, encode=not field.normalized(connection)
+    )
+
+    batch_size = batch_size or 10000
+    if connection.vendor == 'postgresql':
+        insert_batch = copy_batch
+    else:
+        insert_batch = insert_rows_batch
+        # Stay under the query parameters limit of the database.
+        batch_size = max(min(
+            batch_size,
+            connection.ops.bulk_batch_size([field], range(batch_size))
+        ), 1)
+
+    count = 0
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            while True:
+                batch = list(islice(values, batch_size))
+                if not batch:
+                    break
+                insert_batch(cursor, connection, model, field, batch)
+                count += len(batch)
+    return count
+
+
+def copy_batch(cursor, connection, model, field, batch):
+    qn = connection.ops.quote_name
+    data = io.StringIO(
+        '\n'.join(copy_escape(raw) for raw in batch) + '\n'
+    )
+    cursor.copy_expert(
+        'COPY %s (%s) FROM STDIN' % (
+            qn(model._meta.db_table), qn(field.column)
+        ),
+        data
+    )
+
+
+def insert_rows_batch(cursor, connection, model, field, batch):
+    qn = connection.ops.quote_name
+    cursor.execute(
+        'INSERT INTO %s (%s) VALUES %s' % (
+            qn(model._meta.db_table),
+            qn(field.column),
+            ', '.join(['(%s)'] * len(batch)),
+        ),
+        [
+            connection.Database.Binary(raw) if isinstance(raw, bytes)
+            else raw
+            for raw in batch
+        ]
+    )
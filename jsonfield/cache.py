@@ -0,0 +1,74 @@
+"""
+Cache of the documents decoded by a ``JSONField``.
+
+``JSONField(decode_cache=256)`` decodes each distinct stored value once, as
+long as it stays among the 256 most recently read ones. Rows holding the same
+document then share a single frozen value (see ``jsonfield.frozen``), so
+callers can't modify the cached entries.
+"""
+import threading
+from collections import OrderedDict
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .frozen import freeze
+
+DEFAULT_SIZE = 128
+
+
+class DecodeCache(object):
+    """
+    Least recently used cache of the frozen values of serialized documents.
+    Entries are looked up by the serialized value itself: its hash is
+    computed once by Python, and comparing equal strings is cheap.
+    """
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, raw, loads):
+        """
+        Return the frozen value of ``raw``, decoded by ``loads`` if it is not
+        cached.
+        """
+        with self._lock:
+            try:
+                value = self._values.pop(raw)
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._values[raw] = value
+                return value
+
+        value = freeze(loads(raw))
+        with self._lock:
+            self._values[raw] = value
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self.hits = self.misses = 0
+
+
+def get_decode_cache(size):
+    """
+    Return a ``DecodeCache`` of ``size`` entries, ``True`` meaning the
+    default size. ``None`` and ``False`` disable the cache.
+    """
+    if size is None or size is False:
+        return None
+    if size is True:
+        size = DEFAULT_SIZE
+    if size < 1:
+        raise ImproperlyConfigured('decode_cache must be a positive size.')
+    return DecodeCache(size)
@@ -0,0 +1,225 @@
+"""
+Compression of large ``JSONField`` documents.
+
+``JSONField(compress='zlib', compress_threshold=1024)`` compresses the
+serialized documents of at least ``compress_threshold`` bytes. A header
+naming the codec tells compressed values apart from plain ones, so both can
+live in the same column:
+
+* text storage: ``~zlib~`` followed by the base64 of the compressed UTF-8
+  text, ``~`` never starting a JSON document;
+* binary storage: ``\\x00zlib\\x00`` followed by the compressed bytes.
+
+Each field collects ``CompressionStats``.
+"""
+import base64
+import zlib
+from timeit import default_timer
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .utils import resolve_object_from_path, string_types
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+class Codec(object):
+    """
+    Compression algorithm. Subclasses implement ``compress`` and
+    ``decompress``, working on bytes.
+    """
+    name = None
+    available = False
+
+    def compress(self, data):
+        raise NotImplementedError
+
+    def decompress(self, data):
+        raise NotImplementedError
+
+
+class ZlibCodec(Codec):
+    name = 'zlib'
+    available = True
+    level = 6
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+
+class ZstdCodec(Codec):
+    name = 'zstd'
+    available = zstandard is not None
+    level = 3
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(self, data):
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+class LZ4Codec(Codec):
+    name = 'lz4'
+    available = lz4_frame is not None
+
+    def compress(self, data):
+        return lz4_frame.compress(data)
+
+    def decompress(self, data):
+        return lz4_frame.decompress(data)
+
+
+CODECS = {
+    codec.name: codec for codec in (ZlibCodec, ZstdCodec, LZ4Codec)
+}
+
+_codecs = {}
+
+
+def get_codec(codec):
+    """
+    Return a codec instance from a name, a dotted path, a class or an
+    instance. ``True`` means zlib, ``None`` and ``False`` no compression.
+    """
+    if codec is None or codec is False or isinstance(codec, Codec):
+        return codec or None
+    if codec is True:
+        codec = ZlibCodec.name
+
+    if isinstance(codec, string_types):
+        codec = CODECS.get(codec, codec)
+    codec = resolve_object_from_path(codec)
+
+    if not codec.available:
+        raise ImproperlyConfigured(
+            'The %s compression codec is not installed.' % codec.name
+        )
+    return codec()
+
+
+def get_codec_by_name(name):
+    # Codec of a stored value, which may not be the one of the field.
+    try:
+        return _codecs[name]
+    except KeyError:
+        codec = _codecs[name] = get_codec(CODECS[name])
+        return codec
+
+
+class CompressionStats(object):
+    """
+    Counters of a field: values compressed, values stored uncompressed
+    (below the threshold or not getting smaller), bytes before and after
+    compression, values decompressed and time spent in each direction.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.compressed = 0
+        self.uncompressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_time = 0.0
+        self.decompressed = 0
+        self.decompress_time = 0.0
+
+    @property
+    def ratio(self):
+        """
+        Compressed size over original size of the compressed values.
+        """
+        if not self.bytes_in:
+            return None
+        return float(self.bytes_out) / self.bytes_in
+
+    def as_dict(self):
+        return {
+            'compressed': self.compressed,
+            'uncompressed': self.uncompressed,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': self.ratio,
+            'compress_time': self.compress_time,
+            'decompressed': self.decompressed,
+            'decompress_time': self.decompress_time,
+        }
+
+
+def compress(value, codec, threshold=0, stats=None):
+    """
+    Compress the serialized ``value``, text or bytes, with ``codec`` if it
+    is at least ``threshold`` bytes long and gets smaller. Return a value of
+    the same type.
+    """
+    binary = isinstance(value, bytes)
+    if len(value) < threshold:
+        # Text is at least as long in bytes as in characters.
+        if stats is not None:
+            stats.uncompressed += 1
+        return value
+
+    start = default_timer()
+    data = value if binary else value.encode('utf-8')
+    if len(data) < threshold:
+        compressed = None
+    else:
+        compressed = codec.compress(data)
+        if binary:
+            compressed = b'\x00' + codec.name.encode('ascii') + b'\x00' + \
+                compressed
+        else:
+            compressed = '~%s~%s' % (
+                codec.name, base64.b64encode(compressed).decode('ascii')
+            )
+        if len(compressed) >= len(value):
+            compressed = None
+
+    if stats is not None:
+        if compressed is None:
+            stats.uncompressed += 1
+        else:
+            stats.compressed += 1
+            stats.bytes_in += len(value)
+            stats.bytes_out += len(compressed)
+            stats.compress_time += default_timer() - start
+    return value if compressed is None else compressed
+
+
+def decompress(value, stats=None):
+    """
+    Return the serialized value stored as ``value``, which may be plain.
+    """
+    if isinstance(value, bytes):
+        if value[:1] != b'\x00' or len(value) == 1:
+            return value
+        start = default_timer()
+        end = value.index(b'\x00', 1)
+        codec = get_codec_by_name(value[1:end].decode('ascii'))
+        value = codec.decompress(value[end + 1:])
+    else:
+        if value[:1] != '~':
+            return value
+        start = default_timer()
+        end = value.index('~', 1)
+        codec = get_codec_by_name(value[1:end])
+        value = codec.decompress(
+            base64.b64decode(value[end + 1:])
+        ).decode('utf-8')
+
+    if stats is not None:
+        stats.decompressed += 1
+        stats.decompress_time += default_timer() - start
+    return value
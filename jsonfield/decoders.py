@@ -0,0 +1,103 @@
+"""
+Typed decoding: rebuild the values ``JSONEncoder`` turned into strings or
+numbers, by key name.
+
+``JSONField(decode_types={'created': datetime, 'price': Decimal})`` converts
+the values of every ``created`` and ``price`` key of the decoded documents,
+at any depth, in the ``object_hook`` of the decoder. The hooks are compiled
+once per set of types and shared between fields.
+"""
+import datetime
+import decimal
+import uuid
+
+from django.utils.dateparse import parse_date, parse_datetime, parse_time
+
+
+def decode_timedelta(value):
+    return datetime.timedelta(seconds=float(value))
+
+
+def decode_decimal(value):
+    # Decimals are stored as floats, str() gives their shortest repr.
+    return decimal.Decimal(str(value))
+
+
+DECODERS = {
+    datetime.datetime: parse_datetime,
+    datetime.date: parse_date,
+    datetime.time: parse_time,
+    datetime.timedelta: decode_timedelta,
+    decimal.Decimal: decode_decimal,
+    uuid.UUID: uuid.UUID,
+}
+
+_object_hooks = {}
+
+
+def convert(decoder, value):
+    """
+    Return ``value`` decoded, or unchanged when it can't be.
+    """
+    if value is None:
+        return value
+    try:
+        result = decoder(value)
+    except (TypeError, ValueError, ArithmeticError):
+        return value
+    return value if result is None else result
+
+
+def compile_object_hook(decode_types):
+    """
+    Return an ``object_hook`` converting the values of the keys of
+    ``decode_types``, mapping key names to a type of ``DECODERS`` or to any
+    callable taking the JSON value.
+    """
+    decoders = {
+        key: DECODERS.get(type_, type_)
+        for key, type_ in decode_types.items()
+    }
+    items = tuple(decoders.items())
+
+    def object_hook(obj):
+        # There are usually fewer typed keys than keys in the objects.
+        for key, decoder in items:
+            if key in obj:
+                obj[key] = convert(decoder, obj[key])
+        return obj
+
+    return object_hook
+
+
+def get_object_hook(decode_types):
+    """
+    Cached ``compile_object_hook()``.
+    """
+    cache_key = frozenset(decode_types.items())
+    try:
+        return _object_hooks[cache_key]
+    except KeyError:
+        hook = _object_hooks[cache_key] = compile_object_hook(decode_types)
+        return hook
+
+
+def chain_object_hooks(first, then):
+    def object_hook(obj):
+        return then(first(obj))
+    return object_hook
+
+
+def apply_object_hook(value, object_hook):
+    """
+    Apply ``object_hook`` to the objects of an already decoded value,
+    innermost first like the decoder does.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                value[key] = apply_object_hook(item, object_hook)
+        return object_hook(value)
+    if isinstance(value, list):
+        return [apply_object_hook(item, object_hook) for item in value]
+    return value
@@ -0,0 +1,227 @@
+import weakref
+
+from django.db import transaction
+from django.db.models import signals
+from django.db.models.expressions import Col
+from django.utils.functional import SimpleLazyObject, empty
+
+from .tracking import TrackedMixin
+
+# Instance attribute holding the fingerprints of the values loaded from, or
+# last saved to, the database.
+FINGERPRINTS_ATTR = '_jsonfield_fingerprints'
+# Instance attribute holding the tracked documents loaded from the database.
+TRACKED_ATTR = '_jsonfield_tracked'
+# Instance attribute holding the callbacks recording what a save wrote, run
+# once it is committed.
+PENDING_ATTR = '_jsonfield_pending'
+# Model class attribute set when fields of the model record their saves,
+# inherited by proxies and multi-table children.
+RECORD_SAVES_ATTR = '_jsonfield_record_saves'
+
+
+def fingerprint(raw):
+    """
+    Cheap fingerprint of a serialized value. ``hash()`` of a string is
+    computed once and cached by Python.
+    """
+    if raw is None:
+        return None
+    return (len(raw), hash(raw))
+
+
+def get_fingerprint(instance, attname):
+    return instance.__dict__.get(FINGERPRINTS_ATTR, {}).get(attname)
+
+
+def set_fingerprint(instance, attname, raw):
+    fingerprints = instance.__dict__.setdefault(FINGERPRINTS_ATTR, {})
+    fingerprints[attname] = fingerprint(raw)
+
+
+def clear_fingerprint(instance, attname):
+    instance.__dict__.get(FINGERPRINTS_ATTR, {}).pop(attname, None)
+
+
+def add_pending(instance, callback):
+    """
+    Run ``callback`` once the save in progress is committed. Nothing is
+    recorded if the save fails or its transaction is rolled back, so the
+    instance still knows what the database holds.
+    """
+    instance.__dict__.setdefault(PENDING_ATTR, []).append(callback)
+
+
+def clear_pending(sender, instance, **kwargs):
+    # pre_save receiver: forget the callbacks of a save that failed, or of
+    # a bulk_create() that sent no post_save signal.
+    instance.__dict__.pop(PENDING_ATTR, None)
+
+
+def commit_pending(sender, instance, using, **kwargs):
+    # post_save receiver.
+    for callback in instance.__dict__.pop(PENDING_ATTR, ()):
+        transaction.on_commit(callback, using=using)
+
+
+def record_saves(cls):
+    """
+    Connect the save receivers of the pending callbacks for ``cls`` and its
+    subclasses, once they are prepared.
+    """
+    setattr(cls, RECORD_SAVES_ATTR, True)
+
+
+def connect_pending(sender, **kwargs):
+    # class_prepared receiver. The saves of a child model send the signals
+    # for the child only, even for the fields of its parents.
+    if getattr(sender, RECORD_SAVES_ATTR, False) and not sender._meta.abstract:
+        signals.pre_save.connect(clear_pending, sender=sender)
+        signals.post_save.connect(commit_pending, sender=sender)
+
+
+def get_tracked(instance, attname):
+    """
+    Return the value of ``attname`` if it is the tracked document loaded
+    from the database, not replaced since.
+    """
+    value = instance.__dict__.get(attname)
+    tracked = instance.__dict__.get(TRACKED_ATTR, {}).get(attname)
+    # Copies and pickles of the instance hold plain containers.
+    if tracked is value and isinstance(value, TrackedMixin):
+        return value
+    return None
+
+
+def set_tracked(instance, attname, value):
+    value._instance = weakref.ref(instance)
+    instance.__dict__.setdefault(TRACKED_ATTR, {})[attname] = value
+
+
+def loaded_for_row(value, instance):
+    """
+    Return whether the tracked document ``value`` was loaded into another
+    instance of the row of ``instance``, as ``refresh_from_db()`` does.
+    """
+    owner = value._instance() if value._instance is not None else None
+    return (
+        owner is not None and owner is not instance and
+        owner.pk is not None and owner.pk == instance.pk and
+        owner._meta.concrete_model is instance._meta.concrete_model and
+        owner._state.db == instance._state.db
+    )
+
+
+def clear_tracked(instance, attname):
+    instance.__dict__.get(TRACKED_ATTR, {}).pop(attname, None)
+
+
+class RawJSON(object):
+    """
+    Already serialized value, written to the database as it is.
+    """
+    __slots__ = ('raw',)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def __repr__(self):
+        return '<RawJSON: %r>' % (self.raw,)
+
+
+class LazyJSON(SimpleLazyObject):
+    """
+    Value loaded into a model instance by a ``lazy=True`` JSONField.
+
+    It keeps the serialized string in ``raw`` and behaves like the decoded
+    value, which is only computed the first time it is used. Model instances
+    never expose it: ``JSONDescriptor`` replaces it with the decoded value on
+    attribute access.
+    """
+    def __init__(self, raw, loads):
+        self.__dict__['raw'] = raw
+        super(LazyJSON, self).__init__(lambda: loads(raw))
+
+    @property
+    def is_decoded(self):
+        return self._wrapped is not empty
+
+    def decode(self):
+        if self._wrapped is empty:
+            self._setup()
+        return self._wrapped
+
+    def __repr__(self):
+        if self._wrapped is empty:
+            return '<LazyJSON: %r>' % (self.raw,)
+        return repr(self._wrapped)
+
+
+class JSONDescriptor(object):
+    """
+    Attribute of a lazy or ``track_changes`` JSONField on the model class.
+
+    Instances hold the ``LazyJSON`` returned by ``from_db_value`` until the
+    attribute is read, at which point it is decoded and replaced by the
+    decoded value. Deferred loading is delegated to the descriptor Django
+    installed for the field.
+
+    The fingerprint of the loaded string, or the loaded tracked document, is
+    remembered so ``JSONField.has_changed()`` can tell whether the value was
+    modified.
+    """
+    def __init__(self, field, deferred=None):
+        self.field = field
+        self.deferred = deferred
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        data = instance.__dict__
+        attname = self.field.attname
+        if attname not in data and self.deferred is not None:
+            return self.deferred.__get__(instance, cls)
+
+        value = data[attname]
+        if isinstance(value, LazyJSON):
+            value = data[attname] = value.decode()
+        return value
+
+    def __set__(self, instance, value):
+        data = instance.__dict__
+        attname = self.field.attname
+        # The first assignment is done by Model.__init__ when loading a row.
+        loading = attname not in data
+        if (loading and isinstance(value, LazyJSON) and
+                not value.is_decoded):
+            set_fingerprint(instance, attname, value.raw)
+        else:
+            clear_fingerprint(instance, attname)
+        if (not isinstance(value, LazyJSON) and
+                isinstance(value, TrackedMixin) and value._parent is None and
+                (loading or loaded_for_row(value, instance))):
+            set_tracked(instance, attname, value)
+        else:
+            clear_tracked(instance, attname)
+        data[attname] = value
+
+
+class LazyCol(Col):
+    """
+    Column of a ``lazy=True`` JSONField. Only the values loaded into model
+    instances are lazy: ``values()`` and ``values_list()`` get decoded ones.
+    """
+    lazy = True
+
+    def select_format(self, compiler, sql, params):
+        # Called by the compiler for each selected column, before it gets
+        # their converters. Model instances are loaded from the default
+        # columns, built for each query.
+        self.lazy = compiler.query.default_cols
+        return super(LazyCol, self).select_format(compiler, sql, params)
+
+    def get_db_converters(self, connection):
+        if self.target == self.output_field:
+            return self.target.get_db_converters(connection, lazy=self.lazy)
+        return super(LazyCol, self).get_db_converters(connection)
@@ -36,45 +36,162 @@ from django.utils import timezone
 from django.utils.encoding import force_text
 from django.utils.functional import Promise
 
+from .descriptors import LazyJSON
+
+try:
+    from enum import Enum
+except ImportError:
+    Enum = None
+
+
+def encode_datetime(obj):
+    # For Date Time string spec, see ECMA 262
+    # http://ecma-international.org/ecma-262/5.1/#sec-15.9.1.15
+    representation = obj.isoformat()
+    if obj.microsecond:
+        representation = representation[:23] + representation[26:]
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+def encode_date(obj):
+    return obj.isoformat()
+
+
+def encode_time(obj):
+    if timezone and timezone.is_aware(obj):
+        raise ValueError("JSON can't represent timezone-aware times.")
+    representation = obj.isoformat()
+    if obj.microsecond:
+        representation = representation[:12]
+    return representation
+
+
+def encode_timedelta(obj):
+    return force_text(obj.total_seconds())
+
+
+def encode_decimal(obj):
+    # Serializers will coerce decimals to strings by default.
+    return float(obj)
+
+
+def encode_enum(obj):
+    return obj.value
+
+
+class EncoderRegistry(object):
+    """
+    Functions encoding the types JSON doesn't know about, keyed by type.
+
+    Subclasses of a registered type use the function of their closest
+    registered ancestor, as resolved once along the MRO and then cached.
+    """
+    def __init__(self, encoders=None):
+        self.encoders = dict(encoders or {})
+        self.cache = {}
+        self.overrides_cache = {}
+
+    def register(self, type_, func=None):
+        """
+        Encode instances of ``type_`` with ``func``, which returns a value
+        JSON can represent. Usable as a decorator when ``func`` is omitted.
+        """
+        if func is None:
+            return lambda func: self.register(type_, func)
+        self.encoders[type_] = func
+        self.cache.clear()
+        self.overrides_cache.clear()
+        return func
+
+    def unregister(self, type_):
+        del self.encoders[type_]
+        self.cache.clear()
+        self.overrides_cache.clear()
+
+    def get(self, cls):
+        """
+        Return the function encoding instances of ``cls``, or ``None``.
+        """
+        try:
+            return self.cache[cls]
+        except KeyError:
+            pass
+
+        func = None
+        for base in cls.__mro__:
+            if base in self.encoders:
+                func = self.encoders[base]
+                break
+        self.cache[cls] = func
+        return func
+
+    def overrides(self, types):
+        """
+        Return whether instances of the tuple of ``types``, or of their
+        subclasses, are encoded otherwise than with ``DEFAULT_ENCODERS``.
+        """
+        try:
+            return self.overrides_cache[types]
+        except KeyError:
+            pass
+
+        result = any(
+            self.get(type_) is not DEFAULT_ENCODERS.get(type_)
+            for type_ in set(self.encoders).union(types)
+            if issubclass(type_, types)
+        )
+        self.overrides_cache[types] = result
+        return result
+
+    def copy(self):
+        return EncoderRegistry(self.encoders)
+
+
+DEFAULT_ENCODERS = {
+    Promise: force_text,
+    datetime.datetime: encode_datetime,
+    datetime.date: encode_date,
+    datetime.time: encode_time,
+    datetime.timedelta: encode_timedelta,
+    decimal.Decimal: encode_decimal,
+    uuid.UUID: force_text,
+    QuerySet: tuple,
+}
+if Enum is not None:
+    DEFAULT_ENCODERS[Enum] = encode_enum
+
+registry = EncoderRegistry(DEFAULT_ENCODERS)
+register = registry.register
+unregister = registry.unregister
+
 
 class JSONEncoder(json.JSONEncoder):
     """
     JSONEncoder subclass that knows how to encode date/time/timedelta,
     decimal types, generators and other basic python objects.
 
+    Types are looked up in ``registry``, see ``register()``; objects of
+    other types are encoded according to the protocols they implement.
+    Fast serializer backends call ``default`` too, so they share the
+    registry.
+
     Taken from https://github.com/tomchristie/django-rest-framework/blob/master/rest_framework/utils/encoders.py
     """  # noqa
-    def default(self, obj):  # noqa
-        # For Date Time string spec, see ECMA 262
-        # http://ecma-international.org/ecma-262/5.1/#sec-15.9.1.15
-        if isinstance(obj, Promise):
-            return force_text(obj)
-        elif isinstance(obj, datetime.datetime):
-            representation = obj.isoformat()
-            if obj.microsecond:
-                representation = representation[:23] + representation[26:]
-            if representation.endswith('+00:00'):
-                representation = representation[:-6] + 'Z'
-            return representation
-        elif isinstance(obj, datetime.date):
-            return obj.isoformat()
-        elif isinstance(obj, datetime.time):
-            if timezone and timezone.is_aware(obj):
-                raise ValueError("JSON can't represent timezone-aware times.")
-            representation = obj.isoformat()
-            if obj.microsecond:
-                representation = representation[:12]
-            return representation
-        elif isinstance(obj, datetime.timedelta):
-            return force_text(obj.total_seconds())
-        elif isinstance(obj, decimal.Decimal):
-            # Serializers will coerce decimals to strings by default.
-            return float(obj)
-        elif isinstance(obj, uuid.UUID):
-            return force_text(obj)
-        elif isinstance(obj, QuerySet):
-            return tuple(obj)
-        elif hasattr(obj, 'tolist'):
+    registry = registry
+
+    def default(self, obj):
+        if isinstance(obj, LazyJSON):
+            # Read from the dict of an instance; decoded here rather than by
+            # the dict() fallback, which also misses lists and scalars.
+            return obj.decode()
+
+        func = self.registry.get(type(obj))
+        if func is not None:
+            return func(obj)
+
+        if hasattr(obj, 'tolist'):
             # Numpy arrays and array scalars.
             return obj.tolist()
         elif hasattr(obj, '__getitem__'):
@@ -0,0 +1,268 @@
+"""
+Expressions changing part of a ``JSONField`` document in the database, for
+``QuerySet.update()``::
+
+    Order.objects.filter(pk=pk).update(data=JSONSet('data', 'status', 'paid'))
+
+* ``JSONSet(field, path, value)`` sets the value found under ``path``;
+* ``JSONRemove(field, *paths)`` removes keys or array items;
+* ``JSONMerge(field, patch)`` sets each top-level key of the ``patch``
+  object;
+* ``JSONPatch(field, value, paths)`` writes the changed paths of a document.
+
+Paths are written like key transforms, ``'a__b__0'``, or as a sequence of
+object keys (strings) and array indexes (integers). Documents are not loaded
+nor re-encoded: they are compiled to ``jsonb_set``, ``#-`` and ``||`` on
+PostgreSQL, and to ``JSON_SET`` and ``JSON_REMOVE`` on MySQL and SQLite.
+``NULL`` documents are considered empty objects.
+"""
+from __future__ import unicode_literals
+
+import json
+
+from django.core.exceptions import FieldError
+from django.db.models import F
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import Expression
+from django.db.utils import NotSupportedError
+from django.utils.encoding import force_text
+
+from .features import check_json_functions
+from .lookups import jsonb_sql
+from .tracking import MISSING, resolve
+from .utils import string_types
+
+
+def get_path(path):
+    """
+    Return the keys of ``path``, a ``__``-separated string where numbers are
+    array indexes, or a sequence.
+    """
+    if isinstance(path, string_types):
+        return [
+            int(key) if key.isdigit() else key
+            for key in path.split(LOOKUP_SEP)
+        ]
+    return list(path)
+
+
+def compile_path(keys):
+    """
+    Return the MySQL/SQLite JSON path of ``keys``. Unlike the paths of key
+    transforms, only integers are array indexes.
+    """
+    return '$' + ''.join(
+        '[%d]' % key if isinstance(key, int) else '.' + json.dumps(
+            force_text(key)
+        )
+        for key in keys
+    )
+
+
+def postgres_path(keys):
+    # Numbers index arrays and name keys of objects alike.
+    return [force_text(key) for key in keys]
+
+
+class JSONUpdateExpression(Expression):
+    """
+    Expression computing a new document from the one of ``expression``, a
+    ``JSONField`` name or expression. Subclasses implement ``compile()``,
+    applying their changes to the SQL of the document with ``set_sql()`` and
+    ``remove_sql()``; ``default`` replaces ``NULL`` documents.
+    """
+    default = None
+
+    def __init__(self, expression):
+        super(JSONUpdateExpression, self).__init__()
+        if isinstance(expression, string_types):
+            expression = F(expression)
+        self.expression = expression
+
+    def get_source_expressions(self):
+        return [self.expression]
+
+    def set_source_expressions(self, exprs):
+        self.expression, = exprs
+
+    def resolve_expression(self, *args, **kwargs):
+        resolved = super(JSONUpdateExpression, self).resolve_expression(
+            *args, **kwargs
+        )
+        if getattr(resolved.expression.output_field, 'opaque', False):
+            raise FieldError(
+                '%s cannot change binary or compressed documents.' %
+                self.__class__.__name__
+            )
+        return resolved
+
+    def dumps(self, value):
+        field = self.expression.output_field
+        return field.backend.dumps(
+            value, **dict(field.encoder_kwargs, indent=None)
+        )
+
+    def process_lhs(self, compiler, connection):
+        lhs, params = compiler.compile(self.expression)
+        if self.default is not None:
+            lhs = "COALESCE(%s, '%s')" % (lhs, self.default)
+        return lhs, list(params)
+
+    def process_jsonb_lhs(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        return jsonb_sql(connection, lhs, self.output_field), params
+
+    def cast_from_jsonb(self, sql, connection):
+        # Back to the type of the column.
+        db_type = self.output_field.db_type(connection)
+        if db_type == 'jsonb':
+            return sql
+        return '(%s)::%s' % (sql, db_type)
+
+    def set_sql(self, connection, sql, path, value):
+        if connection.vendor == 'postgresql':
+            return (
+                'JSONB_SET(%s, %%s, %%s::jsonb, true)' % sql,
+                [postgres_path(path), self.dumps(value)]
+            )
+        if connection.vendor == 'mysql':
+            template = 'JSON_SET(%s, %%s, CAST(%%s AS JSON))'
+        else:
+            template = 'JSON_SET(%s, %%s, JSON(%%s))'
+        return template % sql, [compile_path(path), self.dumps(value)]
+
+    def remove_sql(self, connection, sql, path):
+        if connection.vendor == 'postgresql':
+            return '(%s #- %%s)' % sql, [postgres_path(path)]
+        return 'JSON_REMOVE(%s, %%s)' % sql, [compile_path(path)]
+
+    def compile(self, connection, sql, params):
+        raise NotImplementedError
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(
+            '%s is not supported on %s.' % (
+                self.__class__.__name__, connection.vendor
+            )
+        )
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = self.process_jsonb_lhs(compiler, connection)
+        sql, params = self.compile(connection, sql, params)
+        return self.cast_from_jsonb(sql, connection), params
+
+    def as_mysql(self, compiler, connection):
+        sql, params = self.process_lhs(compiler, connection)
+        return self.compile(connection, sql, params)
+
+    def as_sqlite(self, compiler, connection):
+        check_json_functions(connection, self.__class__.__name__)
+        return self.as_mysql(compiler, connection)
+
+
+class JSONSet(JSONUpdateExpression):
+    """
+    Set the value found under ``path``. Missing keys are only created at the
+    last level of the path.
+    """
+    default = '{}'
+
+    def __init__(self, expression, path, value):
+        super(JSONSet, self).__init__(expression)
+        self.path = get_path(path)
+        self.value = value
+
+    def compile(self, connection, sql, params):
+        sql, extra = self.set_sql(connection, sql, self.path, self.value)
+        return sql, params + extra
+
+
+class JSONRemove(JSONUpdateExpression):
+    """
+    Remove the keys or array items found under ``paths``, if any.
+    """
+    def __init__(self, expression, *paths):
+        super(JSONRemove, self).__init__(expression)
+        if not paths:
+            raise ValueError('JSONRemove takes at least one path.')
+        self.paths = [get_path(path) for path in paths]
+
+    def compile(self, connection, sql, params):
+        for path in self.paths:
+            sql, extra = self.remove_sql(connection, sql, path)
+            params.extend(extra)
+        return sql, params
+
+
+class JSONMerge(JSONUpdateExpression):
+    """
+    Set the top-level keys of the ``patch`` object, like the ``||``
+    operator of ``jsonb``: nested objects are replaced, not merged.
+    """
+    default = '{}'
+
+    def __init__(self, expression, patch):
+        super(JSONMerge, self).__init__(expression)
+        if not isinstance(patch, dict):
+            raise TypeError('JSONMerge takes an object.')
+        self.patch = patch
+
+    def compile(self, connection, sql, params):
+        # One JSON_SET per key, the keys being set in turn.
+        for key, value in self.patch.items():
+            sql, extra = self.set_sql(connection, sql, [key], value)
+            params.extend(extra)
+        return sql, params
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params = self.process_jsonb_lhs(compiler, connection)
+        sql = '%s || %%s::jsonb' % lhs
+        return (
+            self.cast_from_jsonb(sql, connection),
+            params + [self.dumps(self.patch)]
+        )
+
+
+class JSONPatch(JSONUpdateExpression):
+    """
+    Write the ``paths`` of ``value``, a document loaded from the expression
+    and changed since: each path is set to its value in the document, or
+    removed when missing. ``JSONField(track_changes=True)`` saves with it.
+
+    Databases without JSON functions get the whole document.
+    """
+    def __init__(self, expression, value, paths):
+        super(JSONPatch, self).__init__(expression)
+        self.value = value
+        self.paths = paths
+        self.default = '[]' if isinstance(value, list) else '{}'
+
+    def compile(self, connection, sql, params):
+        for path in self.paths:
+            value = resolve(self.value, path)
+            if value is MISSING:
+                sql, extra = self.remove_sql(connection, sql, path)
+            else:
+                sql, extra = self.set_sql(connection, sql, path, value)
+            params.extend(extra)
+        return sql, params
+
+    def as_sql(self, compiler, connection):
+        return '%s', [
+            self.output_field.get_db_prep_save(self.value, connection)
+        ]
+
+    def as_postgresql(self, compiler, connection):
+        if not self.paths:
+            return compiler.compile(self.expression)
+        return super(JSONPatch, self).as_postgresql(compiler, connection)
+
+    def as_mysql(self, compiler, connection):
+        if not self.paths:
+            return compiler.compile(self.expression)
+        return super(JSONPatch, self).as_mysql(compiler, connection)
+
+    def as_sqlite(self, compiler, connection):
+        if not self.paths:
+            return compiler.compile(self.expression)
+        return super(JSONPatch, self).as_sqlite(compiler, connection)
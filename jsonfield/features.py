@@ -0,0 +1,143 @@
+"""
+Detection of the native JSON support of the databases.
+
+``JSONField`` columns use the native JSON type of the database when there
+is one: ``jsonb`` on PostgreSQL, ``json`` on MySQL 5.7.8+ and MariaDB
+10.2.7+. ``settings.JSONFIELD_NATIVE_JSON = False`` keeps the ``longtext``
+columns of the previous versions on MySQL. SQLite needs the JSON1 extension
+for the lookups, aggregates and expressions.
+
+The results are computed once per connection.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.utils import NotSupportedError, OperationalError
+
+NATIVE_JSON_ATTR = '_jsonfield_native_json'
+JSON_FUNCTIONS_ATTR = '_jsonfield_json_functions'
+COLUMN_TYPES_ATTR = '_jsonfield_column_types'
+
+MYSQL_JSON_VERSION = (5, 7, 8)
+MARIADB_JSON_VERSION = (10, 2, 7)
+
+
+def supports_native_json(connection):
+    """
+    Return whether the database of ``connection`` can store and validate
+    JSON documents natively.
+    """
+    try:
+        return getattr(connection, NATIVE_JSON_ATTR)
+    except AttributeError:
+        pass
+    supported = detect_native_json(connection)
+    setattr(connection, NATIVE_JSON_ATTR, supported)
+    return supported
+
+
+def detect_native_json(connection):
+    if connection.vendor == 'postgresql':
+        return True
+    if not getattr(settings, 'JSONFIELD_NATIVE_JSON', True):
+        return False
+    if connection.vendor == 'mysql':
+        if connection.mysql_is_mariadb:
+            return connection.mysql_version >= MARIADB_JSON_VERSION
+        return connection.mysql_version >= MYSQL_JSON_VERSION
+    return False
+
+
+def supports_json_functions(connection):
+    """
+    Return whether the JSON functions of the database of ``connection`` are
+    available, which needs the JSON1 extension on SQLite.
+    """
+    if connection.vendor != 'sqlite':
+        return True
+    try:
+        return getattr(connection, JSON_FUNCTIONS_ATTR)
+    except AttributeError:
+        pass
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SELECT JSON('{}')")
+        except OperationalError:
+            supported = False
+        else:
+            supported = True
+    setattr(connection, JSON_FUNCTIONS_ATTR, supported)
+    return supported
+
+
+def check_json_functions(connection, name):
+    """
+    Raise ``NotSupportedError`` for ``name`` when the JSON functions of the
+    database are missing.
+    """
+    if not supports_json_functions(connection):
+        raise NotSupportedError(
+            '%s requires the JSON1 extension of SQLite.' % name
+        )
+
+
+def column_type(connection, table, column):
+    """
+    Return the type of an existing MySQL column, or ``None`` if it doesn't
+    exist yet. Columns created before the ``json`` type was used keep their
+    type until they are altered.
+
+    Looked up once per column and database connection: types are looked up
+    again after reconnecting, after ``migrate`` and after
+    ``clear_column_types()``.
+    """
+    key = (table, column)
+    cache = connection.__dict__.get(COLUMN_TYPES_ATTR)
+    if cache is not None and cache[0] is connection.connection:
+        types = cache[1]
+        try:
+            return types[key]
+        except KeyError:
+            pass
+    else:
+        types = {}
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT DATA_TYPE FROM information_schema.COLUMNS '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s '
+            'AND COLUMN_NAME = %s',
+            [table, column]
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    types[key] = row[0].lower()
+    # Cached along with the DB-API connection the types were read on.
+    connection.__dict__[COLUMN_TYPES_ATTR] = (connection.connection, types)
+    return types[key]
+
+
+def clear_column_types(connection):
+    """
+    Forget the column types looked up on ``connection``. Needed after
+    altering ``JSONField`` columns outside of ``migrate``.
+    """
+    connection.__dict__.pop(COLUMN_TYPES_ATTR, None)
+
+
+def clear_migrated_column_types(sender, using, **kwargs):
+    # Receiver of post_migrate.
+    clear_column_types(connections[using])
+
+
+def normalizes_json(connection, db_type):
+    """
+    Return whether columns of ``db_type`` store documents in the normalized
+    form of the database, rather than as the text they were written with.
+    ``json`` is an alias of ``longtext`` on MariaDB.
+    """
+    if connection.vendor == 'postgresql':
+        return db_type == 'jsonb'
+    if connection.vendor == 'mysql':
+        return db_type == 'json' and not connection.mysql_is_mariadb
+    return False
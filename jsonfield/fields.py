@@ -1,17 +1,45 @@
 from __future__ import unicode_literals
 
 import copy
-import json
+from functools import partial
 
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db import models
+from django.db.models import signals
 from django.db.models.lookups import Exact, IExact, In, Contains, IContains
+from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
+from . import instrumentation
+from .backends import get_backend
+from .cache import get_decode_cache
+from .compression import CompressionStats, compress, decompress, get_codec
+from .decoders import (
+    apply_object_hook, chain_object_hooks, get_object_hook,
+)
+from .descriptors import (
+    JSONDescriptor, LazyCol, LazyJSON, RawJSON, add_pending,
+    connect_pending,
+    fingerprint, get_fingerprint, get_tracked, record_saves,
+    set_fingerprint,
+)
 from .encoder import JSONEncoder
+from .expressions import JSONPatch
+from .features import (
+    clear_migrated_column_types, column_type, normalizes_json,
+    supports_native_json,
+)
 from .forms import JSONFormField
-from .utils import resolve_object_from_path
+from .frozen import freeze
+from .storage import get_storage_format, to_bytes
+from .tracking import commit_changes, prepare_changes, track
+from .schema import get_schema_validator
+from .lookups import (
+    HasAnyKeys, HasKey, HasKeys, JSONContainedBy, JSONContains,
+    KeyTransformFactory,
+)
+from .utils import resolve_object_from_path, string_types
 from .widgets import JSONWidget
 
 
@@ -24,26 +52,69 @@ class JSONField(models.Field):
         'invalid': _("Value must be valid JSON."),
     }
     description = "JSON object"
+    # Lookups supported when the database can't read the stored documents:
+    # binary storage format or compression.
+    opaque_lookups = ('exact', 'in', 'isnull')
 
     def __init__(self, *args, **kwargs):
         self.db_json_type = kwargs.pop('db_json_type', None)
+        self.backend = get_backend(kwargs.pop('backend', None))
+        self.lazy = kwargs.pop('lazy', False)
+        self.storage_format = get_storage_format(
+            kwargs.pop('storage_format', None)
+        )
+        self.compression = get_codec(kwargs.pop('compress', None))
+        self.compress_threshold = kwargs.pop('compress_threshold', 1024)
+        self.compression_stats = CompressionStats()
+        if self.compression is not None and self.db_json_type in (
+                'json', 'jsonb'):
+            raise ImproperlyConfigured(
+                'Compressed documents cannot be stored in a %s column.' %
+                self.db_json_type
+            )
+        self.schema_validator = get_schema_validator(
+            kwargs.pop('schema', None)
+        )
+        # Limits of the texts posted to the form field.
+        self.max_bytes = kwargs.pop('max_bytes', None)
+        self.max_depth = kwargs.pop('max_depth', None)
+        self.decode_cache = get_decode_cache(kwargs.pop('decode_cache', None))
+        self.frozen = kwargs.pop('frozen', False)
+        self.track_changes = kwargs.pop('track_changes', False)
+        if self.track_changes and (self.lazy or self.opaque or self.frozen or
+                                   self.decode_cache is not None):
+            raise ImproperlyConfigured(
+                'track_changes cannot be combined with lazy, a binary '
+                'storage_format, compression, decode_cache or frozen.'
+            )
+        self._db_converters = {}
 
         self.encoder_kwargs = self._encoder_kwargs(
             indent=kwargs.pop('indent', None),
             encoder_class=kwargs.pop('encoder_class', None)
         )
+        self.decode_types = kwargs.pop('decode_types', None)
         self.decoder_kwargs = self._decoder_kwargs(
-            decoder_kwargs=kwargs.pop('decoder_kwargs', None)
+            decoder_kwargs=kwargs.pop('decoder_kwargs', None),
+            decode_types=self.decode_types
         )
 
         super(JSONField, self).__init__(*args, **kwargs)
 
-    def _decoder_kwargs(self, decoder_kwargs=None):
+    def _decoder_kwargs(self, decoder_kwargs=None, decode_types=None):
         kwargs = dict(getattr(settings, 'JSONFIELD_DECODER_KWARGS', {}))
 
         if decoder_kwargs:
             kwargs.update(decoder_kwargs)
 
+        if decode_types:
+            object_hook = get_object_hook(decode_types)
+            if 'object_hook' in kwargs:
+                object_hook = chain_object_hooks(
+                    object_hook, kwargs['object_hook']
+                )
+            kwargs['object_hook'] = object_hook
+
         return kwargs
 
     def _encoder_kwargs(self, indent=None, encoder_class=None):
@@ -63,52 +134,344 @@ class JSONField(models.Field):
 
         return kwargs
 
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        super(JSONField, self).contribute_to_class(cls, name, *args, **kwargs)
+
+        if self.lazy or self.track_changes:
+            setattr(cls, self.attname, JSONDescriptor(
+                self, deferred=cls.__dict__.get(self.attname)
+            ))
+            record_saves(cls)
+
     def default_db_type(self, connection):
         if connection.vendor == 'postgresql':
             return 'jsonb'
+        if connection.vendor == 'mysql' and supports_native_json(connection):
+            return 'json'
+        return self.text_db_type(connection)
+
+    def text_db_type(self, connection):
         if connection.vendor == 'mysql':
             return 'longtext'
         if connection.vendor == 'oracle':
             return 'long'
         return 'text'
 
+    def binary_db_type(self, connection):
+        if connection.vendor == 'postgresql':
+            return 'bytea'
+        if connection.vendor == 'mysql':
+            return 'longblob'
+        return 'blob'
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(JSONField, self).deconstruct()
+        if self.storage_format is not None:
+            # Changes the column type.
+            kwargs['storage_format'] = self.storage_format.name
+        if self.compression is not None:
+            # Changes the column type on PostgreSQL.
+            kwargs['compress'] = self.compression.name
+        return name, path, args, kwargs
+
     def get_default(self):
         if self.has_default():
             if callable(self.default):
+                if self.frozen:
+                    return freeze(self.default())
                 return self.default()
+            if self.frozen:
+                # Immutable: shared by all the instances.
+                return self._frozen_default
             return copy.deepcopy(self.default)
 
         return super(JSONField, self).get_default()
 
+    @cached_property
+    def _frozen_default(self):
+        return freeze(self.default)
+
     def formfield(self, **kwargs):
         defaults = {
             'form_class': JSONFormField,
             'widget': JSONWidget
         }
         defaults.update(**kwargs)
-        return super(JSONField, self).formfield(**defaults)
+        if issubclass(defaults['form_class'], JSONFormField):
+            # The schema is checked by validate(), in the full_clean() of
+            # model forms.
+            defaults.setdefault('backend', self.backend)
+            defaults.setdefault('max_bytes', self.max_bytes)
+            defaults.setdefault('max_depth', self.max_depth)
+        field = super(JSONField, self).formfield(**defaults)
+        # Reported by the instrumentation.
+        field.source_field = field.widget.source_field = self
+        return field
+
+    @property
+    def opaque(self):
+        """
+        Whether the database can't read the stored documents.
+        """
+        return self.storage_format is not None or self.compression is not None
+
+    def get_lookup(self, lookup_name):
+        if self.opaque and lookup_name not in self.opaque_lookups:
+            return None
+        return super(JSONField, self).get_lookup(lookup_name)
+
+    def get_transform(self, name):
+        transform = super(JSONField, self).get_transform(name)
+        if transform or self.opaque:
+            return transform
+        return KeyTransformFactory(name)
 
     def get_internal_type(self):
+        if self.storage_format is not None:
+            return 'BinaryField'
         return 'TextField'
 
     def db_type(self, connection):
-        return self.db_json_type or self.default_db_type(connection)
+        if self.db_json_type:
+            return self.db_json_type
+        if self.storage_format is not None:
+            return self.binary_db_type(connection)
+        if self.compression is not None:
+            # Compressed documents are not valid JSON.
+            return self.text_db_type(connection)
+        return self.default_db_type(connection)
+
+    def decoded_by_driver(self, connection):
+        """
+        Whether the database driver returns decoded values: ``json`` and
+        ``jsonb`` columns on PostgreSQL. Other drivers return the text of
+        native JSON columns.
+        """
+        return (connection.vendor == 'postgresql' and
+                self.db_type(connection) in ('json', 'jsonb'))
+
+    def normalized(self, connection):
+        """
+        Whether the database stores the documents in its own normalized form
+        (``jsonb`` on PostgreSQL, ``json`` on MySQL), rather than as the text
+        they were written with.
+        """
+        db_type = self.db_type(connection)
+        if (connection.vendor == 'mysql' and db_type == 'json' and
+                getattr(self, 'model', None) is not None):
+            # The columns of previous versions are still longtext.
+            db_type = column_type(
+                connection, self.model._meta.db_table, self.column
+            ) or db_type
+        return normalizes_json(connection, db_type)
+
+    def get_col(self, alias, output_field=None):
+        if self.lazy and (output_field is None or output_field == self):
+            # Not cached: each query tells whether its values are lazy.
+            return LazyCol(alias, self)
+        return super(JSONField, self).get_col(alias, output_field)
+
+    def get_db_converters(self, connection, lazy=None):
+        # Called once per query: the decoding plan is only resolved once per
+        # database, leaving a single call per row.
+        lazy = self.lazy if lazy is None else lazy
+        try:
+            converter = self._db_converters[connection.alias, lazy]
+        except KeyError:
+            converter = self._get_db_converter(connection, lazy)
+            self._db_converters[connection.alias, lazy] = converter
+        if converter is None:
+            return []
+        if instrumentation.collectors:
+            converter = instrumentation.instrument('decode', self, converter)
+        return [converter]
+
+    def _get_db_converter(self, connection, lazy):
+        converter = self._get_decoder(connection, lazy)
+        if self.track_changes:
+            return partial(self._convert_tracked_value, converter)
+        if self.frozen and not lazy and self.decode_cache is None:
+            # Lazy and cached values are frozen when decoded.
+            converter = partial(self._convert_frozen_value, converter)
+        return converter
+
+    def _get_decoder(self, connection, lazy):
+        if self.decoded_by_driver(connection):
+            if self.decode_types:
+                return self._convert_decoded_value
+            return None
+        if lazy:
+            return self._convert_lazy_value
+        if self.decode_cache is not None:
+            return self._convert_cached_value
+        if self.opaque:
+            return self._convert_stored_value
+        return self._convert_value
+
+    def _convert_value(self, value, *args):
+        if value is None:
+            return value
+        return self.backend.loads(value, **self.decoder_kwargs)
+
+    def _convert_stored_value(self, value, *args):
+        if value is None:
+            return value
+        return self._loads(value)
+
+    def _convert_cached_value(self, value, *args):
+        if value is None:
+            return value
+        if self.storage_format is not None:
+            value = to_bytes(value)
+        return self._cached_loads(value)
+
+    def _convert_decoded_value(self, value, *args):
+        return apply_object_hook(value, self.decoder_kwargs['object_hook'])
+
+    def _convert_tracked_value(self, decode, value, *args):
+        if decode is not None:
+            value = decode(value)
+        return track(value)
+
+    def _convert_frozen_value(self, decode, value, *args):
+        if decode is not None:
+            value = decode(value)
+        return freeze(value)
+
+    def _convert_lazy_value(self, value, *args):
+        if value is None:
+            return value
+        if self.storage_format is not None:
+            value = to_bytes(value)
+        if self.decode_cache is not None:
+            return LazyJSON(value, self._cached_loads)
+        if self.frozen:
+            return LazyJSON(value, self._frozen_loads)
+        return LazyJSON(value, self._loads)
 
     def from_db_value(self, value, expression, connection, context=None):
-        if value is None or self.db_type(connection) in ('json', 'jsonb'):
+        converter = self._get_db_converter(connection, self.lazy)
+        if converter is None:
             return value
-        return json.loads(value, **self.decoder_kwargs)
+        return converter(value)
+
+    def _loads(self, value):
+        if self.storage_format is not None:
+            value = to_bytes(value)
+        if self.compression is not None:
+            value = decompress(value, self.compression_stats)
+        if self.storage_format is None:
+            return self.backend.loads(value, **self.decoder_kwargs)
+
+        value = self.storage_format.loads(value)
+        if 'object_hook' in self.decoder_kwargs:
+            value = apply_object_hook(
+                value, self.decoder_kwargs['object_hook']
+            )
+        return value
 
-    def get_db_prep_value(self, value, connection=None, prepared=None):
+    def _frozen_loads(self, value):
+        return freeze(self._loads(value))
+
+    def _cached_loads(self, value):
+        return self.decode_cache.get(value, self._loads)
+
+    def _dumps(self, value):
+        if self.storage_format is None:
+            data = self.backend.dumps(value, **self.encoder_kwargs)
+        else:
+            data = self.storage_format.dumps(
+                value, default=self.encoder_kwargs['cls']().default
+            )
+        if self.compression is not None:
+            data = compress(data, self.compression, self.compress_threshold,
+                            self.compression_stats)
+        return data
+
+    def _get_raw(self, model_instance):
+        # Serialized form of the value, reusing the loaded string when the
+        # value was never decoded.
+        value = model_instance.__dict__[self.attname]
+        if isinstance(value, LazyJSON) and not value.is_decoded:
+            return value.raw
         return self.get_prep_value(value)
 
+    def pre_save(self, model_instance, add):
+        if self.lazy and self.attname in model_instance.__dict__:
+            # Read the instance dict directly so an untouched value is
+            # written back as it was loaded, without being decoded.
+            raw = self._get_raw(model_instance)
+            add_pending(model_instance, partial(
+                set_fingerprint, model_instance, self.attname, raw
+            ))
+            return RawJSON(raw)
+
+        if self.track_changes and not add:
+            value = get_tracked(model_instance, self.attname)
+            if value is not None:
+                paths, changes = prepare_changes(value)
+                add_pending(model_instance, partial(
+                    commit_changes, value, changes
+                ))
+                if () not in paths:
+                    # Only send the changed paths.
+                    return JSONPatch(self.name, value, paths)
+
+        return super(JSONField, self).pre_save(model_instance, add)
+
+    def has_changed(self, model_instance):
+        """
+        Return whether the value of the instance differs from the one loaded
+        from, or last saved to, the database.
+
+        Only lazy fields, which remember the fingerprint of the strings they
+        loaded and of the values they saved once the save is committed, and
+        ``track_changes`` fields, whose values know their changes, can tell:
+        the values of other fields are always considered changed. A lazy
+        value that was never decoded is known to be unchanged without
+        serializing it.
+        """
+        if self.attname not in model_instance.__dict__:
+            # Deferred and never loaded.
+            return False
+
+        if not self.lazy and not self.track_changes:
+            return True
+
+        if self.track_changes:
+            value = get_tracked(model_instance, self.attname)
+            return value is None or bool(value.changes or value.uncommitted)
+
+        loaded = get_fingerprint(model_instance, self.attname)
+        if loaded is None:
+            return True
+        return fingerprint(self._get_raw(model_instance)) != loaded
+
+    def get_db_prep_value(self, value, connection=None, prepared=None):
+        value = self.get_prep_value(value)
+        if (self.storage_format is not None and value is not None and
+                connection is not None):
+            return connection.Database.Binary(value)
+        return value
+
     def get_prep_value(self, value):
         if self.null and value is None:
             return None
 
+        if isinstance(value, RawJSON):
+            return value.raw
+        if isinstance(value, LazyJSON):
+            if not value.is_decoded:
+                return value.raw
+            value = value.decode()
+
         try:
-            return json.dumps(value, **self.encoder_kwargs)
-        except (TypeError, ValueError):
+            if instrumentation.collectors:
+                return instrumentation.measure(
+                    'encode', self, self._dumps, value, output=True
+                )
+            return self._dumps(value)
+        except (TypeError, ValueError, OverflowError):
             raise ValidationError(
                 self.error_messages['invalid'],
                 code='invalid',
@@ -126,7 +489,27 @@ class JSONField(models.Field):
                 params={'value': value}
             )
 
-        return super(JSONField, self).validate(value, model_instance)
+        super(JSONField, self).validate(value, model_instance)
+        if self.schema_validator is not None and value is not None:
+            self.schema_validator(self._json_value(value))
+
+    def _json_value(self, value):
+        # The schema describes the JSON document: validate the value as it
+        # would be stored, decode_types serialized and frozen tuples as
+        # arrays.
+        if isinstance(value, LazyJSON):
+            value = value.decode()
+        if self.decode_types is None and not self.frozen:
+            return value
+        try:
+            data = self.backend.dumps(value, **self.encoder_kwargs)
+        except (TypeError, ValueError, OverflowError):
+            raise ValidationError(
+                self.error_messages['invalid'],
+                code='invalid',
+                params={'value': value}
+            )
+        return self.backend.loads(data)
 
 
 class NoPrepareMixin(object):
@@ -134,24 +517,51 @@ class NoPrepareMixin(object):
         return self.rhs
 
 
-class JSONFieldExactLookup(NoPrepareMixin, Exact):
+class NormalizedRhsMixin(object):
+    # Native MySQL json columns hold normalized documents, which never
+    # equal the text of the argument: compare them with JSON values.
+    def process_rhs(self, compiler, connection):
+        rhs, rhs_params = super(NormalizedRhsMixin, self).process_rhs(
+            compiler, connection
+        )
+        if (connection.vendor == 'mysql' and self.rhs_is_direct_value() and
+                self.lhs.output_field.normalized(connection)):
+            rhs = rhs % tuple(["JSON_EXTRACT(%s, '$')"] * len(rhs_params))
+        return rhs, rhs_params
+
+
+class JSONFieldExactLookup(NormalizedRhsMixin, NoPrepareMixin, Exact):
     pass
 
 
 class JSONFieldIExactLookup(NoPrepareMixin, IExact):
-    pass
+    def as_mysql(self, compiler, connection):
+        if not (self.rhs_is_direct_value() and
+                self.lhs.output_field.normalized(connection)):
+            return self.as_sql(compiler, connection)
+        # The normalized texts of the documents, rather than a LIKE pattern
+        # which isn't valid JSON once escaped.
+        lhs, params = self.process_lhs(compiler, connection)
+        rhs = self.rhs
+        if not isinstance(rhs, string_types):
+            rhs = self.lhs.output_field.get_prep_value(rhs)
+        return (
+            "LOWER(CAST(%s AS CHAR)) = "
+            "LOWER(CAST(JSON_EXTRACT(%%s, '$') AS CHAR))" % lhs,
+            list(params) + [rhs]
+        )
 
 
-class JSONFieldInLookup(NoPrepareMixin, In):
+class JSONFieldInLookup(NormalizedRhsMixin, NoPrepareMixin, In):
     pass
 
 
 class ContainsLookupMixin(object):
     def get_db_prep_lookup(self, value, connection):
-        # jsonb field uses ', ' & ': ' separators natively. So we need to
-        # conform to this when serializing the argument.
-        if self.lhs.output_field.db_type(connection) == 'jsonb':
-            value = json.dumps(value, **dict(
+        # jsonb and MySQL json fields use ', ' & ': ' separators natively. So
+        # we need to conform to this when serializing the argument.
+        if self.lhs.output_field.normalized(connection):
+            value = self.lhs.output_field.backend.dumps(value, **dict(
                 self.lhs.output_field.encoder_kwargs,
                 separators=(', ', ': ')
             ))
@@ -162,7 +572,25 @@ class ContainsLookupMixin(object):
 
 
 class JSONFieldContainsLookup(ContainsLookupMixin, Contains):
-    pass
+    def as_postgresql(self, compiler, connection):
+        # Objects are looked up with the jsonb containment operator, which
+        # GIN indexes support. Other values keep matching the serialized
+        # text for backward compatibility.
+        if (isinstance(self.rhs, dict) and
+                self.lhs.output_field.db_type(connection) == 'jsonb'):
+            return JSONContains(self.lhs, self.rhs).as_postgresql(
+                compiler, connection
+            )
+        return self.as_sql(compiler, connection)
+
+    def as_mysql(self, compiler, connection):
+        # Same as jsonb, with JSON_CONTAINS on native json columns.
+        if (isinstance(self.rhs, dict) and
+                self.lhs.output_field.normalized(connection)):
+            return JSONContains(self.lhs, self.rhs).as_mysql(
+                compiler, connection
+            )
+        return self.as_sql(compiler, connection)
 
 
 class JSONFieldIContainsLookup(ContainsLookupMixin, IContains):
@@ -174,3 +602,10 @@ JSONField.register_lookup(JSONFieldIExactLookup)
 JSONField.register_lookup(JSONFieldInLookup)
 JSONField.register_lookup(JSONFieldContainsLookup)
 JSONField.register_lookup(JSONFieldIContainsLookup)
+JSONField.register_lookup(JSONContainedBy)
+JSONField.register_lookup(HasKey)
+JSONField.register_lookup(HasKeys)
+JSONField.register_lookup(HasAnyKeys)
+
+signals.class_prepared.connect(connect_pending)
+signals.post_migrate.connect(clear_migrated_column_types)
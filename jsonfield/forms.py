@@ -1,27 +1,155 @@
-import json
+import re
 
 from django.forms import CharField, ValidationError
 from django.utils.encoding import force_text
+from django.utils.translation import ugettext_lazy as _
 
+from jsonfield import instrumentation
+from jsonfield.backends import get_backend
+from jsonfield.schema import get_schema_validator
 from jsonfield.utils import string_types
 from jsonfield.widgets import JSONWidget
 
+# Characters changing the nesting depth or the string state.
+_SPECIAL_RE = re.compile(r'[\[\]{}"\\]')
+
+
+def exceeds_bytes(text, max_bytes):
+    """
+    Return whether ``text`` is longer than ``max_bytes`` once encoded in
+    UTF-8, only encoding it when its length can't tell.
+    """
+    if len(text) > max_bytes:
+        return True
+    if len(text) * 4 <= max_bytes:
+        return False
+    return len(text.encode('utf-8')) > max_bytes
+
+
+def exceeds_depth(text, max_depth):
+    """
+    Return whether the JSON ``text`` nests objects and arrays more than
+    ``max_depth`` levels deep, scanning it once, up to the first level too
+    deep. Only brackets, quotes and backslashes are looked at, ignoring the
+    brackets within strings.
+    """
+    if text.count('[') + text.count('{') <= max_depth:
+        return False
+    depth = 0
+    in_string = False
+    # Position of the character escaped by the last backslash.
+    escaped = -1
+    for match in _SPECIAL_RE.finditer(text):
+        position = match.start()
+        if position == escaped:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped = position + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+            if depth > max_depth:
+                return True
+        elif char in ']}':
+            depth -= 1
+    return False
+
 
 class JSONFormField(CharField):
     empty_values = (None, '')
+    # Model field the form field was made for, if any.
+    source_field = None
+    default_error_messages = {
+        'max_bytes': _('Ensure the JSON text is at most %(max_bytes)d bytes.'),
+        'max_depth': _(
+            'Ensure the JSON value is nested at most %(max_depth)d levels '
+            'deep.'
+        ),
+    }
 
     def __init__(self, *args, **kwargs):
+        self.backend = get_backend(kwargs.pop('backend', None))
+        self.max_bytes = kwargs.pop('max_bytes', None)
+        self.max_depth = kwargs.pop('max_depth', None)
+        self.schema_validator = get_schema_validator(
+            kwargs.pop('schema', None)
+        )
         if 'widget' not in kwargs:
             kwargs['widget'] = JSONWidget
         super(JSONFormField, self).__init__(*args, **kwargs)
+        if isinstance(self.widget, JSONWidget):
+            self.widget.backend = self.backend
+        # Last text parsed by has_changed() and its value, handed over to the
+        # next to_python() of the same text. Values returned by to_python()
+        # may be modified, so has_changed() after clean() parses the text
+        # again. Form fields are copied for each form.
+        self._parsed = None
+
+    def __deepcopy__(self, memo):
+        result = super(JSONFormField, self).__deepcopy__(memo)
+        result._parsed = None
+        return result
 
     def to_python(self, value):
         if isinstance(value, string_types) and value:
-            try:
-                return json.loads(value)
-            except ValueError as exc:
-                raise ValidationError(
-                    'JSON decode error: %s' % (force_text(exc.args[0]),)
-                )
+            parsed, self._parsed = self._parsed, None
+            if parsed is not None and parsed[0] == value:
+                # Only returned once, as the caller may modify it.
+                return parsed[1]
+            return self.parse(value)
         else:
             return value
+
+    def has_changed(self, initial, data):
+        if self.disabled or not isinstance(data, string_types) or not data:
+            return super(JSONFormField, self).has_changed(initial, data)
+        if self._parsed is None or self._parsed[0] != data:
+            try:
+                self._parsed = (data, self.parse(data))
+            except ValidationError:
+                return True
+        # Only compared, so clean() can still take it.
+        initial = initial if initial is not None else ''
+        return initial != self._parsed[1]
+
+    def parse(self, value):
+        """
+        Parse the JSON text ``value``, after checking the limits.
+        """
+        self.check_limits(value)
+        try:
+            if instrumentation.collectors:
+                return instrumentation.measure(
+                    'parse', self, self.backend.loads, value
+                )
+            return self.backend.loads(value)
+        except ValueError as exc:
+            raise ValidationError(
+                'JSON decode error: %s' % (force_text(exc.args[0]),)
+            )
+
+    def check_limits(self, text):
+        """
+        Reject texts over ``max_bytes`` or ``max_depth`` before parsing them.
+        """
+        if self.max_bytes is not None and exceeds_bytes(text, self.max_bytes):
+            raise ValidationError(
+                self.error_messages['max_bytes'], code='max_bytes',
+                params={'max_bytes': self.max_bytes},
+            )
+        if self.max_depth is not None and exceeds_depth(text, self.max_depth):
+            raise ValidationError(
+                self.error_messages['max_depth'], code='max_depth',
+                params={'max_depth': self.max_depth},
+            )
+
+    def validate(self, value):
+        super(JSONFormField, self).validate(value)
+        if (self.schema_validator is not None and
+                value not in self.empty_values):
+            self.schema_validator(value)
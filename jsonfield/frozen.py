@@ -0,0 +1,64 @@
+"""
+Immutable JSON values.
+
+``freeze()`` turns decoded documents into ``FrozenDict`` and tuples, which
+can be shared safely between model instances, and ``thaw()`` turns them back
+into plain dictionaries and lists to be modified.
+"""
+
+
+class FrozenDict(dict):
+    """
+    Dictionary that cannot be modified. It is still a ``dict``, serialized
+    like one. Copies return the dictionary itself; ``dict(value)`` makes a
+    modifiable shallow copy.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('FrozenDict objects are immutable.')
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __repr__(self):
+        return 'FrozenDict(%s)' % dict.__repr__(self)
+
+
+def freeze(value):
+    """
+    Return ``value`` with its dictionaries and lists replaced by
+    ``FrozenDict`` and tuples.
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict(
+            (key, freeze(item)) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    Return a modifiable copy of ``value``, with plain dictionaries and lists.
+    """
+    if isinstance(value, dict):
+        return dict((key, thaw(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
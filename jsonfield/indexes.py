@@ -0,0 +1,184 @@
+"""
+Indexes on the content of a ``JSONField``, usable in ``Meta.indexes``:
+
+* ``JSONGinIndex`` indexes the whole document for the containment and key
+  lookups of PostgreSQL;
+* ``JSONKeyIndex`` indexes the value found under a path, for the key
+  transforms of ``jsonfield.lookups``.
+"""
+from __future__ import unicode_literals
+
+from django.db.models import Index
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import Expression
+from django.db.models.sql import Query
+from django.db.utils import NotSupportedError
+
+from .lookups import KeyTextTransform, KeyTransform, jsonb_sql
+
+
+class IndexColumn(Expression):
+    """
+    Column of the indexed table, not qualified with the table name as index
+    expressions only refer to the table they are created on.
+    """
+    def __init__(self, field):
+        super(IndexColumn, self).__init__(output_field=field)
+
+    def as_sql(self, compiler, connection):
+        return connection.ops.quote_name(self.output_field.column), []
+
+
+class JSONIndexMixin(object):
+    def get_field(self, model):
+        if len(self.fields) != 1:
+            raise ValueError(
+                '%s takes a single field.' % self.__class__.__name__
+            )
+        return model._meta.get_field(self.fields[0])
+
+    def not_supported(self, schema_editor):
+        return NotSupportedError(
+            '%s is not supported on %s.' % (
+                self.__class__.__name__, schema_editor.connection.vendor
+            )
+        )
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        return schema_editor.sql_delete_index % {
+            'table': schema_editor.quote_name(model._meta.db_table),
+            'name': schema_editor.quote_name(self.name),
+        }
+
+
+class JSONGinIndex(JSONIndexMixin, Index):
+    """
+    GIN index on the whole document, used by the ``contains``,
+    ``contained_by``, ``has_key``, ``has_keys`` and ``has_any_keys``
+    lookups. PostgreSQL only.
+
+    ``opclass='jsonb_path_ops'`` builds a smaller and faster index that only
+    supports ``contains``.
+    """
+    suffix = 'gin'
+    sql_create = 'CREATE INDEX %(name)s ON %(table)s USING gin (%(column)s)'
+
+    def __init__(self, *args, **kwargs):
+        self.opclass = kwargs.pop('opclass', None)
+        super(JSONGinIndex, self).__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super(JSONGinIndex, self).deconstruct()
+        if self.opclass is not None:
+            kwargs['opclass'] = self.opclass
+        return path, args, kwargs
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        connection = schema_editor.connection
+        if connection.vendor != 'postgresql':
+            raise self.not_supported(schema_editor)
+
+        field = self.get_field(model)
+        column = jsonb_sql(
+            connection, schema_editor.quote_name(field.column), field
+        )
+        if column != schema_editor.quote_name(field.column):
+            # Expressions need their own parentheses.
+            column = '(%s)' % column
+        if self.opclass:
+            column = '%s %s' % (column, self.opclass)
+        return self.sql_create % {
+            'name': schema_editor.quote_name(self.name),
+            'table': schema_editor.quote_name(model._meta.db_table),
+            'column': column,
+        }
+
+
+class JSONKeyIndex(JSONIndexMixin, Index):
+    """
+    B-tree index on the value found under ``path`` (``'a__b__0'``), as
+    compiled by the key transforms: ``the_json__a__b__0=...`` lookups use it.
+    With ``text=True`` the text value (``KeyTextTransform``) is indexed
+    instead of the JSON one, for filters on
+    ``key_transform('the_json__a__b__0', text=True)``; key lookups only use
+    it on SQLite, where both values are compiled alike.
+
+    PostgreSQL and SQLite index the expression itself. MySQL indexes a
+    generated virtual column, named after the index, and only supports
+    ``text=True``.
+    """
+    suffix = 'key'
+    sql_create = 'CREATE INDEX %(name)s ON %(table)s ((%(expression)s))'
+    sql_create_sqlite = 'CREATE INDEX %(name)s ON %(table)s (%(expression)s)'
+    sql_create_mysql = (
+        'ALTER TABLE %(table)s ADD COLUMN %(column)s %(type)s '
+        'AS (%(expression)s) VIRTUAL, ADD INDEX %(name)s (%(column)s)'
+    )
+    sql_delete_mysql = (
+        'ALTER TABLE %(table)s DROP INDEX %(name)s, DROP COLUMN %(column)s'
+    )
+    mysql_column_type = 'varchar(255)'
+
+    def __init__(self, *args, **kwargs):
+        self.path = kwargs.pop('path')
+        self.text = kwargs.pop('text', False)
+        super(JSONKeyIndex, self).__init__(*args, **kwargs)
+        if not self.name:
+            # Generated names only depend on the fields.
+            raise ValueError('A JSONKeyIndex must be named.')
+
+    def deconstruct(self):
+        path, args, kwargs = super(JSONKeyIndex, self).deconstruct()
+        kwargs['path'] = self.path
+        if self.text:
+            kwargs['text'] = True
+        return path, args, kwargs
+
+    @property
+    def column_name(self):
+        return '%s_value' % self.name
+
+    def get_expression(self, model):
+        keys = self.path.split(LOOKUP_SEP)
+        expression = IndexColumn(self.get_field(model))
+        for key in keys[:-1]:
+            expression = KeyTransform(key, expression)
+        transform = KeyTextTransform if self.text else KeyTransform
+        return transform(keys[-1], expression)
+
+    def get_expression_sql(self, model, schema_editor):
+        connection = schema_editor.connection
+        compiler = Query(model).get_compiler(connection=connection)
+        sql, params = compiler.compile(self.get_expression(model))
+        # The statement is executed without parameters, inline them.
+        return sql % tuple(schema_editor.quote_value(p) for p in params)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            sql = self.sql_create
+        elif vendor == 'sqlite':
+            sql = self.sql_create_sqlite
+        elif vendor == 'mysql' and self.text:
+            sql = self.sql_create_mysql
+        else:
+            raise self.not_supported(schema_editor)
+
+        return sql % {
+            'name': schema_editor.quote_name(self.name),
+            'table': schema_editor.quote_name(model._meta.db_table),
+            'column': schema_editor.quote_name(self.column_name),
+            'type': self.mysql_column_type,
+            'expression': self.get_expression_sql(model, schema_editor),
+        }
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != 'mysql':
+            return super(JSONKeyIndex, self).remove_sql(
+                model, schema_editor, **kwargs
+            )
+        return self.sql_delete_mysql % {
+            'name': schema_editor.quote_name(self.name),
+            'table': schema_editor.quote_name(model._meta.db_table),
+            'column': schema_editor.quote_name(self.column_name),
+        }
@@ -0,0 +1,199 @@
+"""
+Instrumentation of the JSON encoding and decoding done by the fields.
+
+Collectors registered with ``register_collector()`` are called for each:
+
+* ``encode``: ``JSONField.get_prep_value()``;
+* ``decode``: the conversion of the values read from the database;
+* ``parse``: the parsing of the text posted to a ``JSONFormField``;
+* ``format``: the encoding of a value rendered by a ``JSONWidget``.
+
+They receive the operation, the ``app_label.model.field`` label of the model
+field (the form fields made by ``JSONField.formfield()`` report it too), the
+size of the JSON text, in characters or bytes for binary storage, and the
+duration in seconds. Without any collector, the fields only check that the
+list is empty.
+"""
+import threading
+from timeit import default_timer
+
+from django.core.exceptions import ImproperlyConfigured
+from django.dispatch import Signal
+
+from .utils import string_types
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+# Sent by SignalCollector with the operation, field, size and duration.
+json_operation = Signal()
+
+DEFAULT_BUCKETS = (
+    0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, float('inf'),
+)
+
+collectors = []
+
+
+def register_collector(collector):
+    if collector not in collectors:
+        collectors.append(collector)
+
+
+def unregister_collector(collector):
+    if collector in collectors:
+        collectors.remove(collector)
+
+
+def field_label(field):
+    """
+    ``app_label.model.field`` label of a model field, or of the model field a
+    form field or widget was made for.
+    """
+    field = getattr(field, 'source_field', None) or field
+    model = getattr(field, 'model', None)
+    if model is None:
+        return getattr(field, 'name', None) or ''
+    return '%s.%s' % (model._meta.label_lower, field.name)
+
+
+def measure(operation, field, func, value, output=False):
+    """
+    Return ``func(value)``, reporting its duration and the size of ``value``,
+    or of the result with ``output=True``, to the collectors.
+    """
+    start = default_timer()
+    result = func(value)
+    duration = default_timer() - start
+    data = result if output else value
+    if isinstance(data, (string_types, bytes, memoryview)):
+        size = len(data)
+    else:
+        # Decoded by the database driver.
+        size = 0
+    label = field_label(field)
+    for collector in list(collectors):
+        collector.record(operation, label, size, duration)
+    return result
+
+
+def instrument(operation, field, func):
+    """
+    Wrap the converter ``func`` so its calls are measured.
+    """
+    def instrumented(value, *args):
+        if value is None:
+            return func(value, *args)
+        return measure(
+            operation, field, lambda value: func(value, *args), value
+        )
+    return instrumented
+
+
+class Collector(object):
+    """
+    Receives the measures. Subclasses implement ``record``.
+    """
+    def record(self, operation, field, size, duration):
+        raise NotImplementedError
+
+
+class Metric(object):
+    """
+    Calls, total size, total duration and cumulative duration histogram of
+    an operation on a field.
+    """
+    def __init__(self, buckets):
+        self.count = 0
+        self.size = 0
+        self.duration = 0.0
+        self.buckets = dict((bound, 0) for bound in buckets)
+
+    def add(self, size, duration):
+        self.count += 1
+        self.size += size
+        self.duration += duration
+        for bound in self.buckets:
+            if duration <= bound:
+                self.buckets[bound] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'size': self.size,
+            'duration': self.duration,
+            'buckets': sorted(self.buckets.items()),
+        }
+
+
+class MemoryCollector(Collector):
+    """
+    Keeps a ``Metric`` per ``(operation, field)`` in ``metrics``.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, field, size, duration):
+        with self._lock:
+            key = (operation, field)
+            metric = self.metrics.get(key)
+            if metric is None:
+                metric = self.metrics[key] = Metric(self.buckets)
+            metric.add(size, duration)
+
+    def reset(self):
+        with self._lock:
+            self.metrics = {}
+
+    def as_dict(self):
+        with self._lock:
+            return dict(
+                ('%s:%s' % key, metric.as_dict())
+                for key, metric in self.metrics.items()
+            )
+
+
+class SignalCollector(Collector):
+    """
+    Sends the ``json_operation`` signal for each measure.
+    """
+    def record(self, operation, field, size, duration):
+        json_operation.send(
+            sender=self.__class__, operation=operation, field=field,
+            size=size, duration=duration,
+        )
+
+
+class PrometheusCollector(Collector):
+    """
+    Exports the ``jsonfield_duration_seconds`` histogram and the
+    ``jsonfield_size_total`` counter, labelled by operation and field, with
+    ``prometheus_client``.
+    """
+    available = prometheus_client is not None
+
+    def __init__(self, registry=None, buckets=DEFAULT_BUCKETS):
+        if not self.available:
+            raise ImproperlyConfigured(
+                'PrometheusCollector requires prometheus_client.'
+            )
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        self.duration = prometheus_client.Histogram(
+            'jsonfield_duration_seconds',
+            'Time spent encoding and decoding JSON.',
+            ['operation', 'field'], registry=registry, buckets=buckets,
+        )
+        self.size = prometheus_client.Counter(
+            'jsonfield_size',
+            'Size of the JSON encoded and decoded.',
+            ['operation', 'field'], registry=registry,
+        )
+
+    def record(self, operation, field, size, duration):
+        self.duration.labels(operation, field).observe(duration)
+        self.size.labels(operation, field).inc(size)
@@ -0,0 +1,473 @@
+"""
+Key and index transforms for ``JSONField``, compiled to the native JSON
+functions of each database:
+
+* the ``#>``/``#>>`` path operators on PostgreSQL, casting text columns to
+  ``jsonb``;
+* ``JSON_EXTRACT`` on MySQL;
+* ``json_extract`` from the JSON1 extension on SQLite.
+
+``Model.objects.filter(data__a__b__0='foo')`` compares the JSON value found
+at ``a.b[0]`` with ``'foo'``.
+
+The containment and key lookups (``contained_by``, ``has_key``,
+``has_keys`` and ``has_any_keys``) use the ``jsonb`` operators on
+PostgreSQL, so GIN indexes apply, and the equivalent JSON functions of
+MySQL and SQLite where there are some.
+"""
+from __future__ import unicode_literals
+
+import copy
+import json
+import numbers
+
+from django.db.models import Lookup, Transform
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.lookups import (
+    Exact, FieldGetDbPrepValueMixin, GreaterThan, GreaterThanOrEqual, In,
+    LessThan, LessThanOrEqual,
+)
+from django.db.models.fields import TextField
+from django.db.utils import NotSupportedError
+from django.utils.encoding import force_text
+from django.utils.functional import cached_property
+
+from .features import check_json_functions
+
+
+def compile_json_path(key_transforms, include_root=True, ensure_ascii=False):
+    """
+    Return the MySQL/SQLite JSON path for a list of keys, integers being
+    array indexes. Keys are written as UTF-8 unless ``ensure_ascii``.
+    """
+    path = ['$'] if include_root else []
+    for key in key_transforms:
+        try:
+            index = int(key)
+        except ValueError:
+            path.append('.')
+            path.append(json.dumps(key, ensure_ascii=ensure_ascii))
+        else:
+            path.append('[%s]' % index)
+    return ''.join(path)
+
+
+def quote_sqlite_literal(value):
+    """
+    Quote a string constant for SQLite. Paths are inlined in the query so
+    the planner can match them against expression indexes; ``%`` is doubled
+    as the query still goes through Django's placeholder substitution.
+    """
+    return "'%s'" % value.replace("'", "''").replace('%', '%%')
+
+
+def sqlite_path_sql(function, lhs, key_transforms):
+    """
+    Return the SQL calling the SQLite JSON ``function`` with the document
+    ``lhs`` and the path of ``key_transforms``, and how many times ``lhs``
+    is used. SQLite compares keys with their text in the document, so
+    non-ASCII keys are looked up both as UTF-8 and as the ``\\uXXXX``
+    escapes ``JSONField`` writes by default.
+    """
+    paths = [compile_json_path(key_transforms)]
+    escaped = compile_json_path(key_transforms, ensure_ascii=True)
+    if escaped != paths[0]:
+        paths.append(escaped)
+    calls = [
+        '%s(%s, %s)' % (function, lhs, quote_sqlite_literal(path))
+        for path in paths
+    ]
+    if len(calls) == 1:
+        return calls[0], 1
+    return 'COALESCE(%s)' % ', '.join(calls), len(calls)
+
+
+def json_value_sql(connection, sql):
+    """
+    Wrap the SQL of a serialized value so it compares with the result of a
+    ``KeyTransform``.
+    """
+    if connection.vendor == 'postgresql':
+        return '%s::jsonb' % sql
+    if connection.vendor == 'mysql':
+        return 'CAST(%s AS JSON)' % sql
+    if connection.vendor == 'sqlite':
+        return "JSON_EXTRACT(%s, '$')" % sql
+    return sql
+
+
+def jsonb_sql(connection, sql, field):
+    """
+    Cast the SQL of a ``field`` value to ``jsonb`` unless it already is.
+    """
+    if field.db_type(connection) == 'jsonb':
+        return sql
+    return '(%s)::jsonb' % sql
+
+
+class BaseKeyTransform(Transform):
+    postgres_operator = None
+
+    def __init__(self, key_name, *args, **kwargs):
+        super(BaseKeyTransform, self).__init__(*args, **kwargs)
+        self.key_name = force_text(key_name)
+
+    def preprocess_lhs(self, compiler, connection):
+        key_transforms = [self.key_name]
+        previous = self.lhs
+        while isinstance(previous, KeyTransform):
+            key_transforms.insert(0, previous.key_name)
+            previous = previous.lhs
+        lhs, params = compiler.compile(previous)
+        return lhs, list(params), key_transforms, previous.output_field
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(
+            'JSON key transforms are not supported on %s.' % connection.vendor
+        )
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params, key_transforms, field = self.preprocess_lhs(
+            compiler, connection
+        )
+        lhs = jsonb_sql(connection, lhs, field)
+        params.append(key_transforms)
+        return '(%s %s %%s)' % (lhs, self.postgres_operator), params
+
+    def as_mysql(self, compiler, connection):
+        lhs, params, key_transforms, field = self.preprocess_lhs(
+            compiler, connection
+        )
+        params.append(compile_json_path(key_transforms))
+        return 'JSON_EXTRACT(%s, %%s)' % lhs, params
+
+    def as_sqlite(self, compiler, connection):
+        return self.sqlite_function('JSON_EXTRACT', compiler, connection)
+
+    def sqlite_function(self, function, compiler, connection):
+        """
+        Call the SQLite JSON ``function`` with the document and the path.
+        """
+        check_json_functions(connection, self.__class__.__name__)
+        lhs, params, key_transforms, field = self.preprocess_lhs(
+            compiler, connection
+        )
+        sql, count = sqlite_path_sql(function, lhs, key_transforms)
+        return sql, params * count
+
+
+class KeyTransform(BaseKeyTransform):
+    """
+    Value of the JSON document found under ``key_name``, itself a JSON
+    value. Nested transforms are compiled to a single path lookup.
+    """
+    postgres_operator = '#>'
+
+    @cached_property
+    def output_field(self):
+        # A copy of the source field, so values compared with the key are
+        # encoded the same way as the document itself.
+        field = copy.copy(self.lhs.output_field)
+        field.db_json_type = None
+        field.lazy = False
+        field.track_changes = False
+        field._db_converters = {}
+        return field
+
+    def sqlite_quote(self, compiler, sql, params):
+        """
+        Quote the SQL of this transform back to JSON text. SQLite returns
+        the scalars found under the key as SQL values, booleans as integers.
+        """
+        json_type, type_params = self.sqlite_function(
+            'JSON_TYPE', compiler, compiler.connection
+        )
+        sql = (
+            "CASE %s WHEN 'true' THEN 'true' "
+            "WHEN 'false' THEN 'false' ELSE JSON_QUOTE(%s) END" % (
+                json_type, sql
+            )
+        )
+        return sql, type_params + list(params)
+
+    def select_format(self, compiler, sql, params):
+        # Selected values are decoded by the field converters.
+        if compiler.connection.vendor == 'sqlite':
+            sql, params = self.sqlite_quote(compiler, sql, params)
+        return super(KeyTransform, self).select_format(compiler, sql, params)
+
+
+class KeyTextTransform(BaseKeyTransform):
+    """
+    Value found under ``key_name`` as SQL text, strings being unquoted.
+    """
+    postgres_operator = '#>>'
+    output_field = TextField()
+
+    def as_mysql(self, compiler, connection):
+        sql, params = super(KeyTextTransform, self).as_mysql(
+            compiler, connection
+        )
+        return 'JSON_UNQUOTE(%s)' % sql, params
+
+
+def key_transform(path, text=False):
+    """
+    Return the key transforms of ``path``, ``'field__key__0'``, the last
+    one being a ``KeyTextTransform`` if ``text``.
+    """
+    names = path.split(LOOKUP_SEP)
+    if len(names) < 2:
+        raise ValueError('%r is not the path of a key.' % path)
+    expression = names[0]
+    for key_name in names[1:-1]:
+        expression = KeyTransform(key_name, expression)
+    transform = KeyTextTransform if text else KeyTransform
+    return transform(names[-1], expression)
+
+
+class KeyTransformFactory(object):
+    def __init__(self, key_name):
+        self.key_name = key_name
+
+    def __call__(self, *args, **kwargs):
+        return KeyTransform(self.key_name, *args, **kwargs)
+
+
+class KeyTransformLookupMixin(object):
+    """
+    Compare the key with a value serialized by the field, converted to the
+    type the database uses for JSON values.
+    """
+    prepare_rhs = False
+
+    def process_rhs(self, compiler, connection):
+        rhs, rhs_params = super(KeyTransformLookupMixin, self).process_rhs(
+            compiler, connection
+        )
+        if self.rhs_is_direct_value():
+            rhs = json_value_sql(connection, rhs)
+        return rhs, rhs_params
+
+
+def is_number(value):
+    return (
+        isinstance(value, numbers.Number) and not isinstance(value, bool)
+    )
+
+
+def sqlite_typed_sql(lookup, compiler, connection, values, sql, params):
+    """
+    SQLite extracts JSON booleans as the integers 1 and 0: match the
+    booleans of ``values`` on the JSON type of the key, and exclude them
+    when ``sql`` compares the key with numbers.
+    """
+    booleans = [value for value in values if isinstance(value, bool)]
+    if not booleans and not any(is_number(value) for value in values):
+        return sql, params
+    json_type, type_params = lookup.lhs.sqlite_function(
+        'JSON_TYPE', compiler, connection
+    )
+    conditions, condition_params = [], []
+    if sql is not None:
+        conditions.append("(%s AND %s NOT IN ('true', 'false'))" % (
+            sql, json_type
+        ))
+        condition_params.extend(params)
+        condition_params.extend(type_params)
+    if booleans:
+        conditions.append('%s IN (%s)' % (json_type, ', '.join(sorted(
+            "'true'" if value else "'false'" for value in set(booleans)
+        ))))
+        condition_params.extend(type_params)
+    return '(%s)' % ' OR '.join(conditions), condition_params
+
+
+class KeyTransformExact(KeyTransformLookupMixin, Exact):
+    def as_sqlite(self, compiler, connection):
+        if not self.rhs_is_direct_value():
+            return self.as_sql(compiler, connection)
+        if isinstance(self.rhs, bool):
+            sql, params = None, []
+        else:
+            sql, params = self.as_sql(compiler, connection)
+        return sqlite_typed_sql(
+            self, compiler, connection, [self.rhs], sql, params
+        )
+
+
+class KeyTransformLessThan(KeyTransformLookupMixin, LessThan):
+    pass
+
+
+class KeyTransformLessThanOrEqual(KeyTransformLookupMixin, LessThanOrEqual):
+    pass
+
+
+class KeyTransformGreaterThan(KeyTransformLookupMixin, GreaterThan):
+    pass
+
+
+class KeyTransformGreaterThanOrEqual(KeyTransformLookupMixin,
+                                     GreaterThanOrEqual):
+    pass
+
+
+class KeyTransformIn(In):
+    prepare_rhs = False
+
+    def batch_process_rhs(self, compiler, connection, rhs=None):
+        sqls, params = super(KeyTransformIn, self).batch_process_rhs(
+            compiler, connection, rhs
+        )
+        return [json_value_sql(connection, sql) for sql in sqls], params
+
+    def as_sqlite(self, compiler, connection):
+        if not self.rhs_is_direct_value():
+            return self.as_sql(compiler, connection)
+        others = [value for value in self.rhs if not isinstance(value, bool)]
+        sql, params = None, []
+        if others or not self.rhs:
+            lookup = copy.copy(self)
+            lookup.rhs = others
+            sql, params = lookup.as_sql(compiler, connection)
+        return sqlite_typed_sql(
+            self, compiler, connection, self.rhs, sql, params
+        )
+
+
+class JSONLookup(Lookup):
+    """
+    Lookup compiled per database, falling back to ``NotSupportedError``.
+    """
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError(
+            'The %s lookup is not supported on %s.' % (
+                self.lookup_name, connection.vendor
+            )
+        )
+
+    def process_jsonb_lhs(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return (
+            jsonb_sql(connection, lhs, self.lhs.output_field),
+            list(lhs_params)
+        )
+
+
+class JSONContains(FieldGetDbPrepValueMixin, JSONLookup):
+    """
+    Whether the document contains the given JSON value, as defined by
+    ``jsonb`` containment. ``JSONFieldContainsLookup`` uses it on ``jsonb``
+    columns.
+    """
+    lookup_name = 'contains'
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params = self.process_jsonb_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return '%s @> %s::jsonb' % (lhs, rhs), params + list(rhs_params)
+
+    def as_mysql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (
+            'JSON_CONTAINS(%s, %s)' % (lhs, rhs),
+            list(params) + list(rhs_params)
+        )
+
+
+class JSONContainedBy(FieldGetDbPrepValueMixin, JSONLookup):
+    lookup_name = 'contained_by'
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params = self.process_jsonb_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return '%s <@ %s::jsonb' % (lhs, rhs), params + list(rhs_params)
+
+    def as_mysql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (
+            'JSON_CONTAINS(%s, %s)' % (rhs, lhs),
+            list(rhs_params) + list(params)
+        )
+
+
+class HasKeyLookupMixin(object):
+    """
+    Check top-level keys. ``postgres_operator`` takes the keys as a text
+    array, ``mysql_mode`` and ``sqlite_operator`` combine the checks of
+    each key on the other databases.
+    """
+    postgres_operator = None
+    mysql_mode = None
+    sqlite_operator = None
+
+    def get_keys(self):
+        if isinstance(self.rhs, (list, tuple)):
+            return [force_text(key) for key in self.rhs]
+        return [force_text(self.rhs)]
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params = self.process_jsonb_lhs(compiler, connection)
+        keys = self.get_keys()
+        if self.lookup_name == 'has_key':
+            keys = keys[0]
+        return (
+            '%s %s %%s' % (lhs, self.postgres_operator), params + [keys]
+        )
+
+    def as_mysql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        paths = [compile_json_path([key]) for key in self.get_keys()]
+        return (
+            'JSON_CONTAINS_PATH(%s, %%s, %s)' % (
+                lhs, ', '.join(['%s'] * len(paths))
+            ),
+            list(params) + [self.mysql_mode] + paths
+        )
+
+    def as_sqlite(self, compiler, connection):
+        check_json_functions(connection, self.__class__.__name__)
+        lhs, params = self.process_lhs(compiler, connection)
+        conditions, condition_params = [], []
+        for key in self.get_keys():
+            sql, count = sqlite_path_sql('JSON_TYPE', lhs, [key])
+            conditions.append('%s IS NOT NULL' % sql)
+            condition_params.extend(list(params) * count)
+        return (
+            '(%s)' % (' %s ' % self.sqlite_operator).join(conditions),
+            condition_params
+        )
+
+
+class HasKey(HasKeyLookupMixin, JSONLookup):
+    lookup_name = 'has_key'
+    postgres_operator = '?'
+    mysql_mode = 'one'
+    sqlite_operator = 'AND'
+
+
+class HasKeys(HasKeyLookupMixin, JSONLookup):
+    lookup_name = 'has_keys'
+    postgres_operator = '?&'
+    mysql_mode = 'all'
+    sqlite_operator = 'AND'
+
+
+class HasAnyKeys(HasKeyLookupMixin, JSONLookup):
+    lookup_name = 'has_any_keys'
+    postgres_operator = '?|'
+    mysql_mode = 'one'
+    sqlite_operator = 'OR'
+
+
+KeyTransform.register_lookup(KeyTransformExact)
+KeyTransform.register_lookup(KeyTransformLessThan)
+KeyTransform.register_lookup(KeyTransformLessThanOrEqual)
+KeyTransform.register_lookup(KeyTransformGreaterThan)
+KeyTransform.register_lookup(KeyTransformGreaterThanOrEqual)
+KeyTransform.register_lookup(KeyTransformIn)
@@ -0,0 +1,66 @@
+import io
+import sys
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from jsonfield.bulk import load_ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert one row per document of an NDJSON file, storing the document '
+        'in a JSONField of the model.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'model', help='Model to load, as app_label.ModelName.'
+        )
+        parser.add_argument('field', help='Name of the JSONField.')
+        parser.add_argument(
+            'path', help='NDJSON file to load, - for the standard input.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of documents inserted per statement.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to load into, "default" by default.',
+        )
+        parser.add_argument(
+            '--no-validate', action='store_false', dest='validate',
+            help='Do not check the documents are valid JSON.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        if options['path'] == '-':
+            fp = sys.stdin
+        else:
+            fp = io.open(options['path'], encoding='utf-8')
+
+        try:
+            count = load_ndjson(
+                model, options['field'], fp,
+                batch_size=options['batch_size'],
+                using=options['database'],
+                validate=options['validate'],
+            )
+        except FieldDoesNotExist as exc:
+            raise CommandError(str(exc))
+        except ValidationError as exc:
+            raise CommandError('; '.join(exc.messages))
+        finally:
+            if fp is not sys.stdin:
+                fp.close()
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Loaded %d documents.' % count)
@@ -0,0 +1,14 @@
+from django.db import models
+
+from .bulk import dump_ndjson, iter_ndjson
+
+
+class JSONFieldQuerySet(models.QuerySet):
+    def iter_ndjson(self, field_name, chunk_size=2000):
+        return iter_ndjson(self, field_name, chunk_size=chunk_size)
+
+    def dump_ndjson(self, field_name, fp, chunk_size=2000):
+        return dump_ndjson(self, field_name, fp, chunk_size=chunk_size)
+
+
+JSONFieldManager = models.Manager.from_queryset(JSONFieldQuerySet)
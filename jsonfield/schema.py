@@ -0,0 +1,127 @@
+"""
+JSON Schema validation of ``JSONField`` and ``JSONFormField`` values.
+
+``JSONField(schema={...})`` validates values against the schema in
+``JSONField.validate()``, so in ``Model.full_clean()`` and in model forms,
+and ``JSONFormField(schema={...})`` validates form data. Schemas are
+compiled once, when the field is built, by the first available engine of
+``ENGINES``:
+
+* ``fastjsonschema``, which generates the Python code of the validator;
+* ``jsonschema``, which checks the schema and binds a validator class once.
+
+Validators are cached by schema and shared between the fields, and the form
+fields, using the same schema. Validating a value never changes it.
+"""
+import json
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+_validators = {}
+
+
+class SchemaValidator(object):
+    """
+    Callable raising ``ValidationError`` for values not matching
+    ``schema``. Subclasses implement ``compile`` and ``validate``, the latter
+    returning an error message or ``None``.
+    """
+    name = None
+    available = False
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.compile(schema)
+
+    def compile(self, schema):
+        raise NotImplementedError
+
+    def validate(self, value):
+        raise NotImplementedError
+
+    def __call__(self, value):
+        error = self.validate(value)
+        if error is not None:
+            raise ValidationError(
+                'Value does not match the schema: %(error)s',
+                code='schema',
+                params={'error': error},
+            )
+
+
+class FastJSONSchemaValidator(SchemaValidator):
+    name = 'fastjsonschema'
+    available = fastjsonschema is not None
+
+    def compile(self, schema):
+        try:
+            # Without use_default, validating doesn't fill in the defaults of
+            # the schema in the value.
+            self.validator = fastjsonschema.compile(schema, use_default=False)
+        except fastjsonschema.JsonSchemaDefinitionException as exc:
+            raise ImproperlyConfigured('Invalid JSON Schema: %s' % exc)
+
+    def validate(self, value):
+        try:
+            self.validator(value)
+        except fastjsonschema.JsonSchemaValueException as exc:
+            return exc.message
+        return None
+
+
+class JSONSchemaValidator(SchemaValidator):
+    name = 'jsonschema'
+    available = jsonschema is not None
+
+    def compile(self, schema):
+        cls = jsonschema.validators.validator_for(schema)
+        try:
+            cls.check_schema(schema)
+        except jsonschema.SchemaError as exc:
+            raise ImproperlyConfigured('Invalid JSON Schema: %s' % exc.message)
+        self.validator = cls(schema)
+
+    def validate(self, value):
+        if self.validator.is_valid(value):
+            return None
+        error = jsonschema.exceptions.best_match(
+            self.validator.iter_errors(value)
+        )
+        path = ''.join('[%s]' % json.dumps(key) for key in error.path)
+        return '%s%s' % ('data%s: ' % path if path else '', error.message)
+
+
+ENGINES = (FastJSONSchemaValidator, JSONSchemaValidator)
+
+
+def get_schema_validator(schema):
+    """
+    Return the cached validator of ``schema``, a JSON Schema or a
+    ``SchemaValidator``. ``None`` means no validation.
+    """
+    if schema is None or isinstance(schema, SchemaValidator):
+        return schema
+
+    cache_key = json.dumps(schema, sort_keys=True)
+    try:
+        return _validators[cache_key]
+    except KeyError:
+        pass
+
+    for engine in ENGINES:
+        if engine.available:
+            validator = _validators[cache_key] = engine(schema)
+            return validator
+    raise ImproperlyConfigured(
+        'JSON Schema validation requires fastjsonschema or jsonschema.'
+    )
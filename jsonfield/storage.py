@@ -0,0 +1,175 @@
+"""
+Binary storage formats for ``JSONField``.
+
+``JSONField(storage_format='msgpack')`` stores values in a binary column
+(``bytea``, ``longblob``, ``blob``) encoded with MessagePack instead of JSON
+text. Values go through the ``default`` method of the encoder class for the
+types MessagePack doesn't know, so they read back as with JSON storage.
+
+``ConvertStorage`` converts the existing rows of a table in a migration.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.migrations.operations import RunPython
+
+from .utils import resolve_object_from_path, string_types
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class StorageFormat(object):
+    """
+    Binary encoding of JSON documents. Subclasses implement ``dumps``,
+    returning bytes, and ``loads``.
+    """
+    name = None
+    available = False
+
+    def dumps(self, value, default=None):
+        raise NotImplementedError
+
+    def loads(self, data):
+        raise NotImplementedError
+
+
+class MsgpackStorage(StorageFormat):
+    """
+    MessagePack, with ``msgpack``. Unlike JSON, dictionary keys that are not
+    strings keep their type.
+    """
+    name = 'msgpack'
+    available = msgpack is not None
+
+    def dumps(self, value, default=None):
+        return msgpack.packb(value, default=default, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def to_bytes(value):
+    """
+    Return the bytes of a value read from a binary column.
+    """
+    if isinstance(value, memoryview):
+        # PostgreSQL
+        return value.tobytes()
+    return bytes(value)
+
+
+STORAGE_FORMATS = {
+    storage.name: storage for storage in (MsgpackStorage,)
+}
+
+
+def get_storage_format(storage_format):
+    """
+    Return a storage format instance from a name, a dotted path, a class or
+    an instance, ``None`` meaning JSON text. Unlike serializer backends,
+    there is no fallback when the required module is missing: the data
+    would be unreadable.
+    """
+    if storage_format is None or isinstance(storage_format, StorageFormat):
+        return storage_format
+
+    if isinstance(storage_format, string_types):
+        storage_format = STORAGE_FORMATS.get(storage_format, storage_format)
+    storage_format = resolve_object_from_path(storage_format)
+
+    if not storage_format.available:
+        raise ImproperlyConfigured(
+            'The %s storage format requires the %s package.' % (
+                storage_format.name, storage_format.name
+            )
+        )
+    return storage_format()
+
+
+def convert_rows(model, from_field, to_field, batch_size=1000, using=None):
+    """
+    Copy the values of ``from_field`` to ``to_field`` for every row of
+    ``model``, each field encoding them with its own storage format.
+    """
+    manager = model._base_manager.db_manager(using)
+    last_pk = None
+    while True:
+        queryset = manager.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset.values_list('pk', from_field)[:batch_size])
+        if not rows:
+            break
+        for pk, value in rows:
+            manager.filter(pk=pk).update(**{to_field: value})
+        last_pk = rows[-1][0]
+
+
+class ConvertStorage(RunPython):
+    """
+    Migration operation copying the values of a field to another one with a
+    different storage format, typically between adding the new field and
+    removing the old one::
+
+        migrations.AddField('order', 'data_msgpack', JSONField(
+            storage_format='msgpack', null=True)),
+        ConvertStorage('order', 'data', 'data_msgpack'),
+        migrations.RemoveField('order', 'data'),
+        migrations.RenameField('order', 'data_msgpack', 'data'),
+
+    Reversing it copies the values back.
+    """
+    def __init__(self, model_name, from_field, to_field, batch_size=1000,
+                 **kwargs):
+        self.model_name = model_name
+        self.from_field = from_field
+        self.to_field = to_field
+        self.batch_size = batch_size
+        super(ConvertStorage, self).__init__(
+            self.forwards, self.backwards, **kwargs
+        )
+
+    def deconstruct(self):
+        kwargs = {
+            'model_name': self.model_name,
+            'from_field': self.from_field,
+            'to_field': self.to_field,
+        }
+        if self.batch_size != 1000:
+            kwargs['batch_size'] = self.batch_size
+        if self.atomic is not None:
+            kwargs['atomic'] = self.atomic
+        if self.hints:
+            kwargs['hints'] = self.hints
+        return (self.__class__.__name__, [], kwargs)
+
+    def describe(self):
+        return 'Convert %s.%s to %s' % (
+            self.model_name, self.from_field, self.to_field
+        )
+
+    def convert(self, apps, schema_editor, from_field, to_field):
+        model = apps.get_model(self.app_label, self.model_name)
+        convert_rows(model, from_field, to_field, self.batch_size,
+                     using=schema_editor.connection.alias)
+
+    def forwards(self, apps, schema_editor):
+        self.convert(apps, schema_editor, self.from_field, self.to_field)
+
+    def backwards(self, apps, schema_editor):
+        self.convert(apps, schema_editor, self.to_field, self.from_field)
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        self.app_label = app_label
+        super(ConvertStorage, self).database_forwards(
+            app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        self.app_label = app_label
+        super(ConvertStorage, self).database_backwards(
+            app_label, schema_editor, from_state, to_state
+        )
@@ -1,2 +1,18 @@
+from .test_backends import *  # NOQA
 from .test_fields import *  # NOQA
 from .test_forms import *   # NOQA
+from .test_updates import *  # NOQA
+from .test_lookups import *  # NOQA
+from .test_indexes import *  # NOQA
+from .test_bulk import *  # NOQA
+from .test_encoder import *  # NOQA
+from .test_decoders import *  # NOQA
+from .test_storage import *  # NOQA
+from .test_compression import *  # NOQA
+from .test_expressions import *  # NOQA
+from .test_tracking import *  # NOQA
+from .test_aggregates import *  # NOQA
+from .test_schema import *  # NOQA
+from .test_cache import *  # NOQA
+from .test_frozen import *  # NOQA
+from .test_instrumentation import *  # NOQA
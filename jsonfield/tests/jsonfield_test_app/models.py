@@ -1,8 +1,13 @@
+import datetime
+import uuid
 from decimal import Decimal
 
 from django.db import models, connection
 from jsonfield.encoder import JSONEncoder
 from jsonfield.fields import JSONField
+from jsonfield.indexes import JSONGinIndex, JSONKeyIndex
+from jsonfield.managers import JSONFieldManager
+from jsonfield.storage import msgpack
 
 
 class JSONFieldTestModel(models.Model):
@@ -47,6 +52,127 @@ class CustomEncoderModel(models.Model):
     )
 
 
+class OrjsonBackendModel(models.Model):
+    json = JSONField(backend='orjson')
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class LazyJSONFieldTestModel(models.Model):
+    json = JSONField(lazy=True, null=True)
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class LazyMultiJSONFieldTestModel(models.Model):
+    name = models.CharField(max_length=20, blank=True)
+    json = JSONField(lazy=True, null=True)
+    extra = JSONField(lazy=True, null=True)
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class LazyJSONFieldProxyModel(LazyMultiJSONFieldTestModel):
+    class Meta:
+        app_label = 'jsonfield'
+        proxy = True
+
+
+class JSONKeyIndexModel(models.Model):
+    json = JSONField(null=True)
+
+    class Meta:
+        app_label = 'jsonfield'
+        indexes = [
+            JSONKeyIndex(fields=['json'], path='a__b', text=True,
+                         name='json_a_b_idx'),
+        ]
+
+
+class IndentedJSONFieldTestModel(models.Model):
+    json = JSONField(null=True, indent=2)
+
+    objects = JSONFieldManager()
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class TypedJSONFieldTestModel(models.Model):
+    json = JSONField(null=True, decode_types={
+        'created': datetime.datetime,
+        'day': datetime.date,
+        'price': Decimal,
+        'id': uuid.UUID,
+    })
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class SchemaJSONFieldTestModel(models.Model):
+    json = JSONField(null=True, schema={
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+        },
+        'required': ['name'],
+    })
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class TrackedJSONFieldTestModel(models.Model):
+    json = JSONField(track_changes=True, null=True)
+    name = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class CompressedJSONFieldTestModel(models.Model):
+    json = JSONField(compress='zlib', compress_threshold=100, null=True)
+    lazy_json = JSONField(compress=True, compress_threshold=100, lazy=True,
+                          null=True)
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class CachedJSONFieldTestModel(models.Model):
+    json = JSONField(decode_cache=2, null=True)
+    lazy_json = JSONField(decode_cache=True, lazy=True, null=True)
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+class FrozenJSONFieldTestModel(models.Model):
+    json = JSONField(frozen=True, default={'a': [1, {'b': 2}]})
+    lazy_json = JSONField(frozen=True, lazy=True, null=True)
+    callable_json = JSONField(frozen=True, default=list)
+
+    class Meta:
+        app_label = 'jsonfield'
+
+
+if msgpack is not None:
+    class MsgpackJSONFieldTestModel(models.Model):
+        json = JSONField(storage_format='msgpack', null=True)
+        lazy_json = JSONField(storage_format='msgpack', lazy=True, null=True)
+        text = JSONField(null=True)
+        compressed = JSONField(storage_format='msgpack', compress='zlib',
+                               compress_threshold=100, null=True)
+
+        class Meta:
+            app_label = 'jsonfield'
+
+
 if connection.vendor == 'postgresql':
     from django.contrib.postgres.fields import JSONField as DjangoJSONField
 
@@ -67,3 +193,17 @@ if connection.vendor == 'postgresql':
 
         class Meta:
             app_label = 'jsonfield'
+
+    class PostgresJSONIndexModel(models.Model):
+        json_as_jsonb = JSONField(null=True)
+        json_as_text = JSONField(null=True, db_json_type='text')
+
+        class Meta:
+            app_label = 'jsonfield'
+            indexes = [
+                JSONGinIndex(fields=['json_as_jsonb'], name='jsonb_gin_idx',
+                             opclass='jsonb_path_ops'),
+                JSONGinIndex(fields=['json_as_text'], name='text_gin_idx'),
+                JSONKeyIndex(fields=['json_as_text'], path='a__0',
+                             name='text_a_0_idx'),
+            ]
@@ -0,0 +1,97 @@
+from django.core.exceptions import FieldError
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.aggregates import (
+    JSONAgg, JSONObjectAgg, KeyAvg, KeyMax, KeyMin, KeyNumber, KeySum,
+)
+from jsonfield.lookups import KeyTextTransform, KeyTransform, key_transform
+from jsonfield.tests.jsonfield_test_app.models import (
+    CompressedJSONFieldTestModel, JSONFieldTestModel,
+)
+
+
+class JSONAggregateTest(DjangoTestCase):
+    def setUp(self):
+        for value in [
+            {'name': 'a', 'price': 1.5, 'item': {'qty': 2}, 'flag': True},
+            {'name': 'b', 'price': 2, 'item': {'qty': '3'}, 'flag': False},
+            {'name': 'c', 'price': '4.5', 'item': [1]},
+        ]:
+            JSONFieldTestModel.objects.create(json=value)
+        self.queryset = JSONFieldTestModel.objects.order_by()
+
+    def test_key_transform(self):
+        transform = key_transform('json__item__qty', text=True)
+        self.assertIsInstance(transform, KeyTextTransform)
+        self.assertIsInstance(transform.lhs, KeyTransform)
+        with self.assertRaises(ValueError):
+            key_transform('json')
+
+    def test_json_agg(self):
+        result = self.queryset.aggregate(values=JSONAgg('json'))['values']
+        self.assertEqual(
+            ['a', 'b', 'c'], sorted(value['name'] for value in result)
+        )
+
+    def test_json_agg_key(self):
+        result = self.queryset.aggregate(
+            items=JSONAgg(KeyTransform('item', 'json'))
+        )['items']
+        self.assertEqual(3, len(result))
+        self.assertIn({'qty': 2}, result)
+        self.assertIn([1], result)
+
+    def test_json_agg_scalar_keys(self):
+        JSONFieldTestModel.objects.all().delete()
+        for value in [True, False, None, 1, 'true', '{"a": 1}']:
+            JSONFieldTestModel.objects.create(json={'t': value})
+        result = self.queryset.aggregate(
+            values=JSONAgg(KeyTransform('t', 'json'))
+        )['values']
+        self.assertEqual(
+            sorted([True, False, None, 1, 'true', '{"a": 1}'], key=repr),
+            sorted(result, key=repr)
+        )
+
+    def test_json_object_agg_boolean_values(self):
+        result = self.queryset.aggregate(flags=JSONObjectAgg(
+            KeyTextTransform('name', 'json'),
+            KeyTransform('flag', 'json')
+        ))['flags']
+        self.assertEqual({'a': True, 'b': False, 'c': None}, result)
+        self.assertIs(True, result['a'])
+        self.assertIs(False, result['b'])
+
+    def test_json_object_agg(self):
+        result = self.queryset.aggregate(items=JSONObjectAgg(
+            KeyTextTransform('name', 'json'), KeyTransform('item', 'json')
+        ))['items']
+        self.assertEqual(
+            {'a': {'qty': 2}, 'b': {'qty': '3'}, 'c': [1]}, result
+        )
+
+    def test_key_aggregates(self):
+        self.assertEqual({
+            'json__price__sum': 8.0,
+            'json__price__avg': 8.0 / 3,
+            'json__price__min': 1.5,
+            'json__price__max': 4.5,
+        }, self.queryset.aggregate(
+            KeySum('json__price'), KeyAvg('json__price'),
+            KeyMin('json__price'), KeyMax('json__price'),
+        ))
+
+    def test_key_number(self):
+        self.assertEqual(
+            [2.0, 3.0], sorted(self.queryset.filter(
+                json__item__has_key='qty'
+            ).annotate(
+                qty=KeyNumber('json__item__qty')
+            ).values_list('qty', flat=True))
+        )
+
+    def test_opaque_field(self):
+        with self.assertRaises(FieldError):
+            CompressedJSONFieldTestModel.objects.aggregate(
+                values=JSONAgg('json')
+            )
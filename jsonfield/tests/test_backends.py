@@ -0,0 +1,232 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from unittest import skipUnless
+
+from django.test import TestCase as DjangoTestCase
+from django.test.utils import override_settings
+from django.utils.timezone import make_aware
+
+from jsonfield import backends
+from jsonfield.backends import (
+    JSONBackend, OrjsonBackend, get_backend,
+)
+from jsonfield.encoder import JSONEncoder, register, registry, unregister
+from jsonfield.fields import JSONField
+from jsonfield.forms import JSONFormField
+from jsonfield.tests.jsonfield_test_app.models import (
+    CustomJSONEncoder, OrjsonBackendModel,
+)
+
+
+class Color(Enum):
+    RED = 'red'
+
+
+class Text(str):
+    pass
+
+
+class Number(float):
+    pass
+
+
+Pair = namedtuple('Pair', 'a b')
+
+
+class UnavailableBackend(JSONBackend):
+    name = 'unavailable'
+    available = False
+
+
+class GetBackendTest(DjangoTestCase):
+    def test_default(self):
+        self.assertEqual(type(get_backend()), JSONBackend)
+
+    @override_settings(JSONFIELD_BACKEND='jsonfield.backends.OrjsonBackend')
+    def test_from_settings(self):
+        self.assertIsInstance(get_backend(), JSONBackend)
+        self.assertIsInstance(JSONField().backend, JSONBackend)
+
+    def test_from_instance(self):
+        backend = JSONBackend()
+        self.assertIs(get_backend(backend), backend)
+
+    def test_unavailable_falls_back_to_stdlib(self):
+        self.assertEqual(type(get_backend(UnavailableBackend)), JSONBackend)
+        self.assertEqual(
+            type(get_backend(
+                'jsonfield.tests.test_backends.UnavailableBackend'
+            )),
+            JSONBackend
+        )
+
+    def test_unknown_path(self):
+        with self.assertRaises(ImportError):
+            get_backend('jsonfield.backends.UnknownBackend')
+
+    def test_field_option(self):
+        field = JSONField(backend='json')
+        self.assertEqual(type(field.backend), JSONBackend)
+
+    def test_formfield_gets_field_backend(self):
+        backend = JSONBackend()
+        formfield = JSONField(backend=backend).formfield()
+        self.assertIs(formfield.backend, backend)
+        self.assertIs(formfield.widget.backend, backend)
+
+
+@skipUnless(backends.orjson, 'orjson is not installed')
+class OrjsonBackendTest(DjangoTestCase):
+    encoder_kwargs = {'cls': JSONEncoder, 'separators': (',', ':')}
+
+    def setUp(self):
+        self.backend = get_backend('orjson')
+
+    def test_get_backend(self):
+        self.assertEqual(type(self.backend), OrjsonBackend)
+
+    def test_same_output_as_stdlib(self):
+        value = {
+            'date': make_aware(datetime(2020, 1, 2, 3, 4, 5, 123456)),
+            'decimal': Decimal('1.5'),
+            'list': [1, None, True],
+            1: 'int key',
+            'text': u'\xe9',
+        }
+        self.assertTrue(self.backend.can_dump(**self.encoder_kwargs))
+        self.assertEqual(
+            JSONBackend().dumps(value, **self.encoder_kwargs),
+            self.backend.dumps(value, **self.encoder_kwargs)
+        )
+
+    def test_ensure_ascii(self):
+        for text in [u'\xe9', u'\x7f', u'\u2028', u'\U0001f600']:
+            for ensure_ascii in [True, False]:
+                self.assertEqual(
+                    JSONBackend().dumps([text], ensure_ascii=ensure_ascii,
+                                        **self.encoder_kwargs),
+                    self.backend.dumps([text], ensure_ascii=ensure_ascii,
+                                       **self.encoder_kwargs)
+                )
+        self.assertEqual(
+            '["\\u00e9"]',
+            self.backend.dumps([u'\xe9'], separators=(',', ':'))
+        )
+        self.assertNotIn(
+            'ensure_ascii', JSONField(backend='orjson').encoder_kwargs
+        )
+
+    def test_float_exponents(self):
+        value = [1e16, -1e22, 1.5e300, 1e-7, 2.5e-05, 0.0001, 123.456]
+        for ensure_ascii in [True, False]:
+            self.assertEqual(
+                JSONBackend().dumps(value, ensure_ascii=ensure_ascii,
+                                    **self.encoder_kwargs),
+                self.backend.dumps(value, ensure_ascii=ensure_ascii,
+                                   **self.encoder_kwargs)
+            )
+
+    def test_non_finite_floats(self):
+        for value in [float('nan'), float('inf'), -float('inf')]:
+            self.assertEqual(
+                JSONBackend().dumps([None, {'a': value}],
+                                    **self.encoder_kwargs),
+                self.backend.dumps([None, {'a': value}],
+                                   **self.encoder_kwargs)
+            )
+            with self.assertRaises(ValueError):
+                self.backend.dumps([value], allow_nan=False,
+                                   **self.encoder_kwargs)
+        self.assertEqual(
+            '[null,1.5]',
+            self.backend.dumps([None, 1.5], **self.encoder_kwargs)
+        )
+
+    def test_indent(self):
+        value = {'a': [1, 2]}
+        self.assertEqual(
+            JSONBackend().dumps(value, indent=2, cls=JSONEncoder),
+            self.backend.dumps(value, indent=2, cls=JSONEncoder)
+        )
+
+    def test_unsupported_options_use_stdlib(self):
+        self.assertEqual(
+            '{"a": 1}',
+            self.backend.dumps({'a': 1}, separators=(', ', ': '))
+        )
+        self.assertEqual(
+            {'a': Decimal('1.5')},
+            self.backend.loads('{"a":1.5}', parse_float=Decimal)
+        )
+
+    def test_big_integer(self):
+        for value in [2 ** 64, -2 ** 63 - 1, 10 ** 30]:
+            text = self.backend.dumps([value], **self.encoder_kwargs)
+            self.assertEqual('[%d]' % value, text)
+            self.assertEqual([value], self.backend.loads(text))
+            self.assertEqual([value], self.backend.loads(text.encode()))
+        self.assertEqual(
+            [2 ** 64 - 1, 1.5],
+            self.backend.loads('[18446744073709551615,1.5]')
+        )
+
+    def test_encoder_error_is_kept(self):
+        with self.assertRaises(Exception) as e:
+            self.backend.dumps(Decimal(10), cls=CustomJSONEncoder,
+                               separators=(',', ':'))
+
+        self.assertEqual(str(e.exception), 'Decimal are not allowed !')
+
+    def test_same_types_as_stdlib(self):
+        value = [Color.RED, uuid.UUID(int=1), Text('a'), Number(1.5),
+                 Pair(1, 2)]
+        self.assertTrue(self.backend.can_dump(**self.encoder_kwargs))
+        self.assertEqual(
+            JSONBackend().dumps(value, **self.encoder_kwargs),
+            self.backend.dumps(value, **self.encoder_kwargs)
+        )
+
+    def test_registered_native_types(self):
+        value = [uuid.UUID(int=1), Color.RED, Text('a'), Number(1.5),
+                 Pair(1, 2)]
+        for type_ in [uuid.UUID, Enum, Text, Number, Pair]:
+            encoder = registry.encoders.get(type_)
+            register(type_, lambda obj: 'registered')
+            try:
+                self.assertFalse(self.backend.can_dump(**self.encoder_kwargs))
+                self.assertEqual(
+                    JSONBackend().dumps(value, **self.encoder_kwargs),
+                    self.backend.dumps(value, **self.encoder_kwargs)
+                )
+            finally:
+                if encoder is None:
+                    unregister(type_)
+                else:
+                    register(type_, encoder)
+        self.assertTrue(self.backend.can_dump(**self.encoder_kwargs))
+
+    def test_encoders_without_registry(self):
+        self.assertFalse(self.backend.can_dump(separators=(',', ':')))
+        self.assertFalse(self.backend.can_dump(cls=CustomJSONEncoder,
+                                               separators=(',', ':')))
+
+    def test_model_round_trip(self):
+        data = {'spam': ['eggs', 1.5, None], 'ham': u'\xe9'}
+        obj = OrjsonBackendModel.objects.create(json=data)
+        self.assertEqual(
+            data, OrjsonBackendModel.objects.get(pk=obj.pk).json
+        )
+        self.assertEqual(
+            1, OrjsonBackendModel.objects.filter(json=data).count()
+        )
+
+    def test_form_field(self):
+        field = JSONFormField(backend='orjson')
+        self.assertEqual({'a': [1]}, field.clean('{"a": [1]}'))
+        self.assertIn(
+            '{\n  &quot;a&quot;: true\n}',
+            field.widget.render('json', {'a': True})
+        )
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.bulk import (
+    copy_escape, dump_ndjson, iter_ndjson, load_ndjson,
+)
+from jsonfield.tests.jsonfield_test_app.models import (
+    IndentedJSONFieldTestModel, JSONFieldTestModel,
+)
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class NDJSONExportTest(DjangoTestCase):
+    def test_iter_ndjson(self):
+        for value in [{'a': [1, 'x\ny']}, None, 'foo']:
+            JSONFieldTestModel.objects.create(json=value)
+
+        self.assertEqual(
+            ['{"a":[1,"x\\ny"]}\n', 'null\n', '"foo"\n'],
+            list(iter_ndjson(JSONFieldTestModel.objects.order_by('pk'),
+                             'json'))
+        )
+
+    def test_never_decodes(self):
+        JSONFieldTestModel.objects.create(json={'a': 1})
+        field = JSONFieldTestModel._meta.get_field('json')
+        with mock.patch.object(field.backend, 'loads') as loads:
+            self.assertEqual(
+                ['{"a":1}\n'],
+                list(iter_ndjson(JSONFieldTestModel.objects.all(), 'json'))
+            )
+        self.assertFalse(loads.called)
+
+    def test_indented_values_on_one_line(self):
+        IndentedJSONFieldTestModel.objects.create(json={'a': {'b': [1]}})
+        lines = list(IndentedJSONFieldTestModel.objects.iter_ndjson('json'))
+        self.assertEqual(1, len(lines))
+        self.assertNotIn('\n', lines[0][:-1])
+
+    def test_dump_ndjson(self):
+        JSONFieldTestModel.objects.create(json=[1])
+        JSONFieldTestModel.objects.create(json=[2])
+
+        fp = io.StringIO()
+        dump_ndjson(JSONFieldTestModel.objects.order_by('pk'), 'json', fp,
+                    chunk_size=1)
+        self.assertEqual('[1]\n[2]\n', fp.getvalue())
+
+    def test_manager(self):
+        IndentedJSONFieldTestModel.objects.create(json=None)
+        fp = io.StringIO()
+        IndentedJSONFieldTestModel.objects.filter(
+            json__isnull=True
+        ).dump_ndjson('json', fp)
+        self.assertEqual('null\n', fp.getvalue())
+
+
+class NDJSONLoadTest(DjangoTestCase):
+    documents = (
+        '{"a": [1, "tab\\there"]}\n'
+        '\n'
+        'null\n'
+        '"back\\\\slash \\"quoted\\""\n'
+        '[1, 2.5, true]'
+    )
+
+    def get_values(self):
+        return list(JSONFieldTestModel.objects.order_by('pk').values_list(
+            'json', flat=True
+        ))
+
+    def test_load_ndjson(self):
+        count = load_ndjson(JSONFieldTestModel, 'json',
+                            io.StringIO(self.documents))
+        self.assertEqual(4, count)
+        self.assertEqual([
+            {'a': [1, 'tab\there']},
+            None,
+            'back\\slash "quoted"',
+            [1, 2.5, True],
+        ], self.get_values())
+        self.assertEqual(
+            1, JSONFieldTestModel.objects.filter(json__isnull=True).count()
+        )
+
+    def test_encoded(self):
+        load_ndjson(IndentedJSONFieldTestModel, 'json',
+                    io.StringIO('{"a":   [1,\t2]}\n'))
+        field = IndentedJSONFieldTestModel._meta.get_field('json')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT %s FROM %s' % (
+                connection.ops.quote_name(field.column),
+                connection.ops.quote_name(
+                    IndentedJSONFieldTestModel._meta.db_table
+                ),
+            ))
+            raw, = cursor.fetchone()
+        if field.normalized(connection):
+            self.assertEqual({'a': [1, 2]}, json.loads(raw))
+        else:
+            self.assertEqual(field.get_prep_value({'a': [1, 2]}), raw)
+
+    def test_indented(self):
+        load_ndjson(IndentedJSONFieldTestModel, 'json',
+                    io.StringIO('{"a": {"b": [1, "x\\ny"]}}\n[]\n'))
+        self.assertEqual(
+            [{'a': {'b': [1, 'x\ny']}}, []],
+            list(IndentedJSONFieldTestModel.objects.order_by(
+                'pk').values_list('json', flat=True))
+        )
+
+    def test_copy_escape(self):
+        self.assertEqual(
+            '{\\n  "a": "\\\\t"\\r\\n}\\t',
+            copy_escape('{\n  "a": "\\t"\r\n}\t')
+        )
+        self.assertEqual('\\N', copy_escape(None))
+
+    def test_batches(self):
+        lines = ''.join('{"n": %d}\n' % i for i in range(25))
+        load_ndjson(JSONFieldTestModel, 'json', io.StringIO(lines),
+                    batch_size=10)
+        self.assertEqual([{'n': i} for i in range(25)], self.get_values())
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValidationError) as e:
+            load_ndjson(JSONFieldTestModel, 'json',
+                        io.StringIO('{}\n{"a": \n'))
+        self.assertIn('Line 2', e.exception.messages[0])
+        self.assertEqual([], self.get_values())
+
+    def test_command(self):
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        self.addCleanup(os.remove, path)
+        with io.open(fd, 'w', encoding='utf-8') as fp:
+            fp.write(self.documents)
+
+        out = io.StringIO()
+        call_command('load_ndjson', 'jsonfield.JSONFieldTestModel', 'json',
+                     path, batch_size=2, stdout=out)
+        self.assertIn('Loaded 4 documents.', out.getvalue())
+        self.assertEqual(4, JSONFieldTestModel.objects.count())
+
+        with self.assertRaises(CommandError):
+            call_command('load_ndjson', 'jsonfield.JSONFieldTestModel',
+                         'unknown', path)
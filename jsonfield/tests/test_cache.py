@@ -0,0 +1,139 @@
+import copy
+import pickle
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.cache import DEFAULT_SIZE, DecodeCache, get_decode_cache
+from jsonfield.descriptors import LazyJSON
+from jsonfield.fields import JSONField
+from jsonfield.frozen import FrozenDict, freeze, thaw
+
+from .jsonfield_test_app.models import CachedJSONFieldTestModel
+
+
+class FrozenTest(DjangoTestCase):
+    def test_freeze(self):
+        value = freeze({'a': [1, {'b': 2}], 'c': None})
+        self.assertIsInstance(value, FrozenDict)
+        self.assertEqual({'a': (1, {'b': 2}), 'c': None}, value)
+        self.assertIsInstance(value['a'][1], FrozenDict)
+        self.assertIs(value, freeze(value))
+        self.assertEqual('d', freeze('d'))
+
+    def test_immutable(self):
+        value = freeze({'a': 1})
+        for modify in [
+            lambda: value.__setitem__('a', 2),
+            lambda: value.__delitem__('a'),
+            lambda: value.update(b=2),
+            lambda: value.setdefault('b', 2),
+            lambda: value.pop('a'),
+            value.popitem,
+            value.clear,
+        ]:
+            with self.assertRaises(TypeError):
+                modify()
+        self.assertEqual({'a': 1}, value)
+
+    def test_copy(self):
+        value = freeze({'a': [1]})
+        self.assertIs(value, copy.copy(value))
+        self.assertIs(value, copy.deepcopy(value))
+        self.assertEqual(value, pickle.loads(pickle.dumps(value)))
+        self.assertIsInstance(pickle.loads(pickle.dumps(value)), FrozenDict)
+        self.assertEqual(hash(value), hash(freeze({'a': [1]})))
+
+    def test_thaw(self):
+        value = thaw(freeze({'a': [1, {'b': 2}]}))
+        self.assertIs(type(value), dict)
+        self.assertIs(type(value['a']), list)
+        self.assertIs(type(value['a'][1]), dict)
+        self.assertEqual({'a': [1, {'b': 2}]}, value)
+
+
+class DecodeCacheTest(DjangoTestCase):
+    def test_get(self):
+        cache = DecodeCache(2)
+        calls = []
+
+        def loads(raw):
+            calls.append(raw)
+            return {'raw': raw}
+
+        first = cache.get('a', loads)
+        self.assertIs(first, cache.get('a', loads))
+        self.assertIsInstance(first, FrozenDict)
+        cache.get('b', loads)
+        cache.get('a', loads)
+        # b is the least recently used entry.
+        cache.get('c', loads)
+        self.assertIs(first, cache.get('a', loads))
+        cache.get('b', loads)
+        self.assertEqual(['a', 'b', 'c', 'b'], calls)
+        self.assertEqual(2, len(cache))
+        self.assertEqual((3, 4), (cache.hits, cache.misses))
+
+        cache.clear()
+        self.assertEqual((0, 0, 0), (len(cache), cache.hits, cache.misses))
+
+    def test_get_decode_cache(self):
+        self.assertIsNone(get_decode_cache(None))
+        self.assertIsNone(get_decode_cache(False))
+        self.assertEqual(DEFAULT_SIZE, get_decode_cache(True).maxsize)
+        self.assertEqual(10, get_decode_cache(10).maxsize)
+        with self.assertRaises(ImproperlyConfigured):
+            get_decode_cache(0)
+        with self.assertRaises(ImproperlyConfigured):
+            JSONField(decode_cache=True, track_changes=True)
+
+
+class CachedFieldTest(DjangoTestCase):
+    def setUp(self):
+        self.field = CachedJSONFieldTestModel._meta.get_field('json')
+        self.field.decode_cache.clear()
+
+    def test_shared(self):
+        for i in range(3):
+            CachedJSONFieldTestModel.objects.create(json={'a': [i % 2]})
+        objs = list(CachedJSONFieldTestModel.objects.order_by('pk'))
+        self.assertEqual({'a': (0,)}, objs[0].json)
+        self.assertIsInstance(objs[0].json, FrozenDict)
+        self.assertIs(objs[0].json, objs[2].json)
+        self.assertIsNot(objs[0].json, objs[1].json)
+        self.assertEqual((1, 2), (
+            self.field.decode_cache.hits, self.field.decode_cache.misses
+        ))
+
+    def test_save(self):
+        obj = CachedJSONFieldTestModel.objects.create(json={'a': [1]})
+        obj = CachedJSONFieldTestModel.objects.get(pk=obj.pk)
+        value = thaw(obj.json)
+        value['a'].append(2)
+        obj.json = value
+        obj.save()
+        self.assertEqual(
+            {'a': (1, 2)}, CachedJSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+        # Frozen values are serialized like plain ones.
+        obj.json = freeze({'b': [3]})
+        obj.save()
+        self.assertTrue(
+            CachedJSONFieldTestModel.objects.filter(json={'b': [3]}).exists()
+        )
+
+    def test_null(self):
+        obj = CachedJSONFieldTestModel.objects.create(json=None)
+        self.assertIsNone(CachedJSONFieldTestModel.objects.get(pk=obj.pk).json)
+
+    def test_lazy(self):
+        CachedJSONFieldTestModel.objects.create(lazy_json={'a': 1})
+        CachedJSONFieldTestModel.objects.create(lazy_json={'a': 1})
+        values = list(CachedJSONFieldTestModel.objects.values_list(
+            'lazy_json', flat=True
+        ))
+        self.assertIs(values[0], values[1])
+        self.assertIsInstance(values[0], FrozenDict)
+        objs = list(CachedJSONFieldTestModel.objects.all())
+        self.assertIsInstance(objs[0].__dict__['lazy_json'], LazyJSON)
+        self.assertIs(values[0], objs[1].lazy_json)
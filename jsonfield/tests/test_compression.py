@@ -0,0 +1,153 @@
+import io
+from unittest import skipUnless
+
+from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.bulk import iter_ndjson, load_ndjson
+from jsonfield.compression import (
+    CompressionStats, ZlibCodec, compress, decompress, get_codec,
+)
+from jsonfield.fields import JSONField
+from jsonfield.storage import msgpack
+
+from .jsonfield_test_app.models import CompressedJSONFieldTestModel
+
+LARGE = {'items': [{'name': 'item %d' % i, 'done': False} for i in range(50)]}
+
+
+class UnavailableCodec(ZlibCodec):
+    name = 'unavailable'
+    available = False
+
+
+class CompressionTest(DjangoTestCase):
+    def test_get_codec(self):
+        self.assertIsNone(get_codec(None))
+        self.assertIsNone(get_codec(False))
+        self.assertIsInstance(get_codec(True), ZlibCodec)
+        self.assertIsInstance(get_codec('zlib'), ZlibCodec)
+        self.assertIsNone(JSONField().compression)
+        with self.assertRaises(ImproperlyConfigured):
+            get_codec(UnavailableCodec)
+
+    def test_text(self):
+        raw = '{"a":"%s"}' % ('x' * 1000)
+        compressed = compress(raw, ZlibCodec(), threshold=100)
+        self.assertTrue(compressed.startswith('~zlib~'))
+        self.assertLess(len(compressed), len(raw))
+        self.assertEqual(raw, decompress(compressed))
+        self.assertEqual(raw, decompress(raw))
+
+    def test_binary(self):
+        data = b'\x81\xa1a' + b'\xa1x' * 500
+        compressed = compress(data, ZlibCodec())
+        self.assertTrue(compressed.startswith(b'\x00zlib\x00'))
+        self.assertEqual(data, decompress(compressed))
+        self.assertEqual(b'\x00', decompress(b'\x00'))
+
+    def test_threshold(self):
+        stats = CompressionStats()
+        raw = '{"a":"%s"}' % ('x' * 50)
+        self.assertEqual(raw, compress(raw, ZlibCodec(), 100, stats))
+        # Not getting smaller.
+        self.assertEqual('[1]', compress('[1]', ZlibCodec(), 0, stats))
+        self.assertEqual(2, stats.uncompressed)
+        self.assertEqual(0, stats.compressed)
+        self.assertIsNone(stats.ratio)
+
+    def test_stats(self):
+        stats = CompressionStats()
+        raw = '{"a":"%s"}' % ('x' * 1000)
+        compressed = compress(raw, ZlibCodec(), 100, stats)
+        decompress(compressed, stats)
+        self.assertEqual(1, stats.compressed)
+        self.assertEqual(1, stats.decompressed)
+        self.assertEqual(len(raw), stats.bytes_in)
+        self.assertEqual(len(compressed), stats.bytes_out)
+        self.assertLess(stats.ratio, 0.1)
+        self.assertEqual(stats.ratio, stats.as_dict()['ratio'])
+        stats.reset()
+        self.assertEqual(0, stats.bytes_in)
+
+
+class CompressedFieldTest(DjangoTestCase):
+    model = CompressedJSONFieldTestModel
+
+    def execute(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql % self.model._meta.db_table, params)
+            return cursor.fetchone()
+
+    def get_raw(self, pk):
+        return self.execute('SELECT json FROM %s WHERE id = %%s', [pk])[0]
+
+    def test_round_trip(self):
+        small = self.model.objects.create(json={'a': 1})
+        large = self.model.objects.create(json=LARGE)
+        self.assertEqual('{"a":1}', self.get_raw(small.pk))
+        self.assertTrue(self.get_raw(large.pk).startswith('~zlib~'))
+        self.assertEqual(
+            [{'a': 1}, LARGE],
+            [obj.json for obj in self.model.objects.order_by('pk')]
+        )
+
+    def test_plain_rows(self):
+        # Rows written before compression was enabled.
+        obj = self.model.objects.create()
+        self.execute('UPDATE %s SET json = %%s WHERE id = %%s', [
+            JSONField().get_prep_value(LARGE), obj.pk
+        ])
+        self.assertEqual(LARGE, self.model.objects.get(pk=obj.pk).json)
+
+    def test_lazy(self):
+        obj = self.model.objects.create(lazy_json=LARGE)
+        obj = self.model.objects.get(pk=obj.pk)
+        field = self.model._meta.get_field('lazy_json')
+        self.assertFalse(field.has_changed(obj))
+        self.assertEqual(LARGE, obj.lazy_json)
+
+    def test_stats(self):
+        field = self.model._meta.get_field('json')
+        field.compression_stats.reset()
+        obj = self.model.objects.create(json=LARGE)
+        self.model.objects.get(pk=obj.pk)
+        self.assertEqual(1, field.compression_stats.compressed)
+        self.assertEqual(1, field.compression_stats.decompressed)
+
+    def test_lookups(self):
+        obj = self.model.objects.create(json=LARGE)
+        self.model.objects.create(json={'a': 1})
+        self.assertEqual([obj], list(self.model.objects.filter(json=LARGE)))
+        with self.assertRaises(FieldError):
+            self.model.objects.filter(json__items=1)
+        with self.assertRaises(FieldError):
+            self.model.objects.filter(json__contains={'a': 1})
+
+    def test_db_type(self):
+        field = self.model._meta.get_field('json')
+        if connection.vendor == 'postgresql':
+            self.assertEqual('text', field.db_type(connection))
+        self.assertEqual('zlib', field.deconstruct()[3]['compress'])
+        with self.assertRaises(ImproperlyConfigured):
+            JSONField(compress=True, db_json_type='jsonb')
+
+    def test_ndjson(self):
+        load_ndjson(self.model, 'json', io.StringIO(
+            '{"a":1}\n%s\n' % JSONField().get_prep_value(LARGE)
+        ))
+        lines = list(iter_ndjson(self.model.objects.order_by('pk'), 'json'))
+        self.assertEqual('{"a":1}\n', lines[0])
+        self.assertEqual(
+            JSONField().get_prep_value(LARGE) + '\n', lines[1]
+        )
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_binary_storage(self):
+        from .jsonfield_test_app.models import MsgpackJSONFieldTestModel
+        obj = MsgpackJSONFieldTestModel.objects.create(compressed=LARGE)
+        self.assertEqual(
+            LARGE,
+            MsgpackJSONFieldTestModel.objects.get(pk=obj.pk).compressed
+        )
@@ -0,0 +1,71 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.decoders import apply_object_hook, get_object_hook
+from jsonfield.fields import JSONField
+from jsonfield.tests.jsonfield_test_app.models import TypedJSONFieldTestModel
+
+
+class DecodeTypesTest(DjangoTestCase):
+    def test_round_trip(self):
+        value = {
+            'created': datetime.datetime(2020, 1, 2, 3, 4, 5, 123000),
+            'items': [
+                {'price': Decimal('1.5'), 'day': datetime.date(2020, 1, 2)},
+                {'price': None, 'id': uuid.UUID(int=1)},
+            ],
+            'name': '2020-01-02',
+        }
+        obj = TypedJSONFieldTestModel.objects.create(json=value)
+        self.assertEqual(
+            value, TypedJSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+        self.assertEqual(
+            [value],
+            list(TypedJSONFieldTestModel.objects.values_list(
+                'json', flat=True))
+        )
+
+    def test_invalid_values_left_unchanged(self):
+        obj = TypedJSONFieldTestModel.objects.create(json={
+            'created': 'yesterday', 'day': 3, 'price': 'cheap',
+        })
+        self.assertEqual(
+            {'created': 'yesterday', 'day': 3, 'price': 'cheap'},
+            TypedJSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+
+    def test_callable(self):
+        field = JSONField(decode_types={'tags': set})
+        self.assertEqual(
+            {'tags': {'a', 'b'}}, field._loads('{"tags": ["a", "b"]}')
+        )
+
+    def test_hooks_are_shared(self):
+        types = {'created': datetime.datetime}
+        self.assertIs(get_object_hook(types), get_object_hook(dict(types)))
+        self.assertIs(
+            JSONField(decode_types=types).decoder_kwargs['object_hook'],
+            JSONField(decode_types=types).decoder_kwargs['object_hook'],
+        )
+
+    def test_decoder_kwargs_hook_runs_after(self):
+        field = JSONField(
+            decode_types={'day': datetime.date},
+            decoder_kwargs={'object_hook': lambda obj: sorted(obj.items())}
+        )
+        self.assertEqual(
+            [('day', datetime.date(2020, 1, 2))],
+            field._loads('{"day": "2020-01-02"}')
+        )
+
+    def test_apply_object_hook(self):
+        # Values decoded by the database driver (json/jsonb columns).
+        hook = get_object_hook({'day': datetime.date})
+        self.assertEqual(
+            [{'a': {'day': datetime.date(2020, 1, 2)}}, 'day'],
+            apply_object_hook([{'a': {'day': '2020-01-02'}}, 'day'], hook)
+        )
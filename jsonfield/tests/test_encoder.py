@@ -0,0 +1,115 @@
+import datetime
+import json
+import uuid
+from collections import OrderedDict
+from enum import Enum
+
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.backends import get_backend
+from jsonfield.encoder import (
+    EncoderRegistry, JSONEncoder, register, registry, unregister,
+)
+
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Point3D(Point):
+    pass
+
+
+class MyDateTime(datetime.datetime):
+    pass
+
+
+class Color(Enum):
+    RED = 'red'
+
+
+class EncoderRegistryTest(DjangoTestCase):
+    def test_builtin_types(self):
+        encoder = JSONEncoder()
+        self.assertEqual(
+            '2020-01-02T03:04:05.123',
+            encoder.default(datetime.datetime(2020, 1, 2, 3, 4, 5, 123456))
+        )
+        self.assertEqual(
+            '2020-01-02', encoder.default(datetime.date(2020, 1, 2))
+        )
+        self.assertEqual('red', encoder.default(Color.RED))
+
+    def test_overrides(self):
+        types = (uuid.UUID, Enum)
+        custom = registry.copy()
+        self.assertFalse(custom.overrides(types))
+
+        custom.register(Color, lambda color: color.name)
+        self.assertTrue(custom.overrides(types))
+        custom.unregister(Color)
+        custom.unregister(uuid.UUID)
+        self.assertTrue(custom.overrides(types))
+
+    def test_subclass_resolved_on_mro(self):
+        self.assertEqual(
+            '2020-01-02T00:00:00',
+            JSONEncoder().default(MyDateTime(2020, 1, 2))
+        )
+        self.assertIs(
+            registry.encoders[datetime.datetime], registry.cache[MyDateTime]
+        )
+
+    def test_register(self):
+        register(Point, lambda point: [point.x, point.y])
+        self.addCleanup(unregister, Point)
+
+        self.assertEqual(
+            '{"a":[1,2],"b":[3,4]}',
+            json.dumps({'a': Point(1, 2), 'b': Point3D(3, 4)},
+                       cls=JSONEncoder, separators=(',', ':'))
+        )
+
+    def test_register_decorator_clears_cache(self):
+        encoder = JSONEncoder()
+        with self.assertRaises(TypeError):
+            encoder.default(Point(1, 2))
+
+        @register(Point)
+        def encode_point(point):
+            return {'x': point.x, 'y': point.y}
+        self.addCleanup(unregister, Point)
+
+        self.assertEqual({'x': 1, 'y': 2}, encoder.default(Point3D(1, 2)))
+
+    def test_encoder_registry(self):
+        class PointEncoder(JSONEncoder):
+            registry = registry.copy()
+
+        PointEncoder.registry.register(Point, lambda point: point.x)
+        self.assertEqual(1, PointEncoder().default(Point(1, 2)))
+        self.assertIsNone(registry.get(Point))
+
+    def test_protocol_fallbacks(self):
+        encoder = JSONEncoder()
+        self.assertEqual({'a': 1}, encoder.default(
+            type('Mapping', (object,), {
+                '__getitem__': lambda self, key: 1,
+                'keys': lambda self: ['a'],
+            })()
+        ))
+        self.assertEqual((1, 2), encoder.default(x for x in [1, 2]))
+        self.assertEqual(OrderedDict(a=1), encoder.default(OrderedDict(a=1)))
+
+    def test_fast_backend_uses_registry(self):
+        register(Point, lambda point: [point.x, point.y])
+        self.addCleanup(unregister, Point)
+
+        self.assertEqual('[[1,2]]', get_backend('orjson').dumps(
+            [Point(1, 2)], cls=JSONEncoder, separators=(',', ':')
+        ))
+
+    def test_empty_registry(self):
+        self.assertIsNone(EncoderRegistry().get(datetime.date))
@@ -0,0 +1,90 @@
+from django.core.exceptions import FieldError
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.expressions import (
+    JSONMerge, JSONRemove, JSONSet, compile_path, get_path,
+)
+from jsonfield.tests.jsonfield_test_app.models import (
+    CompressedJSONFieldTestModel, JSONFieldTestModel,
+)
+
+
+class JSONUpdateExpressionTest(DjangoTestCase):
+    def setUp(self):
+        self.obj = JSONFieldTestModel.objects.create(json={
+            'a': {'b': 1, 'c': [1, 2, 3]},
+            'd': 'foo',
+        })
+
+    def update(self, expression):
+        JSONFieldTestModel.objects.filter(pk=self.obj.pk).update(
+            json=expression
+        )
+        return JSONFieldTestModel.objects.get(pk=self.obj.pk).json
+
+    def test_get_path(self):
+        self.assertEqual(['a', 'b', 0], get_path('a__b__0'))
+        self.assertEqual(['a', '0'], get_path(['a', '0']))
+
+    def test_compile_path(self):
+        self.assertEqual('$."a"[0]."0"', compile_path(['a', 0, '0']))
+
+    def test_set(self):
+        self.assertEqual(
+            {'a': {'b': {'x': [None]}, 'c': [1, 2, 3]}, 'd': 'foo'},
+            self.update(JSONSet('json', 'a__b', {'x': [None]}))
+        )
+
+    def test_set_new_key(self):
+        self.assertEqual(
+            {'a': {'b': 1, 'c': [1, 2, 3]}, 'd': 'foo', 'e': 'bar'},
+            self.update(JSONSet('json', ['e'], 'bar'))
+        )
+
+    def test_set_array_item(self):
+        self.assertEqual(
+            {'a': {'b': 1, 'c': [1, True, 3]}, 'd': 'foo'},
+            self.update(JSONSet('json', 'a__c__1', True))
+        )
+
+    def test_set_null_document(self):
+        JSONFieldTestModel.objects.filter(pk=self.obj.pk).update(json=None)
+        self.assertEqual({'a': 1}, self.update(JSONSet('json', 'a', 1)))
+
+    def test_remove(self):
+        self.assertEqual(
+            {'a': {'c': [1, 3]}},
+            self.update(JSONRemove('json', 'a__b', 'a__c__1', 'd'))
+        )
+
+    def test_remove_missing(self):
+        self.assertEqual(
+            {'a': {'b': 1, 'c': [1, 2, 3]}, 'd': 'foo'},
+            self.update(JSONRemove('json', 'x__y'))
+        )
+        with self.assertRaises(ValueError):
+            JSONRemove('json')
+
+    def test_merge_numeric_key(self):
+        self.assertEqual(
+            {'a': {'b': 1, 'c': [1, 2, 3]}, 'd': 'foo', '0': 0},
+            self.update(JSONMerge('json', {'0': 0}))
+        )
+
+    def test_merge(self):
+        self.assertEqual(
+            {'a': {'x': 1}, 'd': 'foo', 'e': [1, 'two']},
+            self.update(JSONMerge('json', {'a': {'x': 1}, 'e': [1, 'two']}))
+        )
+        self.assertEqual(
+            {'a': {'x': 1}, 'd': 'foo', 'e': [1, 'two']},
+            self.update(JSONMerge('json', {}))
+        )
+        with self.assertRaises(TypeError):
+            JSONMerge('json', [1])
+
+    def test_opaque_field(self):
+        with self.assertRaises(FieldError):
+            CompressedJSONFieldTestModel.objects.update(
+                json=JSONSet('json', 'a', 1)
+            )
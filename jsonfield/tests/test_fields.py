@@ -1,3 +1,4 @@
+import json
 import uuid
 
 from datetime import datetime, time, timedelta
@@ -7,18 +8,25 @@ from unittest import skipUnless
 from django import forms
 from django.core import serializers
 from django.core.exceptions import ValidationError
-from django.db import connection, models
+from django.db import connection, connections, models
+from django.http import JsonResponse
 from django.test import TestCase as DjangoTestCase
 from django.utils.encoding import force_text
 from django.utils.functional import Promise
 from django.utils.timezone import make_aware, is_aware
 from django.utils.translation import ugettext_lazy
 
-from jsonfield.fields import JSONField
+from jsonfield.descriptors import LazyJSON
+from jsonfield.features import (
+    COLUMN_TYPES_ATTR, clear_column_types, clear_migrated_column_types,
+)
+from jsonfield.fields import (
+    JSONField, JSONFieldExactLookup, JSONFieldInLookup,
+)
 from jsonfield.tests.jsonfield_test_app.models import (
     JSONFieldTestModel, JSONFieldWithDefaultTestModel,
     BlankJSONFieldTestModel, CallableDefaultModel,
-    CustomEncoderModel,
+    CustomEncoderModel, LazyJSONFieldTestModel,
 )
 from jsonfield.utils import PY3
 
@@ -26,6 +34,24 @@ if PY3:
     from datetime import timezone
 
 
+class FakeCursor(object):
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql, params):
+        self.executed.append(params)
+
+    def fetchone(self):
+        return self.row
+
+
 class JSONFieldTest(DjangoTestCase):
     def test_json_field(self):
         obj = JSONFieldTestModel(json={'spam': 'eggs'})
@@ -52,13 +78,154 @@ class JSONFieldTest(DjangoTestCase):
         field = JSONField()
         connection.vendor = 'postgresql'
         self.assertEqual(field.default_db_type(connection), 'jsonb')
-        connection.vendor = 'mysql'
-        self.assertEqual(field.default_db_type(connection), 'longtext')
         connection.vendor = 'oracle'
         self.assertEqual(field.default_db_type(connection), 'long')
         connection.vendor = 'random'
         self.assertEqual(field.default_db_type(connection), 'text')
 
+    def test_default_db_type_mysql(self):
+        field = JSONField()
+        for mariadb, version, db_type in [
+            (False, (5, 6, 40), 'longtext'),
+            (False, (5, 7, 8), 'json'),
+            (False, (8, 0, 19), 'json'),
+            (True, (10, 1, 0), 'longtext'),
+            (True, (10, 2, 7), 'json'),
+        ]:
+            connection = type('connection', (object,), {
+                'vendor': 'mysql',
+                'mysql_is_mariadb': mariadb,
+                'mysql_version': version,
+            })()
+            self.assertEqual(db_type, field.default_db_type(connection))
+            self.assertEqual('longtext', JSONField(
+                compress=True
+            ).db_type(connection))
+            self.assertEqual(
+                db_type == 'json' and not mariadb,
+                field.normalized(connection)
+            )
+
+        with self.settings(JSONFIELD_NATIVE_JSON=False):
+            connection = type('connection', (object,), {
+                'vendor': 'mysql',
+                'alias': 'mysql',
+                'mysql_is_mariadb': False,
+                'mysql_version': (8, 0, 19),
+            })()
+            self.assertEqual('longtext', field.default_db_type(connection))
+            self.assertEqual([field._convert_value],
+                             field.get_db_converters(connection))
+
+    def test_normalized_mysql_column(self):
+        field = JSONFieldTestModel._meta.get_field('json')
+        for data_type, normalized in [('longtext', False), ('JSON', True)]:
+            cursor = FakeCursor((data_type,))
+            connection = type('connection', (object,), {
+                'vendor': 'mysql',
+                'alias': 'mysql',
+                'mysql_is_mariadb': False,
+                'mysql_version': (8, 0, 19),
+                'connection': object(),
+                'cursor': lambda self: cursor,
+            })()
+            self.assertEqual('json', field.db_type(connection))
+            self.assertEqual(normalized, field.normalized(connection))
+            self.assertEqual(normalized, field.normalized(connection))
+            self.assertEqual(
+                [[JSONFieldTestModel._meta.db_table, 'json']], cursor.executed
+            )
+
+            lookup = JSONFieldExactLookup(field.get_col('t'), {'a': 1})
+            self.assertEqual(
+                ("JSON_EXTRACT(%s, '$')" if normalized else '%s',
+                 ['{"a":1}']),
+                lookup.process_rhs(None, connection)
+            )
+            lookup = JSONFieldInLookup(field.get_col('t'), [[1], [2]])
+            self.assertEqual(
+                "(JSON_EXTRACT(%s, '$'), JSON_EXTRACT(%s, '$'))"
+                if normalized else '(%s, %s)',
+                lookup.process_rhs(None, connection)[0]
+            )
+
+        # Looked up again on a new DB-API connection and when cleared.
+        connection.connection = object()
+        self.assertTrue(field.normalized(connection))
+        self.assertEqual(2, len(cursor.executed))
+        clear_column_types(connection)
+        self.assertTrue(field.normalized(connection))
+        self.assertEqual(3, len(cursor.executed))
+
+        # Not created yet.
+        cursor = FakeCursor(None)
+        connection.cursor = lambda: cursor
+        clear_column_types(connection)
+        self.assertTrue(field.normalized(connection))
+        self.assertTrue(field.normalized(connection))
+        self.assertEqual(2, len(cursor.executed))
+
+    def test_column_types_cleared_by_migrate(self):
+        wrapper = connections[connection.alias]
+        wrapper.__dict__[COLUMN_TYPES_ATTR] = (
+            wrapper.connection, {('table', 'column'): 'json'}
+        )
+        self.addCleanup(clear_column_types, wrapper)
+        clear_migrated_column_types(sender=None, using=wrapper.alias)
+        self.assertNotIn(COLUMN_TYPES_ATTR, wrapper.__dict__)
+
+    def test_nan(self):
+        field = JSONFieldTestModel._meta.get_field('json')
+        self.assertIsNone(field.db_check(connection))
+        if connection.vendor == 'postgresql':
+            self.skipTest('jsonb rejects NaN')
+        obj = JSONFieldTestModel.objects.create(json=[float('inf')])
+        self.assertEqual(
+            [float('inf')], JSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+
+    def test_db_converters(self):
+        connection = type('connection', (object,), {
+            'vendor': 'sqlite', 'alias': 'sqlite',
+        })
+        field = JSONField()
+        self.assertEqual([field._convert_value],
+                         field.get_db_converters(connection))
+        self.assertEqual([LazyJSON], [
+            type(converter('{}'))
+            for converter in JSONField(lazy=True).get_db_converters(
+                connection)
+        ])
+
+        connection.vendor = connection.alias = 'postgresql'
+        self.assertEqual([], field.get_db_converters(connection))
+        self.assertEqual(
+            [], JSONField(db_json_type='json').get_db_converters(connection)
+        )
+        field = JSONField(db_json_type='text')
+        self.assertEqual([field._convert_value],
+                         field.get_db_converters(connection))
+
+    def test_db_converters_cached_per_alias(self):
+        connection = type('connection', (object,), {
+            'vendor': 'postgresql', 'alias': 'text',
+        })
+        field = JSONField()
+        field.db_json_type = 'text'
+        field.get_db_converters(connection)
+        field.db_json_type = 'jsonb'
+        self.assertEqual([field._convert_value],
+                         field.get_db_converters(connection))
+        connection.alias = 'jsonb'
+        self.assertEqual([], field.get_db_converters(connection))
+
+    def test_from_db_value(self):
+        field = JSONField()
+        self.assertEqual(
+            {'a': 1}, field.from_db_value('{"a": 1}', None, connection)
+        )
+        self.assertIsNone(field.from_db_value(None, None, connection))
+
     def test_db_json_type(self):
         field = JSONField(db_json_type='bob')
         self.assertEqual(field.db_type(connection=None), 'bob')
@@ -342,6 +509,110 @@ class JSONFieldSaveTest(DjangoTestCase):
                 )
 
 
+@skipUnless(connection.vendor != 'postgresql', 'Text column only')
+class LazyJSONFieldTest(DjangoTestCase):
+    def set_raw(self, obj, raw):
+        table = LazyJSONFieldTestModel._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE %s SET json = %%s WHERE id = %%s' % table,
+                [raw, obj.pk]
+            )
+
+    def get_raw(self, obj):
+        table = LazyJSONFieldTestModel._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT json FROM %s WHERE id = %%s' % table, [obj.pk]
+            )
+            return cursor.fetchone()[0]
+
+    def test_decoded_on_access(self):
+        obj = LazyJSONFieldTestModel.objects.create(json={'spam': 'eggs'})
+        obj = LazyJSONFieldTestModel.objects.get(pk=obj.pk)
+
+        value = obj.__dict__['json']
+        self.assertIsInstance(value, LazyJSON)
+        self.assertFalse(value.is_decoded)
+
+        self.assertEqual({'spam': 'eggs'}, obj.json)
+        self.assertEqual(dict, type(obj.__dict__['json']))
+
+    def test_untouched_value_saved_unchanged(self):
+        obj = LazyJSONFieldTestModel.objects.create(json={})
+        self.set_raw(obj, '{"b": 1,  "a": 2}')
+
+        obj = LazyJSONFieldTestModel.objects.get(pk=obj.pk)
+        obj.save()
+
+        self.assertEqual('{"b": 1,  "a": 2}', self.get_raw(obj))
+        self.assertFalse(obj.__dict__['json'].is_decoded)
+
+    def test_accessed_value_saved(self):
+        obj = LazyJSONFieldTestModel.objects.create(json={'a': 1})
+        obj = LazyJSONFieldTestModel.objects.get(pk=obj.pk)
+        obj.json['b'] = 2
+        obj.save()
+
+        self.assertEqual('{"a":1,"b":2}', self.get_raw(obj))
+
+    def test_assigned_value_saved(self):
+        obj = LazyJSONFieldTestModel.objects.create(json={'a': 1})
+        obj = LazyJSONFieldTestModel.objects.get(pk=obj.pk)
+        obj.json = [1]
+        obj.save()
+
+        self.assertEqual([1], LazyJSONFieldTestModel.objects.get().json)
+
+    def test_null(self):
+        LazyJSONFieldTestModel.objects.create(json=None)
+        self.assertIsNone(LazyJSONFieldTestModel.objects.get().json)
+
+    def test_deferred(self):
+        LazyJSONFieldTestModel.objects.create(json={'a': 1})
+        obj = LazyJSONFieldTestModel.objects.defer('json').get()
+        self.assertEqual({'a': 1}, obj.json)
+
+    def test_values(self):
+        LazyJSONFieldTestModel.objects.create(json={'a': 1})
+        value = LazyJSONFieldTestModel.objects.values_list(
+            'json', flat=True).get()
+
+        self.assertEqual({'a': 1}, value)
+        self.assertIs(type(value), dict)
+        row = LazyJSONFieldTestModel.objects.values('json').get()
+        self.assertIs(type(row['json']), dict)
+
+    def test_values_encoded(self):
+        LazyJSONFieldTestModel.objects.create(json={'a': [1]})
+        LazyJSONFieldTestModel.objects.create(json=[True])
+        values = list(LazyJSONFieldTestModel.objects.order_by('pk')
+                      .values_list('json', flat=True))
+
+        response = JsonResponse(values, safe=False)
+        self.assertEqual([{'a': [1]}, [True]], json.loads(response.content))
+        self.assertEqual('{"b": [true]}', json.dumps({'b': values[1]}))
+
+    def test_values_and_instances(self):
+        LazyJSONFieldTestModel.objects.create(json={'a': 1})
+        queryset = LazyJSONFieldTestModel.objects.all()
+        self.assertIs(type(queryset.values_list('json', flat=True)[0]), dict)
+        self.assertIsInstance(queryset[0].__dict__['json'], LazyJSON)
+        self.assertIs(type(queryset.values_list('json', flat=True)[0]), dict)
+
+    def test_values_assigned_to_instance(self):
+        obj = LazyJSONFieldTestModel.objects.create(json={'a': 1})
+        value = LazyJSONFieldTestModel.objects.values_list(
+            'json', flat=True).get()
+        value['b'] = 2
+        obj.json = value
+        obj.save()
+
+        self.assertEqual(
+            {'a': 1, 'b': 2}, LazyJSONFieldTestModel.objects.get().json
+        )
+
+
 @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL-specific test')
 class PosgresJSONFieldTest(DjangoTestCase):
     def test_dict(self):
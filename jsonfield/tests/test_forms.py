@@ -1,7 +1,12 @@
+import copy
+from timeit import default_timer
+
 from django.test import TestCase as DjangoTestCase
 from django.forms import ValidationError
 
-from jsonfield.forms import JSONFormField
+from jsonfield.backends import JSONBackend
+from jsonfield.fields import JSONField
+from jsonfield.forms import JSONFormField, exceeds_bytes, exceeds_depth
 from jsonfield.tests.jsonfield_test_app.forms import JSONTestForm
 
 
@@ -47,6 +52,133 @@ class JSONFormFieldTest(DjangoTestCase):
         with self.assertRaises(ValidationError):
             field.clean('{"foo"}')
 
+    def test_parse_once(self):
+        backend = CountingBackend()
+        field = JSONFormField(backend=backend)
+        self.assertFalse(field.has_changed({'a': 1}, '{"a": 1}'))
+        self.assertTrue(field.has_changed({'a': 2}, '{"a": 1}'))
+        # Each form gets its own copy of the field.
+        self.assertIsNone(copy.deepcopy(field)._parsed)
+        self.assertEqual({'a': 1}, field.clean('{"a": 1}'))
+        self.assertEqual(1, backend.loads_count)
+        field.clean('{"a": 2}')
+        self.assertEqual(2, backend.loads_count)
+        self.assertTrue(field.has_changed({'a': 1}, 'x'))
+        self.assertFalse(field.has_changed(None, ''))
+
+    def test_parsed_not_shared(self):
+        field = JSONFormField()
+        self.assertFalse(field.has_changed({'a': [1]}, '{"a": [1]}'))
+        value = field.clean('{"a": [1]}')
+        value['a'].append(2)
+        self.assertFalse(field.has_changed({'a': [1]}, '{"a": [1]}'))
+        self.assertIsNot(value, field.clean('{"a": [1]}'))
+        self.assertEqual({'a': [1]}, field.clean('{"a": [1]}'))
+
+    def test_form_parse_count(self):
+        def bound_form():
+            form = JSONTestForm({'json_data': '{"a": [1]}'},
+                                initial={'json_data': {'a': [1]}})
+            form.fields['json_data'].backend = backend
+            return form
+
+        # has_changed() parses the text it compares, and hands its value
+        # over to clean().
+        backend = CountingBackend()
+        form = bound_form()
+        self.assertEqual([], form.changed_data)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(1, backend.loads_count)
+
+        # The value returned by clean() belongs to the caller, so the text is
+        # parsed again to be compared.
+        backend = CountingBackend()
+        form = bound_form()
+        self.assertTrue(form.is_valid())
+        form.cleaned_data['json_data']['a'].append(2)
+        self.assertEqual([], form.changed_data)
+        self.assertEqual(2, backend.loads_count)
+
+    def test_render_bound(self):
+        backend = CountingBackend()
+        form = JSONTestForm({'json_data': '{"a": [1, 2]}'})
+        form.fields['json_data'].widget.backend = backend
+        self.assertTrue(form.is_valid())
+        self.assertIn('{&quot;a&quot;: [1, 2]}', str(form['json_data']))
+        self.assertEqual(0, backend.dumps_count)
+
+    def test_max_bytes(self):
+        backend = CountingBackend()
+        field = JSONFormField(max_bytes=10, backend=backend)
+        self.assertEqual({'a': 'b'}, field.clean('{"a": "b"}'))
+        with self.assertRaises(ValidationError) as cm:
+            field.clean('{"a": "bc"}')
+        self.assertEqual('max_bytes', cm.exception.code)
+        with self.assertRaises(ValidationError) as cm:
+            field.clean(u'{"a": "\u00e9"}')
+        self.assertEqual('max_bytes', cm.exception.code)
+        self.assertEqual(1, backend.loads_count)
+
+    def test_max_depth(self):
+        field = JSONFormField(max_depth=2)
+        self.assertEqual({'a': [1, '[[[']}, field.clean('{"a": [1, "[[["]}'))
+        with self.assertRaises(ValidationError) as cm:
+            field.clean('{"a": [[1]]}')
+        self.assertEqual('max_depth', cm.exception.code)
+        with self.assertRaises(ValidationError) as cm:
+            field.clean('[' * 100000)
+        self.assertEqual('max_depth', cm.exception.code)
+
+    def test_exceeds(self):
+        self.assertFalse(exceeds_bytes('abc', 3))
+        self.assertTrue(exceeds_bytes('abcd', 3))
+        self.assertTrue(exceeds_bytes(u'\u00e9\u00e9', 3))
+        self.assertFalse(exceeds_depth('[{}, {}, "[\\"["]', 2))
+        self.assertTrue(exceeds_depth('[{}, {"a": [{}]}]', 2))
+        self.assertFalse(exceeds_depth('1', 0))
+        self.assertFalse(exceeds_depth('["\\\\", "]]", [1]]', 2))
+        self.assertTrue(exceeds_depth('["\\\\", [[1]]]', 2))
+
+    def test_unterminated_string(self):
+        # Escaped quotes never closing the string, with brackets past the
+        # depth limit: the scan stays linear.
+        text = '[[[["' + '\\"' * 500000 + '[[[['
+        field = JSONFormField(max_depth=2)
+        start = default_timer()
+        with self.assertRaises(ValidationError) as cm:
+            field.clean(text)
+        self.assertLess(default_timer() - start, 2)
+        self.assertEqual('max_depth', cm.exception.code)
+
+        field = JSONFormField(max_depth=10)
+        start = default_timer()
+        with self.assertRaises(ValidationError):
+            field.clean('"' + '\\"' * 500000 + '[' * 20)
+        self.assertLess(default_timer() - start, 2)
+
+    def test_max_bytes_first(self):
+        field = JSONFormField(max_bytes=10, max_depth=2)
+        with self.assertRaises(ValidationError) as cm:
+            field.clean('"' + '\\"' * 500000 + '[' * 20)
+        self.assertEqual('max_bytes', cm.exception.code)
+
+    def test_model_field_limits(self):
+        field = JSONField(max_bytes=100, max_depth=3).formfield()
+        self.assertEqual((100, 3), (field.max_bytes, field.max_depth))
+
+
+class CountingBackend(JSONBackend):
+    def __init__(self):
+        self.loads_count = self.dumps_count = 0
+
+    def loads(self, s, **kwargs):
+        self.loads_count += 1
+        return super(CountingBackend, self).loads(s, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        self.dumps_count += 1
+        return super(CountingBackend, self).dumps(obj, **kwargs)
+
 
 class JSONFormTest(DjangoTestCase):
     def test_form_clean(self):
@@ -0,0 +1,57 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.fields import JSONField
+from jsonfield.frozen import FrozenDict, thaw
+
+from .jsonfield_test_app.models import FrozenJSONFieldTestModel
+
+
+class FrozenFieldTest(DjangoTestCase):
+    def test_default(self):
+        first = FrozenJSONFieldTestModel()
+        second = FrozenJSONFieldTestModel()
+        self.assertEqual({'a': (1, {'b': 2})}, first.json)
+        self.assertIsInstance(first.json, FrozenDict)
+        # Shared, instead of deep-copied for each instance.
+        self.assertIs(first.json, second.json)
+        self.assertEqual((), first.callable_json)
+
+    def test_mutable_default(self):
+        field = JSONField(default={'a': [1]})
+        self.assertIsNot(field.get_default(), field.get_default())
+        self.assertIs(type(field.get_default()['a']), list)
+
+    def test_loaded(self):
+        obj = FrozenJSONFieldTestModel.objects.create(
+            json={'a': [1, 2]}, lazy_json=[{'b': 1}]
+        )
+        obj = FrozenJSONFieldTestModel.objects.get(pk=obj.pk)
+        self.assertEqual({'a': (1, 2)}, obj.json)
+        self.assertIsInstance(obj.json, FrozenDict)
+        self.assertEqual(({'b': 1},), obj.lazy_json)
+        self.assertIsInstance(obj.lazy_json[0], FrozenDict)
+        with self.assertRaises(TypeError):
+            obj.json['a'] = 3
+
+        value = thaw(obj.json)
+        value['a'].append(3)
+        obj.json = value
+        obj.save()
+        self.assertEqual(
+            {'a': (1, 2, 3)},
+            FrozenJSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+
+    def test_values(self):
+        FrozenJSONFieldTestModel.objects.create(json=[1])
+        self.assertEqual(
+            [(1,)],
+            list(FrozenJSONFieldTestModel.objects.values_list(
+                'json', flat=True
+            ))
+        )
+
+    def test_options(self):
+        with self.assertRaises(ImproperlyConfigured):
+            JSONField(frozen=True, track_changes=True)
@@ -0,0 +1,149 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.utils import NotSupportedError
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.indexes import JSONGinIndex, JSONKeyIndex
+from jsonfield.lookups import key_transform
+from jsonfield.tests.jsonfield_test_app.models import (
+    JSONFieldTestModel, JSONKeyIndexModel,
+)
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Tables of the tests are too small for an index to be picked.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return ' '.join(str(row) for row in cursor.fetchall())
+
+
+def inline_sql(queryset, editor):
+    """
+    SQL of ``queryset`` with its parameters inlined and its columns not
+    qualified, as in the expressions of indexes.
+    """
+    sql, params = queryset.query.sql_with_params()
+    sql = sql % tuple(editor.quote_value(param) for param in params)
+    return sql.replace(
+        connection.ops.quote_name(queryset.model._meta.db_table) + '.', ''
+    )
+
+
+class JSONIndexTest(DjangoTestCase):
+    def test_deconstruct(self):
+        index = JSONKeyIndex(fields=['json'], path='a__b', text=True,
+                             name='json_a_b_idx')
+        path, args, kwargs = index.deconstruct()
+        self.assertEqual('jsonfield.indexes.JSONKeyIndex', path)
+        self.assertEqual({
+            'fields': ['json'], 'name': 'json_a_b_idx', 'path': 'a__b',
+            'text': True,
+        }, kwargs)
+        self.assertEqual(index, index.clone())
+
+        index = JSONGinIndex(fields=['json'], name='json_gin',
+                             opclass='jsonb_path_ops')
+        path, args, kwargs = index.deconstruct()
+        self.assertEqual('jsonfield.indexes.JSONGinIndex', path)
+        self.assertEqual('jsonb_path_ops', kwargs['opclass'])
+
+    def test_key_index_needs_name(self):
+        with self.assertRaises(ValueError):
+            JSONKeyIndex(fields=['json'], path='a')
+
+    def test_key_index_from_meta(self):
+        JSONKeyIndexModel.objects.create(json={'a': {'b': 'foo'}})
+        JSONKeyIndexModel.objects.create(json={'a': {'b': 'bar'}})
+        self.assertEqual(
+            1, JSONKeyIndexModel.objects.filter(json__a__b='foo').count()
+        )
+
+    def test_key_index_matches_lookups(self):
+        editor = connection.schema_editor()
+        queryset = JSONFieldTestModel.objects.all()
+        index = JSONKeyIndex(fields=['json'], path='a__b', name='json_idx')
+        self.assertIn(
+            index.get_expression_sql(JSONFieldTestModel, editor),
+            inline_sql(queryset.filter(json__a__b='x'), editor)
+        )
+
+        index = JSONKeyIndex(fields=['json'], path='a__b', text=True,
+                             name='json_text_idx')
+        self.assertIn(
+            index.get_expression_sql(JSONFieldTestModel, editor),
+            inline_sql(queryset.annotate(
+                b=key_transform('json__a__b', text=True)
+            ).filter(b='x'), editor)
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_sqlite_key_index_is_used(self):
+        index = JSONKeyIndex(fields=['json'], path="it's__0",
+                             name='json_test_idx')
+        sql = index.create_sql(JSONFieldTestModel, connection.schema_editor())
+        self.assertIn(
+            """ON "jsonfield_jsonfieldtestmodel" """
+            """(JSON_EXTRACT("json", '$."it''s"[0]'))""",
+            sql
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+
+        self.assertIn('json_test_idx', explain(
+            JSONFieldTestModel.objects.filter(**{"json__it's__0": 1})
+        ))
+        self.assertIn('json_a_b_idx', explain(
+            JSONKeyIndexModel.objects.filter(json__a__b='foo')
+        ))
+        self.assertIn('json_a_b_idx', explain(
+            JSONKeyIndexModel.objects.annotate(
+                b=key_transform('json__a__b', text=True)
+            ).filter(b='foo')
+        ))
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL-specific test')
+    def test_postgres_key_index_is_used(self):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in [
+                JSONKeyIndex(fields=['json'], path='a__b', name='json_idx'),
+                JSONKeyIndex(fields=['json'], path='a__b', text=True,
+                             name='json_text_idx'),
+            ]:
+                cursor.execute(index.create_sql(JSONFieldTestModel, editor))
+
+        self.assertIn('json_idx', explain(
+            JSONFieldTestModel.objects.filter(json__a__b='x')
+        ))
+        self.assertIn('json_text_idx', explain(
+            JSONFieldTestModel.objects.annotate(
+                b=key_transform('json__a__b', text=True)
+            ).filter(b='x')
+        ))
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_gin_index_not_supported(self):
+        index = JSONGinIndex(fields=['json'], name='json_gin')
+        with self.assertRaises(NotSupportedError):
+            index.create_sql(JSONFieldTestModel, connection.schema_editor())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL-specific test')
+    def test_postgres_sql(self):
+        from .jsonfield_test_app.models import PostgresJSONIndexModel
+
+        editor = connection.schema_editor()
+        sqls = [
+            index.create_sql(PostgresJSONIndexModel, editor)
+            for index in PostgresJSONIndexModel._meta.indexes
+        ]
+        self.assertIn(
+            'USING gin ("json_as_jsonb" jsonb_path_ops)', sqls[0]
+        )
+        self.assertIn('USING gin ((("json_as_text")::jsonb))', sqls[1])
+        self.assertIn('("json_as_text")::jsonb #>', sqls[2])
@@ -0,0 +1,107 @@
+from unittest import skipUnless
+
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield import instrumentation
+from jsonfield.forms import JSONFormField
+from jsonfield.instrumentation import (
+    MemoryCollector, PrometheusCollector, SignalCollector, json_operation,
+    register_collector, unregister_collector,
+)
+
+from .jsonfield_test_app.models import JSONFieldTestModel
+
+LABEL = 'jsonfield.jsonfieldtestmodel.json'
+
+
+class InstrumentationTest(DjangoTestCase):
+    def setUp(self):
+        self.collector = MemoryCollector()
+        register_collector(self.collector)
+        self.addCleanup(unregister_collector, self.collector)
+
+    def metric(self, operation, field=LABEL):
+        return self.collector.metrics[(operation, field)]
+
+    def test_disabled(self):
+        unregister_collector(self.collector)
+        self.assertEqual([], instrumentation.collectors)
+        field = JSONFieldTestModel._meta.get_field('json')
+        field.get_prep_value({'a': 1})
+        self.assertEqual({}, self.collector.metrics)
+
+    def test_model_field(self):
+        obj = JSONFieldTestModel.objects.create(json={'a': 1})
+        JSONFieldTestModel.objects.get(pk=obj.pk)
+        JSONFieldTestModel.objects.get(pk=obj.pk)
+
+        encode = self.metric('encode')
+        self.assertEqual(1, encode.count)
+        self.assertEqual(len('{"a":1}'), encode.size)
+        decode = self.metric('decode')
+        self.assertEqual(2, decode.count)
+        self.assertEqual(2 * len('{"a":1}'), decode.size)
+        self.assertEqual(2, decode.buckets[float('inf')])
+        self.assertGreaterEqual(decode.duration, 0)
+
+    def test_form_field(self):
+        field = JSONFieldTestModel._meta.get_field('json').formfield()
+        field.clean('{"a": 1}')
+        field.widget.format_value({'a': 1})
+        self.assertEqual(len('{"a": 1}'), self.metric('parse').size)
+        self.assertEqual(
+            len('{\n  "a": 1\n}'), self.metric('format').size
+        )
+
+        JSONFormField().clean('[]')
+        self.assertEqual(1, self.metric('parse', '').count)
+
+    def test_as_dict(self):
+        self.collector.record('encode', 'field', 10, 0.002)
+        self.assertEqual({
+            'encode:field': {
+                'count': 1,
+                'size': 10,
+                'duration': 0.002,
+                'buckets': [
+                    (0.00001, 0), (0.0001, 0), (0.001, 0), (0.01, 1),
+                    (0.1, 1), (1.0, 1), (float('inf'), 1),
+                ],
+            },
+        }, self.collector.as_dict())
+        self.collector.reset()
+        self.assertEqual({}, self.collector.as_dict())
+
+    def test_signal(self):
+        received = []
+
+        def receiver(**kwargs):
+            received.append((kwargs['operation'], kwargs['field']))
+
+        json_operation.connect(receiver)
+        self.addCleanup(json_operation.disconnect, receiver)
+        collector = SignalCollector()
+        register_collector(collector)
+        self.addCleanup(unregister_collector, collector)
+
+        JSONFieldTestModel._meta.get_field('json').get_prep_value([1])
+        self.assertEqual([('encode', LABEL)], received)
+
+    @skipUnless(PrometheusCollector.available,
+                'prometheus_client is not installed')
+    def test_prometheus(self):
+        import prometheus_client
+
+        registry = prometheus_client.CollectorRegistry()
+        collector = PrometheusCollector(registry=registry)
+        register_collector(collector)
+        self.addCleanup(unregister_collector, collector)
+
+        JSONFieldTestModel._meta.get_field('json').get_prep_value([1])
+        labels = {'operation': 'encode', 'field': LABEL}
+        self.assertEqual(1, registry.get_sample_value(
+            'jsonfield_duration_seconds_count', labels
+        ))
+        self.assertEqual(3, registry.get_sample_value(
+            'jsonfield_size_total', labels
+        ))
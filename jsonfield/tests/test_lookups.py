@@ -0,0 +1,287 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.utils import NotSupportedError
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.features import JSON_FUNCTIONS_ATTR, supports_json_functions
+from jsonfield.lookups import KeyTextTransform, KeyTransform, key_transform
+from jsonfield.tests.jsonfield_test_app.models import JSONFieldTestModel
+
+
+class KeyTransformTest(DjangoTestCase):
+    def setUp(self):
+        self.objs = [
+            JSONFieldTestModel.objects.create(json=value) for value in [
+                {'a': 'foo', 'n': 1, 'list': ['x', 'y']},
+                {'a': 'bar', 'n': 2, 'nested': {'b': {'c': True}}},
+                {'a': {'b': 'foo'}, 'n': 3.5},
+                ['foo', {'a': 'bar'}],
+                'foo',
+                None,
+            ]
+        ]
+
+    def assertFilter(self, indexes, **kwargs):
+        self.assertEqual(
+            [self.objs[i].pk for i in indexes],
+            list(JSONFieldTestModel.objects.filter(**kwargs).order_by(
+                'pk').values_list('pk', flat=True))
+        )
+
+    def test_key(self):
+        self.assertFilter([0], json__a='foo')
+        self.assertFilter([1], json__a='bar')
+
+    def test_nested_key(self):
+        self.assertFilter([2], json__a__b='foo')
+        self.assertFilter([1], json__nested__b__c=True)
+
+    def test_object_value(self):
+        self.assertFilter([2], json__a={'b': 'foo'})
+        self.assertFilter([1], json__nested={'b': {'c': True}})
+
+    def test_index(self):
+        self.assertFilter([0], json__list__1='y')
+        self.assertFilter([3], json__0='foo')
+        self.assertFilter([3], json__1__a='bar')
+
+    def test_number(self):
+        self.assertFilter([1], json__n=2)
+        self.assertFilter([2], json__n=3.5)
+
+    def test_number_does_not_match_string(self):
+        JSONFieldTestModel.objects.create(json={'n': '2'})
+        self.assertFilter([1], json__n=2)
+
+    def test_boolean_does_not_match_number(self):
+        self.objs.extend(
+            JSONFieldTestModel.objects.create(json={'n': value})
+            for value in [True, False, 0]
+        )
+        self.assertFilter([0], json__n=1)
+        self.assertFilter([0], json__n=1.0)
+        self.assertFilter([6], json__n=True)
+        self.assertFilter([7], json__n=False)
+        self.assertFilter([8], json__n=0)
+        self.assertFilter([1], json__nested__b__c=True)
+        self.assertFilter([0, 7], json__n__in=[1, False])
+        self.assertFilter([6, 7], json__n__in=[True, False])
+        self.assertFilter([0, 8], json__n__in=[1, 0])
+        self.assertFilter([0], json__a__in=['foo', True])
+
+    def test_comparisons(self):
+        self.assertFilter([1, 2], json__n__gt=1)
+        self.assertFilter([0, 1], json__n__lte=2)
+        self.assertFilter([0], json__n__lt=2)
+        self.assertFilter([1, 2], json__n__gte=2)
+
+    def test_in(self):
+        self.assertFilter([0, 1], json__a__in=['foo', 'bar'])
+        self.assertFilter([0, 2], json__n__in=[1, 3.5])
+
+    def test_exclude(self):
+        self.assertEqual(
+            1, JSONFieldTestModel.objects.filter(
+                json__a__isnull=False).exclude(json__a='foo').exclude(
+                json__a='bar').count()
+        )
+
+    def test_expression(self):
+        self.assertEqual(
+            'bar',
+            JSONFieldTestModel.objects.annotate(
+                a=KeyTextTransform('a', 'json')
+            ).get(json__n=2).a
+        )
+        self.assertEqual(
+            [self.objs[2].pk],
+            list(JSONFieldTestModel.objects.filter(
+                json__n=KeyTransform('n', 'json'), json__n__gt=3,
+            ).values_list('pk', flat=True))
+        )
+
+    def test_existing_lookups(self):
+        self.assertFilter([0], json__contains='list')
+        self.assertFilter([5], json__isnull=True)
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_sqlite_inlines_path(self):
+        sql = str(JSONFieldTestModel.objects.filter(json__a__b=1).query)
+        self.assertIn(
+            """JSON_EXTRACT("jsonfield_jsonfieldtestmodel"."json", """
+            """'$."a"."b"')""",
+            sql
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_sqlite_quoted_path(self):
+        JSONFieldTestModel.objects.create(json={"it's 100%": 1})
+        self.assertEqual(
+            1, JSONFieldTestModel.objects.filter(**{
+                "json__it's 100%": 1
+            }).count()
+        )
+
+    def assertNonAsciiKey(self, obj):
+        queryset = JSONFieldTestModel.objects.filter(pk=obj.pk)
+        self.assertEqual(1, queryset.filter(**{u'json__\xe9': 1}).count())
+        self.assertEqual(1, queryset.filter(json__has_key=u'\xe9').count())
+        self.assertEqual(
+            [{u'json__\xe9': 1}], list(queryset.values(u'json__\xe9'))
+        )
+
+    def test_non_ascii_key(self):
+        self.assertNonAsciiKey(
+            JSONFieldTestModel.objects.create(json={u'\xe9': 1})
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_sqlite_without_json1(self):
+        self.assertTrue(supports_json_functions(connection))
+        setattr(connection, JSON_FUNCTIONS_ATTR, False)
+        self.addCleanup(delattr, connection, JSON_FUNCTIONS_ATTR)
+        for kwargs in [{'json__a': 'foo'}, {'json__has_key': 'a'}]:
+            with self.assertRaisesMessage(NotSupportedError, 'JSON1'):
+                list(JSONFieldTestModel.objects.filter(**kwargs))
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_sqlite_utf8_document(self):
+        obj = JSONFieldTestModel.objects.create(json={})
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE jsonfield_jsonfieldtestmodel SET json = %s '
+                'WHERE id = %s', [u'{"\xe9":1}', obj.pk]
+            )
+        self.assertNonAsciiKey(obj)
+
+
+class KeyProjectionTest(DjangoTestCase):
+    def setUp(self):
+        self.objs = [
+            JSONFieldTestModel.objects.create(json=value) for value in [
+                {'a': {'b': [1, {'c': 'x'}]}, 'n': 2},
+                {'a': {'b': 'y'}, 'n': 1.5},
+                {'a': {'b': None}, 'n': 3},
+                {'a': {'b': '{"d": 1}'}, 'n': 0},
+                {'n': -1},
+            ]
+        ]
+        self.queryset = JSONFieldTestModel.objects.order_by('pk')
+
+    def test_scalars(self):
+        obj = JSONFieldTestModel.objects.create(json={
+            'a': {'b': [True, False, None, 1, 0]}, 't': True, 'f': False,
+        })
+        queryset = JSONFieldTestModel.objects.filter(pk=obj.pk)
+        self.assertEqual(
+            [(True, False, None, [True, False, None, 1, 0], None)],
+            list(queryset.values_list(
+                'json__t', 'json__f', 'json__a__b__2', 'json__a__b',
+                'json__missing'
+            ))
+        )
+        values = queryset.values_list(
+            'json__a__b__0', 'json__a__b__1', 'json__a__b__3', 'json__a__b__4'
+        ).get()
+        self.assertEqual(
+            [(True, bool), (False, bool), (1, int), (0, int)],
+            [(value, type(value)) for value in values]
+        )
+
+    def test_values(self):
+        self.assertEqual(
+            [[1, {'c': 'x'}], 'y', None, '{"d": 1}', None],
+            [row['json__a__b'] for row in self.queryset.values('json__a__b')]
+        )
+
+    def test_values_list(self):
+        self.assertEqual(
+            [2, 1.5, 3, 0, -1],
+            list(self.queryset.values_list('json__n', flat=True))
+        )
+        self.assertEqual(
+            [{'c': 'x'}],
+            list(self.queryset.filter(pk=self.objs[0].pk).values_list(
+                'json__a__b__1', flat=True))
+        )
+
+    def test_annotate(self):
+        queryset = self.queryset.annotate(b=key_transform('json__a__b'))
+        self.assertEqual(
+            [[1, {'c': 'x'}], 'y'],
+            list(queryset.values_list('b', flat=True)[:2])
+        )
+        self.assertEqual(
+            [self.objs[1].pk],
+            list(queryset.filter(b='y').values_list('pk', flat=True))
+        )
+
+    def test_order_by(self):
+        self.assertEqual(
+            [self.objs[i].pk for i in (4, 3, 1, 0, 2)],
+            list(JSONFieldTestModel.objects.order_by(
+                'json__n').values_list('pk', flat=True))
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_sqlite_selects_key(self):
+        sql = str(self.queryset.values('json__a__b').query)
+        self.assertTrue(sql.startswith('SELECT CASE JSON_TYPE('))
+        self.assertIn('JSON_QUOTE(JSON_EXTRACT(', sql)
+
+
+class KeyLookupTest(DjangoTestCase):
+    def setUp(self):
+        self.objs = [
+            JSONFieldTestModel.objects.create(json=value) for value in [
+                {'a': 1, 'b': 2},
+                {'a': None, 'c': {'d': 3}},
+                {'b': [1, 2]},
+                ['a', 'b'],
+            ]
+        ]
+
+    def assertFilter(self, indexes, **kwargs):
+        self.assertEqual(
+            [self.objs[i].pk for i in indexes],
+            list(JSONFieldTestModel.objects.filter(**kwargs).order_by(
+                'pk').values_list('pk', flat=True))
+        )
+
+    def test_has_key(self):
+        self.assertFilter([0, 1], json__has_key='a')
+        self.assertFilter([], json__has_key='d')
+
+    def test_has_key_nested(self):
+        self.assertFilter([1], json__c__has_key='d')
+
+    def test_has_keys(self):
+        self.assertFilter([0], json__has_keys=['a', 'b'])
+        self.assertFilter([0, 1], json__has_keys=['a'])
+
+    def test_has_any_keys(self):
+        self.assertFilter([0, 1, 2], json__has_any_keys=['a', 'b'])
+        self.assertFilter([1], json__has_any_keys=['c', 'd'])
+
+    @skipUnless(connection.vendor in ('postgresql', 'mysql'),
+                'Needs JSON containment support')
+    def test_contained_by(self):
+        self.assertFilter(
+            [0, 2], json__contained_by={'a': 1, 'b': 2, 'e': 5}
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite-specific test')
+    def test_contained_by_not_supported(self):
+        with self.assertRaises(NotSupportedError):
+            list(JSONFieldTestModel.objects.filter(
+                json__contained_by={'a': 1}
+            ))
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL-specific test')
+    def test_postgres_operators(self):
+        sql = str(JSONFieldTestModel.objects.filter(
+            json__contains={'a': 1}, json__has_key='a'
+        ).query)
+        self.assertIn('@>', sql)
+        self.assertIn(' ? ', sql)
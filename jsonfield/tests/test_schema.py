@@ -0,0 +1,155 @@
+import datetime
+from unittest import skipUnless
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.forms import ModelForm
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.fields import JSONField
+from jsonfield.forms import JSONFormField
+from jsonfield.frozen import freeze
+from jsonfield.schema import (
+    ENGINES, FastJSONSchemaValidator, JSONSchemaValidator,
+    get_schema_validator,
+)
+
+from .jsonfield_test_app.models import SchemaJSONFieldTestModel
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {'n': {'type': 'integer', 'minimum': 0}},
+    'required': ['n'],
+}
+
+
+class SchemaValidatorTestMixin(object):
+    validator_class = None
+
+    def setUp(self):
+        if not self.validator_class.available:
+            self.skipTest('%s is not installed' % self.validator_class.name)
+        self.validator = self.validator_class(SCHEMA)
+
+    def test_valid(self):
+        self.validator({'n': 1})
+
+    def test_invalid(self):
+        for value in [{'n': -1}, {'n': 'x'}, {}, [1]]:
+            with self.assertRaises(ValidationError) as cm:
+                self.validator(value)
+            self.assertEqual('schema', cm.exception.code)
+
+    def test_message(self):
+        with self.assertRaises(ValidationError) as cm:
+            self.validator({'n': 'x'})
+        message = cm.exception.messages[0]
+        self.assertTrue(message.startswith('Value does not match the schema'))
+        self.assertIn('integer', message)
+
+    def test_invalid_schema(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.validator_class({'type': 'nothing'})
+
+
+class FastJSONSchemaValidatorTest(SchemaValidatorTestMixin, DjangoTestCase):
+    validator_class = FastJSONSchemaValidator
+
+
+class JSONSchemaValidatorTest(SchemaValidatorTestMixin, DjangoTestCase):
+    validator_class = JSONSchemaValidator
+
+
+@skipUnless(any(engine.available for engine in ENGINES),
+            'No JSON Schema engine is installed')
+class SchemaFieldTest(DjangoTestCase):
+    def test_cached(self):
+        validator = get_schema_validator(SCHEMA)
+        self.assertIs(validator, get_schema_validator(dict(SCHEMA)))
+        self.assertIs(validator, get_schema_validator(validator))
+        self.assertIs(validator, JSONField(schema=SCHEMA).schema_validator)
+        self.assertIsNone(JSONField().schema_validator)
+
+    def test_model_validation(self):
+        obj = SchemaJSONFieldTestModel(json={'name': 'a', 'tags': ['b']})
+        obj.full_clean()
+        obj.json = {'tags': [1]}
+        with self.assertRaises(ValidationError) as cm:
+            obj.full_clean()
+        self.assertIn('json', cm.exception.message_dict)
+
+    def test_decode_types(self):
+        field = JSONField(schema={
+            'type': 'object',
+            'properties': {'created': {'type': 'string'}},
+        }, decode_types={'created': datetime.datetime})
+        field.validate({'created': datetime.datetime(2020, 1, 2)}, None)
+        with self.assertRaises(ValidationError):
+            field.validate({'created': 1}, None)
+
+    def test_frozen(self):
+        schema = {
+            'type': 'object',
+            'properties': {'tags': {'type': 'array'}},
+        }
+        for engine in ENGINES:
+            if not engine.available:
+                continue
+            field = JSONField(schema=engine(schema), frozen=True)
+            field.validate(freeze({'tags': ['a']}), None)
+            with self.assertRaises(ValidationError):
+                field.validate(freeze({'tags': 'a'}), None)
+
+    def test_form_field(self):
+        model_field = SchemaJSONFieldTestModel._meta.get_field('json')
+        field = model_field.formfield()
+        self.assertIsNone(field.schema_validator)
+        self.assertEqual({'name': 1}, field.clean('{"name": 1}'))
+
+    def test_model_form(self):
+        class SchemaForm(ModelForm):
+            class Meta:
+                model = SchemaJSONFieldTestModel
+                fields = ['json']
+
+        validator = SchemaJSONFieldTestModel._meta.get_field(
+            'json'
+        ).schema_validator
+        with mock.patch.object(validator, 'validate',
+                               wraps=validator.validate) as validate:
+            self.assertTrue(SchemaForm({'json': '{"name": "a"}'}).is_valid())
+            self.assertEqual(1, validate.call_count)
+
+            form = SchemaForm({'json': '{"name": 1}'})
+            self.assertFalse(form.is_valid())
+            self.assertIn('json', form.errors)
+            self.assertEqual(2, validate.call_count)
+
+    def test_defaults_not_filled(self):
+        schema = {
+            'type': 'object',
+            'properties': {'n': {'type': 'integer', 'default': 0}},
+        }
+        for engine in ENGINES:
+            if not engine.available:
+                continue
+            value = {}
+            engine(schema)(value)
+            self.assertEqual({}, value)
+
+    def test_plain_values_not_copied(self):
+        field = JSONField(schema={'type': 'object'})
+        with mock.patch.object(field.backend, 'dumps') as dumps:
+            field.validate({'a': 1}, None)
+        dumps.assert_not_called()
+
+    def test_form_field_schema(self):
+        field = JSONFormField(schema=SCHEMA, required=False)
+        self.assertEqual({'n': 1}, field.clean('{"n": 1}'))
+        self.assertEqual('', field.clean(''))
+        with self.assertRaises(ValidationError):
+            field.clean('{"n": -1}')
@@ -0,0 +1,143 @@
+import io
+from datetime import datetime
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.db import connection
+from django.db.migrations.state import ProjectState
+from django.test import TestCase as DjangoTestCase
+
+from jsonfield.bulk import iter_ndjson, load_ndjson
+from jsonfield.fields import JSONField
+from jsonfield.storage import (
+    ConvertStorage, MsgpackStorage, convert_rows, get_storage_format,
+    msgpack,
+)
+
+
+class UnavailableStorage(MsgpackStorage):
+    name = 'unavailable'
+    available = False
+
+
+class GetStorageFormatTest(DjangoTestCase):
+    def test_default(self):
+        self.assertIsNone(get_storage_format(None))
+        self.assertIsNone(JSONField().storage_format)
+
+    def test_unavailable(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_storage_format(UnavailableStorage)
+
+    def test_unknown(self):
+        with self.assertRaises(ImportError):
+            get_storage_format('jsonfield.storage.UnknownStorage')
+
+
+@skipUnless(msgpack, 'msgpack is not installed')
+class MsgpackStorageTest(DjangoTestCase):
+    def setUp(self):
+        from .jsonfield_test_app.models import MsgpackJSONFieldTestModel
+        self.model = MsgpackJSONFieldTestModel
+
+    def get_raw(self, pk, column='json'):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT %s FROM %s WHERE id = %%s' % (
+                    connection.ops.quote_name(column),
+                    self.model._meta.db_table,
+                ),
+                [pk]
+            )
+            return cursor.fetchone()[0]
+
+    def test_round_trip(self):
+        obj = self.model.objects.create(json={
+            'date': datetime(2020, 1, 2, 3, 4, 5),
+            'price': Decimal('1.5'),
+            'items': [1, 'two', None, True, {'a': []}],
+        })
+        self.assertEqual({
+            'date': '2020-01-02T03:04:05',
+            'price': 1.5,
+            'items': [1, 'two', None, True, {'a': []}],
+        }, self.model.objects.get(pk=obj.pk).json)
+
+    def test_stored_as_binary(self):
+        value = {'spam': ['eggs'] * 10}
+        obj = self.model.objects.create(json=value, text=value)
+        raw = bytes(self.get_raw(obj.pk))
+        self.assertEqual(value, msgpack.unpackb(raw, raw=False))
+        self.assertLess(len(raw), len(self.get_raw(obj.pk, 'text')))
+
+    def test_null(self):
+        obj = self.model.objects.create(json=None)
+        self.assertIsNone(self.get_raw(obj.pk))
+        self.assertEqual(
+            [obj.pk], [o.pk for o in self.model.objects.filter(
+                json__isnull=True)]
+        )
+
+    def test_lookups(self):
+        obj = self.model.objects.create(json=[1, 2])
+        self.model.objects.create(json=[3])
+        self.assertEqual([obj], list(self.model.objects.filter(json=[1, 2])))
+        with self.assertRaises(FieldError):
+            self.model.objects.filter(json__0=1)
+        with self.assertRaises(FieldError):
+            self.model.objects.filter(json__contains=1)
+
+    def test_lazy(self):
+        obj = self.model.objects.create(lazy_json={'a': 1})
+        obj = self.model.objects.get(pk=obj.pk)
+        self.assertFalse(
+            self.model._meta.get_field('lazy_json').has_changed(obj)
+        )
+        self.assertEqual({'a': 1}, obj.lazy_json)
+
+    def test_deconstruct(self):
+        field = self.model._meta.get_field('json')
+        name, path, args, kwargs = field.deconstruct()
+        self.assertEqual('msgpack', kwargs['storage_format'])
+        self.assertNotIn(
+            'storage_format',
+            self.model._meta.get_field('text').deconstruct()[3]
+        )
+
+    def test_convert_rows(self):
+        objs = [
+            self.model.objects.create(text={'n': i}) for i in range(5)
+        ]
+        convert_rows(self.model, 'text', 'json', batch_size=2)
+        self.assertEqual(
+            [{'n': i} for i in range(5)],
+            [self.model.objects.get(pk=obj.pk).json for obj in objs]
+        )
+
+    def test_convert_storage_operation(self):
+        obj = self.model.objects.create(json={'a': 1})
+        operation = ConvertStorage(
+            self.model._meta.model_name, 'json', 'text'
+        )
+        state = ProjectState.from_apps(self.model._meta.apps)
+        operation.database_forwards(
+            'jsonfield', connection.schema_editor(), state, state
+        )
+        self.assertEqual({'a': 1}, self.model.objects.get(pk=obj.pk).text)
+        self.assertEqual(
+            ('ConvertStorage', [], {
+                'model_name': 'msgpackjsonfieldtestmodel',
+                'from_field': 'json',
+                'to_field': 'text',
+            }),
+            operation.deconstruct()
+        )
+
+    def test_ndjson(self):
+        load_ndjson(self.model, 'json',
+                    io.StringIO('{"a": [1, "\\\\"]}\nnull\n'))
+        self.assertEqual(
+            ['{"a":[1,"\\\\"]}\n', 'null\n'],
+            list(iter_ndjson(self.model.objects.order_by('pk'), 'json'))
+        )
@@ -0,0 +1,257 @@
+import copy
+import pickle
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.test import TestCase as DjangoTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from jsonfield.fields import JSONField
+from jsonfield.tracking import (
+    TrackedDict, TrackedList, commit_changes, minimal_paths, pop_changes,
+    prepare_changes, track,
+)
+from jsonfield.updates import get_changed_fields, save_changed
+
+from .jsonfield_test_app.models import TrackedJSONFieldTestModel
+
+
+class TrackingTest(DjangoTestCase):
+    def test_track(self):
+        value = track({'a': [1, {'b': 2}], 'c': 'd'})
+        self.assertIsInstance(value, TrackedDict)
+        self.assertIsInstance(value['a'], TrackedList)
+        self.assertIsInstance(value['a'][1], TrackedDict)
+        self.assertEqual({'a': [1, {'b': 2}], 'c': 'd'}, value)
+        self.assertEqual(set(), value.changes)
+        self.assertEqual('d', track('d'))
+
+    def test_dict_changes(self):
+        value = track({'a': {'b': 1, 'c': 2}, 'd': 3})
+        value['a']['b'] = 4
+        del value['a']['c']
+        value.pop('d')
+        value.setdefault('e', 5)
+        value.setdefault('e', 6)
+        value['a'].update(f=7)
+        self.assertEqual(
+            {('a', 'b'), ('a', 'c'), ('d',), ('e',), ('a', 'f')},
+            value.changes
+        )
+
+    def test_list_changes(self):
+        value = track({'a': [1, 2, {'b': 3}]})
+        value['a'][-1]['b'] = 4
+        value['a'][0] = 5
+        self.assertEqual({('a', 2, 'b'), ('a', 0)}, value.changes)
+        value['a'].append(6)
+        self.assertEqual([('a',)], minimal_paths(value.changes))
+
+    def test_pop_changes(self):
+        value = track({'a': [{'b': 1}, {'c': 2}], 'd': {}})
+        value['a'].pop(0)
+        value['d']['e'] = {}
+        self.assertEqual([('a',), ('d', 'e')], pop_changes(value))
+        # The untracked object assigned to d.e is sent again.
+        self.assertEqual({('d', 'e')}, value.changes)
+        # The remaining item of a got its new index.
+        value['a'][0]['c'] = 3
+        self.assertEqual([('d', 'e'), ('a', 0, 'c')], pop_changes(value))
+
+    def test_prepare_changes(self):
+        value = track({'a': 1, 'b': 2})
+        value['a'] = 3
+        paths, changes = prepare_changes(value)
+        self.assertEqual([('a',)], paths)
+        self.assertEqual(set(), value.changes)
+        # Not committed: sent again, with the later changes.
+        value['b'] = 4
+        paths, changes = prepare_changes(value)
+        self.assertEqual([('a',), ('b',)], paths)
+        value['a'] = 5
+        commit_changes(value, changes)
+        self.assertEqual({('a',)}, value.changes)
+        self.assertEqual(frozenset(), value.uncommitted)
+
+    def test_copy(self):
+        value = track({'a': [1]})
+        for copied in (copy.copy(value), copy.deepcopy(value),
+                       pickle.loads(pickle.dumps(value))):
+            self.assertIs(type(copied), dict)
+            self.assertEqual({'a': [1]}, copied)
+        self.assertIs(type(copy.deepcopy(value)['a']), list)
+
+    def test_options(self):
+        with self.assertRaises(ImproperlyConfigured):
+            JSONField(track_changes=True, lazy=True)
+        with self.assertRaises(ImproperlyConfigured):
+            JSONField(track_changes=True, compress=True)
+
+
+class TrackedFieldTest(DjangoTestCase):
+    def setUp(self):
+        obj = TrackedJSONFieldTestModel.objects.create(json={
+            'settings': {'theme': 'dark', 'lang': 'en'},
+            'counters': {'views': 1},
+            'tags': ['a', 'b'],
+            'padding': 'x' * 1000,
+        })
+        self.obj = TrackedJSONFieldTestModel.objects.get(pk=obj.pk)
+
+    def save(self, obj, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            obj.save(**kwargs)
+        return ' '.join(query['sql'] for query in queries)
+
+    def reload(self):
+        return TrackedJSONFieldTestModel.objects.get(pk=self.obj.pk).json
+
+    def test_loaded(self):
+        self.assertIsInstance(self.obj.json, TrackedDict)
+        field = self.obj._meta.get_field('json')
+        self.assertFalse(field.has_changed(self.obj))
+        self.assertEqual(['name'], get_changed_fields(self.obj))
+
+    def test_patch(self):
+        self.obj.json['counters']['views'] += 1
+        del self.obj.json['settings']['lang']
+        sql = self.save(self.obj)
+        self.assertNotIn('x' * 1000, sql)
+        self.assertEqual({'theme': 'dark'}, self.reload()['settings'])
+        self.assertEqual({'views': 2}, self.reload()['counters'])
+
+        # Sent again until the test transaction is committed.
+        field = self.obj._meta.get_field('json')
+        self.assertTrue(field.has_changed(self.obj))
+        self.obj.json['counters']['views'] += 1
+        self.save(self.obj)
+        self.assertEqual({'views': 3}, self.reload()['counters'])
+        self.assertEqual({'theme': 'dark'}, self.reload()['settings'])
+
+    def test_list(self):
+        self.obj.json['tags'].append('c')
+        self.obj.json['tags'][0] = 'z'
+        self.save(self.obj)
+        self.assertEqual(['z', 'b', 'c'], self.reload()['tags'])
+
+    def test_assigned_value(self):
+        counters = {'clicks': 1}
+        self.obj.json['counters'] = counters
+        self.save(self.obj)
+        counters['clicks'] = 2
+        self.save(self.obj)
+        self.assertEqual({'clicks': 2}, self.reload()['counters'])
+
+    def test_replaced(self):
+        self.obj.json = {'a': 1}
+        field = self.obj._meta.get_field('json')
+        self.assertTrue(field.has_changed(self.obj))
+        self.save(self.obj)
+        self.assertEqual({'a': 1}, self.reload())
+
+    def test_instance_copies(self):
+        field = self.obj._meta.get_field('json')
+        for copied in (copy.deepcopy(self.obj),
+                       pickle.loads(pickle.dumps(self.obj))):
+            self.assertIs(type(copied.json), dict)
+            # Not tracked anymore: written as a whole.
+            self.assertTrue(field.has_changed(copied))
+            copied.json['counters']['views'] = 5
+            self.assertIn('x' * 1000, self.save(copied))
+            self.assertEqual({'views': 5}, self.reload()['counters'])
+        self.assertIsInstance(self.obj.json, TrackedDict)
+        self.assertFalse(field.has_changed(self.obj))
+
+    def test_refresh_from_db(self):
+        TrackedJSONFieldTestModel.objects.filter(pk=self.obj.pk).update(
+            name='changed'
+        )
+        self.obj.refresh_from_db()
+        field = self.obj._meta.get_field('json')
+        self.assertFalse(field.has_changed(self.obj))
+        self.obj.json['counters']['views'] = 5
+        self.assertNotIn('x' * 1000, self.save(self.obj))
+        self.assertEqual({'views': 5}, self.reload()['counters'])
+
+    def test_assigned_from_other_row(self):
+        other = TrackedJSONFieldTestModel.objects.create(json={'a': 1})
+        other = TrackedJSONFieldTestModel.objects.get(pk=other.pk)
+        self.obj.json = other.json
+        field = self.obj._meta.get_field('json')
+        self.assertTrue(field.has_changed(self.obj))
+        self.save(self.obj)
+        self.assertEqual({'a': 1}, self.reload())
+
+    def test_save_changed(self):
+        with CaptureQueriesContext(connection) as queries:
+            save_changed(self.obj, fields=['json'])
+        self.assertEqual(0, len([
+            query for query in queries if 'UPDATE' in query['sql']
+        ]))
+
+    def test_root_list(self):
+        obj = TrackedJSONFieldTestModel.objects.create(json=[1])
+        obj = TrackedJSONFieldTestModel.objects.get(pk=obj.pk)
+        obj.json.append(2)
+        obj.save()
+        obj = TrackedJSONFieldTestModel.objects.get(pk=obj.pk)
+        self.assertEqual([1, 2], obj.json)
+        obj.json[0] = 0
+        obj.save()
+        self.assertEqual(
+            [0, 2], TrackedJSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+
+    def test_null(self):
+        obj = TrackedJSONFieldTestModel.objects.create(json=None)
+        obj = TrackedJSONFieldTestModel.objects.get(pk=obj.pk)
+        self.assertIsNone(obj.json)
+        obj.json = {'a': 1}
+        obj.save()
+        self.assertEqual(
+            {'a': 1}, TrackedJSONFieldTestModel.objects.get(pk=obj.pk).json
+        )
+
+    def test_values(self):
+        self.assertEqual(
+            'dark',
+            TrackedJSONFieldTestModel.objects.values_list(
+                'json', flat=True).get(pk=self.obj.pk)['settings']['theme']
+        )
+
+
+class TrackedCommitTest(TransactionTestCase):
+    def setUp(self):
+        obj = TrackedJSONFieldTestModel.objects.create(json={
+            'counters': {'views': 1, 'clicks': 1},
+        })
+        self.obj = TrackedJSONFieldTestModel.objects.get(pk=obj.pk)
+        self.field = self.obj._meta.get_field('json')
+
+    def reload(self):
+        return TrackedJSONFieldTestModel.objects.get(pk=self.obj.pk).json
+
+    def test_committed(self):
+        self.obj.json['counters']['views'] = 2
+        with transaction.atomic():
+            self.obj.save()
+            self.obj.json['counters']['clicks'] = 2
+        self.assertTrue(self.field.has_changed(self.obj))
+        self.assertEqual(['json', 'name'], get_changed_fields(self.obj))
+        self.obj.json['counters'].pop('clicks')
+        self.obj.save()
+        self.assertFalse(self.field.has_changed(self.obj))
+        self.assertEqual({'counters': {'views': 2}}, self.reload())
+
+    def test_rolled_back(self):
+        self.obj.json['counters']['views'] = 2
+        with self.assertRaises(ValueError), transaction.atomic():
+            self.obj.save()
+            raise ValueError
+        self.assertEqual({'views': 1, 'clicks': 1}, self.reload()['counters'])
+        self.assertTrue(self.field.has_changed(self.obj))
+
+        self.obj.json['counters']['clicks'] = 2
+        save_changed(self.obj)
+        self.assertEqual({'views': 2, 'clicks': 2}, self.reload()['counters'])
+        self.assertFalse(self.field.has_changed(self.obj))
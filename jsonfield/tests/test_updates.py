@@ -0,0 +1,183 @@
+from unittest import skipUnless
+
+import django
+from django.db import connection, transaction
+from django.db.models import signals
+from django.test import TestCase as DjangoTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from jsonfield.descriptors import FINGERPRINTS_ATTR, PENDING_ATTR
+from jsonfield.tests.jsonfield_test_app.models import (
+    JSONFieldTestModel, LazyJSONFieldProxyModel, LazyMultiJSONFieldTestModel,
+)
+from jsonfield.updates import (
+    bulk_update_changed, get_changed_fields, save_changed,
+)
+
+
+@skipUnless(connection.vendor != 'postgresql', 'Text column only')
+class HasChangedTest(DjangoTestCase):
+    def setUp(self):
+        LazyMultiJSONFieldTestModel.objects.create(
+            name='foo', json={'a': 1}, extra=[1, 2]
+        )
+        self.obj = LazyMultiJSONFieldTestModel.objects.get()
+        self.field = LazyMultiJSONFieldTestModel._meta.get_field('json')
+
+    def test_untouched(self):
+        self.assertFalse(self.field.has_changed(self.obj))
+
+    def test_accessed(self):
+        self.obj.json
+        self.assertFalse(self.field.has_changed(self.obj))
+
+    def test_modified_in_place(self):
+        self.obj.json['b'] = 2
+        self.assertTrue(self.field.has_changed(self.obj))
+
+    def test_assigned(self):
+        self.obj.json = {'a': 1}
+        self.assertTrue(self.field.has_changed(self.obj))
+
+    def test_saved(self):
+        self.obj.json['b'] = 2
+        self.obj.save()
+        # Until the test transaction is committed.
+        self.assertTrue(self.field.has_changed(self.obj))
+
+    def test_new_instance(self):
+        obj = LazyMultiJSONFieldTestModel(json={})
+        self.assertTrue(self.field.has_changed(obj))
+
+    def test_deferred(self):
+        obj = LazyMultiJSONFieldTestModel.objects.defer('json').get()
+        self.assertFalse(self.field.has_changed(obj))
+
+    def test_not_lazy(self):
+        JSONFieldTestModel.objects.create(json={})
+        obj = JSONFieldTestModel.objects.get()
+        field = JSONFieldTestModel._meta.get_field('json')
+        # Not fingerprinted.
+        self.assertTrue(field.has_changed(obj))
+        self.assertNotIn(FINGERPRINTS_ATTR, obj.__dict__)
+
+    def test_save_receivers(self):
+        self.assertTrue(
+            signals.post_save.has_listeners(LazyMultiJSONFieldTestModel)
+        )
+        self.assertTrue(
+            signals.post_save.has_listeners(LazyJSONFieldProxyModel)
+        )
+        self.assertFalse(signals.post_save.has_listeners(JSONFieldTestModel))
+
+    def test_saved_proxy(self):
+        obj = LazyJSONFieldProxyModel.objects.get()
+        obj.json['b'] = 2
+        obj.save()
+        # Handed over to the transaction by the post_save receiver.
+        self.assertNotIn(PENDING_ATTR, obj.__dict__)
+
+
+@skipUnless(connection.vendor != 'postgresql', 'Text column only')
+class SaveChangedTest(DjangoTestCase):
+    def setUp(self):
+        LazyMultiJSONFieldTestModel.objects.create(
+            name='foo', json={'a': 1}, extra=[1, 2]
+        )
+        self.obj = LazyMultiJSONFieldTestModel.objects.get()
+
+    def test_get_changed_fields(self):
+        self.assertEqual(['name'], get_changed_fields(self.obj))
+        self.obj.extra.append(3)
+        self.assertEqual(['name', 'extra'], get_changed_fields(self.obj))
+        self.assertEqual(['extra'], get_changed_fields(self.obj, ['extra']))
+
+    def test_save_changed(self):
+        self.obj.extra.append(3)
+        with CaptureQueriesContext(connection) as queries:
+            save_changed(self.obj)
+
+        sql = queries[0]['sql']
+        self.assertIn('"extra"', sql)
+        self.assertNotIn('"json"', sql)
+        self.assertEqual(
+            [1, 2, 3], LazyMultiJSONFieldTestModel.objects.get().extra
+        )
+
+    def test_save_changed_nothing_to_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            save_changed(self.obj, fields=['json', 'extra'])
+        self.assertEqual(0, len(queries))
+
+    def test_save_changed_new_instance(self):
+        save_changed(LazyMultiJSONFieldTestModel(json={'b': 2}))
+        self.assertEqual(2, LazyMultiJSONFieldTestModel.objects.count())
+
+    @skipUnless(django.VERSION >= (2, 2), 'bulk_update() needs Django 2.2')
+    def test_bulk_update_changed(self):
+        LazyMultiJSONFieldTestModel.objects.create(json={'a': 2}, extra=[])
+        LazyMultiJSONFieldTestModel.objects.create(json={'a': 3}, extra=[])
+        objs = list(LazyMultiJSONFieldTestModel.objects.order_by('pk'))
+        objs[0].json['a'] = 10
+        objs[2].extra.append(30)
+
+        with CaptureQueriesContext(connection) as queries:
+            bulk_update_changed(objs, ['json', 'extra'])
+
+        self.assertEqual(2, len(queries))
+        self.assertEqual(
+            [({'a': 10}, [1, 2]), ({'a': 2}, []), ({'a': 3}, [30])],
+            [
+                (obj.json, obj.extra) for obj in
+                LazyMultiJSONFieldTestModel.objects.order_by('pk')
+            ]
+        )
+        self.assertTrue(
+            LazyMultiJSONFieldTestModel._meta.get_field('json').has_changed(
+                objs[0]
+            )
+        )
+
+
+@skipUnless(connection.vendor != 'postgresql', 'Text column only')
+class CommitTest(TransactionTestCase):
+    def setUp(self):
+        LazyMultiJSONFieldTestModel.objects.create(
+            name='foo', json={'a': 1}, extra=[1, 2]
+        )
+        self.obj = LazyMultiJSONFieldTestModel.objects.get()
+        self.field = LazyMultiJSONFieldTestModel._meta.get_field('json')
+
+    def test_committed(self):
+        self.obj.json['a'] = 2
+        with transaction.atomic():
+            self.obj.save()
+            self.assertTrue(self.field.has_changed(self.obj))
+        self.assertFalse(self.field.has_changed(self.obj))
+
+        self.obj.save()
+        self.assertFalse(self.field.has_changed(self.obj))
+
+    def test_rolled_back(self):
+        self.obj.json['a'] = 100
+        with self.assertRaises(ValueError), transaction.atomic():
+            self.obj.save()
+            raise ValueError
+        self.assertEqual(['name', 'json'], get_changed_fields(self.obj))
+
+        save_changed(self.obj)
+        self.assertEqual(
+            {'a': 100}, LazyMultiJSONFieldTestModel.objects.get().json
+        )
+        self.assertFalse(self.field.has_changed(self.obj))
+
+    def test_rolled_back_not_lazy(self):
+        JSONFieldTestModel.objects.create(json={'a': 1})
+        obj = JSONFieldTestModel.objects.get()
+        obj.json['a'] = 100
+        with self.assertRaises(ValueError), transaction.atomic():
+            obj.save()
+            raise ValueError
+
+        save_changed(obj)
+        self.assertEqual({'a': 100}, JSONFieldTestModel.objects.get().json)
@@ -0,0 +1,215 @@
+"""
+Change tracking for ``JSONField(track_changes=True)``.
+
+Documents loaded from the database are wrapped in ``TrackedDict`` and
+``TrackedList`` containers, which record the paths changed through them on
+the root container. Saving the instance then only sends those paths, see
+``jsonfield.expressions.JSONPatch``.
+
+Values assigned into a tracked document are stored as they are: changes
+made to them afterwards are not seen, so their path is sent again on every
+save. Structural changes of a list (``append()``, ``del``...) record the
+whole list.
+"""
+# Returned by ``resolve()`` for paths leading nowhere.
+MISSING = object()
+
+
+class TrackedMixin(object):
+    """
+    Tracked containers know their parent and their key in it, the root
+    container holding the set of changed ``paths``, tuples of keys, the
+    ``uncommitted`` ones written by a save not committed yet, and a weak
+    reference to the model instance it was loaded into.
+    """
+    _parent = None
+    _key = None
+    _instance = None
+
+    def _attach(self, parent, key):
+        self._parent = parent
+        self._key = key
+        if parent is None:
+            self.changes = set()
+            self.uncommitted = frozenset()
+
+    def _changed(self, *keys):
+        node, path = self, list(keys)
+        while node._parent is not None:
+            path.insert(0, node._key)
+            node = node._parent
+        node.changes.add(tuple(path))
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles are plain containers.
+        return self._plain_type, (self._plain_type(self),)
+
+
+class TrackedDict(TrackedMixin, dict):
+    _plain_type = dict
+
+    def __setitem__(self, key, value):
+        self._changed(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed(key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *args):
+        if key in self:
+            self._changed(key)
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._changed(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self._changed()
+        dict.clear(self)
+
+
+def structural(method):
+    def wrapper(self, *args, **kwargs):
+        self._changed()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class TrackedList(TrackedMixin, list):
+    _plain_type = list
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._changed()
+        else:
+            self._changed(index % len(self) if index < 0 else index)
+        list.__setitem__(self, index, value)
+
+    __delitem__ = structural(list.__delitem__)
+    __iadd__ = structural(list.__iadd__)
+    __imul__ = structural(list.__imul__)
+    append = structural(list.append)
+    extend = structural(list.extend)
+    insert = structural(list.insert)
+    pop = structural(list.pop)
+    remove = structural(list.remove)
+    reverse = structural(list.reverse)
+    sort = structural(list.sort)
+
+
+def iter_children(value):
+    if isinstance(value, dict):
+        return value.items()
+    return enumerate(value)
+
+
+def track(value, parent=None, key=None):
+    """
+    Return ``value`` with its objects and arrays replaced by tracked
+    containers, the root one recording the changes.
+    """
+    if isinstance(value, dict):
+        tracked = TrackedDict()
+        for child_key, child in value.items():
+            dict.__setitem__(
+                tracked, child_key, track(child, tracked, child_key)
+            )
+    elif isinstance(value, list):
+        tracked = TrackedList()
+        list.extend(tracked, [
+            track(child, tracked, index) for index, child in enumerate(value)
+        ])
+    else:
+        return value
+    tracked._attach(parent, key)
+    return tracked
+
+
+def resolve(value, path):
+    """
+    Return the value found under ``path``, or ``MISSING``.
+    """
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+    return value
+
+
+def minimal_paths(paths):
+    """
+    Return ``paths`` without the ones found under another one, shortest
+    first.
+    """
+    result = []
+    for path in sorted(paths, key=lambda path: (
+            len(path), [repr(key) for key in path])):
+        if not any(path[:len(other)] == other for other in result):
+            result.append(path)
+    return result
+
+
+def settle(value, parent, key, path, untracked):
+    # Attach the tracked containers under ``path`` to where they now are,
+    # and collect the paths of the untracked ones.
+    if isinstance(value, TrackedMixin):
+        if parent is not None:
+            value._attach(parent, key)
+        for child_key, child in iter_children(value):
+            settle(child, value, child_key, path + (child_key,), untracked)
+    elif isinstance(value, (dict, list)):
+        untracked.add(path)
+
+
+def prepare_changes(root):
+    """
+    Return the minimal list of paths changed in the ``root`` tracked
+    container, including the ones of uncommitted saves, and start tracking
+    from its current state. An empty path means the whole document changed.
+
+    The paths are returned again by the next call until
+    ``commit_changes()`` is called with the returned set of changes, once
+    they are committed.
+    """
+    changes = frozenset(root.changes | root.uncommitted)
+    paths = minimal_paths(changes)
+    untracked = set()
+    for path in paths:
+        value = resolve(root, path)
+        if value is not MISSING:
+            parent = resolve(root, path[:-1]) if path else None
+            settle(value, parent, path[-1] if path else None, path, untracked)
+    root.changes = untracked
+    root.uncommitted = changes
+    return paths, changes
+
+
+def commit_changes(root, changes):
+    root.uncommitted = root.uncommitted - changes
+
+
+def pop_changes(root):
+    """
+    Like ``prepare_changes()``, for changes known to be written.
+    """
+    paths, changes = prepare_changes(root)
+    commit_changes(root, changes)
+    return paths
@@ -0,0 +1,81 @@
+"""
+Helpers saving model instances without writing the JSON columns whose value
+did not change since it was loaded (see ``JSONField.has_changed``).
+"""
+from collections import OrderedDict
+
+from .descriptors import clear_fingerprint
+from .fields import JSONField
+
+
+def get_changed_fields(instance, fields=None):
+    """
+    Return the names of ``fields`` (all the concrete non-primary key fields
+    by default) that have to be written to save ``instance``.
+
+    Deferred fields and unchanged JSON fields are left out; other fields are
+    always considered changed.
+    """
+    opts = instance._meta
+    if fields is None:
+        fields = [
+            field.name for field in opts.concrete_fields
+            if not field.primary_key
+        ]
+
+    deferred = instance.get_deferred_fields()
+    changed = []
+    for name in fields:
+        field = opts.get_field(name)
+        if field.attname in deferred:
+            continue
+        if isinstance(field, JSONField) and not field.has_changed(instance):
+            continue
+        changed.append(name)
+    return changed
+
+
+def save_changed(instance, fields=None, **kwargs):
+    """
+    Save ``instance``, only updating the fields returned by
+    ``get_changed_fields()``. New instances are saved as usual.
+    """
+    if instance._state.adding or instance.pk is None:
+        instance.save(**kwargs)
+        return
+
+    kwargs['update_fields'] = get_changed_fields(instance, fields)
+    instance.save(**kwargs)
+
+
+def bulk_update_changed(objs, fields, batch_size=None):
+    """
+    Like ``QuerySet.bulk_update()``, but skipping the JSON fields that did
+    not change. Instances are grouped by set of changed fields, and the ones
+    without any change are not written at all.
+
+    Requires Django 2.2 or later.
+    """
+    objs = list(objs)
+    if not objs:
+        return
+
+    groups = OrderedDict()
+    for obj in objs:
+        changed = tuple(get_changed_fields(obj, fields))
+        if changed:
+            groups.setdefault(changed, []).append(obj)
+
+    opts = objs[0]._meta
+    for changed, group in groups.items():
+        opts.model._base_manager.bulk_update(
+            group, changed, batch_size=batch_size
+        )
+
+        # bulk_update() doesn't go through pre_save(), forget what was
+        # loaded so the written values are not mistaken for unchanged ones.
+        for name in changed:
+            field = opts.get_field(name)
+            if isinstance(field, JSONField):
+                for obj in group:
+                    clear_fingerprint(obj, field.attname)
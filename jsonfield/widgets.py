@@ -1,18 +1,32 @@
-import json
-
 from django.forms import Textarea
 
+from jsonfield import instrumentation
+from jsonfield.backends import get_backend
 from jsonfield.encoder import JSONEncoder
 from jsonfield.utils import string_types
 
 
 class JSONWidget(Textarea):
+    # Model field the widget was made for, if any.
+    source_field = None
+
+    def __init__(self, attrs=None, backend=None):
+        self.backend = get_backend(backend)
+        super(JSONWidget, self).__init__(attrs)
+
     def format_value(self, value):
         if value is None:
             return ''
 
         if not isinstance(value, string_types):
-            return json.dumps(value, ensure_ascii=False, indent=2,
-                              cls=JSONEncoder)
+            if instrumentation.collectors:
+                return instrumentation.measure(
+                    'format', self, self._dumps, value, output=True
+                )
+            return self._dumps(value)
 
         return value
+
+    def _dumps(self, value):
+        return self.backend.dumps(value, ensure_ascii=False, indent=2,
+                                  cls=JSONEncoder)
@@ -20,6 +20,8 @@ setup(
     maintainer_email="me@adamj.eu",
     packages=[
         "jsonfield",
+        "jsonfield.management",
+        "jsonfield.management.commands",
     ],
     include_package_data=True,
     test_suite='tests.main',
@@ -27,6 +29,9 @@ setup(
         'Django>=1.11',
         'six',
     ],
+    extras_require={
+        'msgpack': ['msgpack>=1.0'],
+    },
     classifiers=[
         "Development Status :: 6 - Mature",
         'Framework :: Django',